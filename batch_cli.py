@@ -0,0 +1,185 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from controllers.subtitle_pipeline import SubtitlePipeline, DEFAULT_SETTINGS
+from exporters.subtitle_writer import FORMATS
+from transcribers.model_pool import MODEL_POOL
+from utils.fs_utils import atomic_write_json, read_json
+from utils.lang_utils import get_language_code
+
+AUDIO_EXTS = (".wav", ".mp3", ".flac", ".m4a", ".ogg")
+
+
+def collect_inputs(inputs, recursive=False):
+    """
+    Expand directories / globs / plain files into (audio_path, output_stem) pairs.
+    Files found under a directory keep their sub-folders in the output stem, so two
+    `intro.wav` in different folders don't overwrite each other.
+    """
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            walker = os.walk(item) if recursive else [(item, [], os.listdir(item))]
+            for folder, _, names in walker:
+                for name in sorted(names):
+                    if name.lower().endswith(AUDIO_EXTS):
+                        path = os.path.join(folder, name)
+                        found.append((path, os.path.splitext(os.path.relpath(path, item))[0]))
+        else:
+            matches = sorted(glob.glob(item, recursive=recursive)) or [item]
+            for path in matches:
+                if os.path.isfile(path):
+                    found.append((path, os.path.splitext(os.path.basename(path))[0]))
+    seen, jobs = set(), []
+    for path, stem in found:
+        if os.path.abspath(path) not in seen:
+            seen.add(os.path.abspath(path))
+            jobs.append((path, stem))
+    return jobs
+
+
+def job_paths(output_dir, stem):
+    base = os.path.join(output_dir, stem)
+    return {
+        "srt": base + ".srt",            # smoothed subtitles (the deliverable)
+        "raw_srt": base + ".raw.srt",    # word groups before smoothing
+        "words": base + ".words.npz",    # aligned words, for regrouping without ASR
+        "job": base + ".job.json",       # per-job summary
+    }
+
+
+def input_state(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def is_up_to_date(audio_path, paths, settings):
+    """Outputs exist and were made from this exact input file with the same settings."""
+    job = read_json(paths["job"])
+    return (
+        job is not None
+        and job.get("status") == "ok"
+        and job.get("settings") == settings
+        and job.get("input_state") == input_state(audio_path)
+        and os.path.exists(paths["srt"])
+    )
+
+
+def run_job(pipeline, audio_path, stem, settings, output_dir):
+    paths = job_paths(output_dir, stem)
+    os.makedirs(os.path.dirname(paths["srt"]) or ".", exist_ok=True)
+    t0 = time.perf_counter()
+    try:
+        summary = pipeline.run(audio_path, settings, paths["raw_srt"], paths["srt"], paths["words"])
+        summary["status"] = "ok"
+    except Exception as e:
+        summary = {
+            "input": audio_path, "output": paths["srt"], "settings": settings, "status": "failed",
+            "error": f"{type(e).__name__}: {e}", "wall_sec": round(time.perf_counter() - t0, 3),
+        }
+    summary["input_state"] = input_state(audio_path)
+    summary["finished_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    atomic_write_json(paths["job"], summary)
+    return summary
+
+
+def print_summary(results, total_wall):
+    print(f"\n{'status':<8} {'audio s':>9} {'wall s':>9} {'RTF':>7}  file")
+    for r in results:
+        audio = f"{r['audio_sec']:.1f}" if r.get("audio_sec") is not None else "-"
+        wall = f"{r['wall_sec']:.1f}" if r.get("wall_sec") is not None else "-"
+        rtf = f"{r['rtf']:.3f}" if r.get("rtf") is not None else "-"
+        print(f"{r['status']:<8} {audio:>9} {wall:>9} {rtf:>7}  {r['input']}")
+        if r["status"] == "failed":
+            print(f"{'':<8} {r['error']}")
+    done = [r for r in results if r["status"] == "ok"]
+    audio_total = sum(r["audio_sec"] for r in done)
+    print(f"\n[Batch] {len(done)} transcribed, {sum(r['status'] == 'skipped' for r in results)} up to date, "
+          f"{sum(r['status'] == 'failed' for r in results)} failed; {audio_total:.1f}s of audio in {total_wall:.1f}s"
+          + (f" (overall RTF {total_wall / audio_total:.3f})" if audio_total else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AutoSubs headless batch: subtitle whole folders without the UI")
+    parser.add_argument("inputs", nargs="+", help="audio files, folders or globs (quote globs)")
+    parser.add_argument("-o", "--output-dir", default="output/batch")
+    parser.add_argument("-r", "--recursive", action="store_true", help="walk sub-folders / allow ** in globs")
+    parser.add_argument("--transcriber", default=DEFAULT_SETTINGS["transcriber"],
+                        choices=["whisperx", "whisperx-chunked", "stable"])
+    parser.add_argument("--language", default="English", help="language name or code, or Detect")
+    parser.add_argument("--model-size", default=DEFAULT_SETTINGS["model_size"])
+    parser.add_argument("--words-per-subtitle", type=int, default=DEFAULT_SETTINGS["words_per_subtitle"])
+    parser.add_argument("--pause-thre", type=float, default=DEFAULT_SETTINGS["pause_thre"])
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_SETTINGS["max_chars"], help="characters per cue")
+    parser.add_argument("--max-duration", type=float, default=DEFAULT_SETTINGS["max_duration"], help="seconds per cue")
+    parser.add_argument("--max-cps", type=float, default=DEFAULT_SETTINGS["max_cps"],
+                        help="reading speed limit, characters per second")
+    parser.add_argument("--formats", default=",".join(DEFAULT_SETTINGS["formats"]),
+                        help="comma-separated outputs: srt, vtt, ass, json (written next to the .srt)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="files processed at the same time (they share the loaded models, "
+                             "one transcribe call per model at a time)")
+    parser.add_argument("--chunk-workers", type=int, default=1, help="worker processes per whisperx-chunked job")
+    parser.add_argument("--model-budget-mb", type=int, default=None)
+    parser.add_argument("--no-result-cache", action="store_true")
+    parser.add_argument("--force", action="store_true", help="re-run files whose outputs are up to date")
+    args = parser.parse_args(argv)
+
+    settings = {
+        "transcriber": args.transcriber,
+        "language": get_language_code(args.language),
+        "model_size": args.model_size,
+        "words_per_subtitle": args.words_per_subtitle,
+        "pause_thre": args.pause_thre,
+        "max_chars": args.max_chars,
+        "max_duration": args.max_duration,
+        "max_cps": args.max_cps,
+        "formats": [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()],
+    }
+    unknown = [fmt for fmt in settings["formats"] if fmt not in FORMATS]
+    if unknown or not settings["formats"]:
+        parser.error(f"--formats: expected some of {', '.join(FORMATS)}, got {args.formats!r}")
+    if args.model_budget_mb is not None:
+        MODEL_POOL.max_bytes = args.model_budget_mb * 1024 ** 2
+
+    jobs = collect_inputs(args.inputs, args.recursive)
+    if not jobs:
+        print("[Batch] No audio files found")
+        return 1
+
+    results, todo = [], []
+    for audio_path, stem in jobs:
+        paths = job_paths(args.output_dir, stem)
+        if not args.force and is_up_to_date(audio_path, paths, settings):
+            results.append({**read_json(paths["job"]), "status": "skipped"})
+        else:
+            todo.append((audio_path, stem))
+    print(f"[Batch] {len(jobs)} files, {len(jobs) - len(todo)} up to date, {len(todo)} to process "
+          f"on {max(1, args.jobs)} worker(s)")
+
+    pipeline = SubtitlePipeline(chunk_workers=args.chunk_workers, bypass_result_cache=args.no_result_cache)
+    t0 = time.perf_counter()
+    # bounded pool: at most --jobs files in flight, every thread uses the same MODEL_POOL
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(run_job, pipeline, path, stem, settings, args.output_dir) for path, stem in todo]
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            print(f"[Batch] {r['status']}: {r['input']} ({len(results)}/{len(jobs)})")
+    total_wall = time.perf_counter() - t0
+
+    order = {os.path.abspath(path): i for i, (path, _) in enumerate(jobs)}
+    results.sort(key=lambda r: order.get(os.path.abspath(r["input"]), 0))
+    atomic_write_json(os.path.join(args.output_dir, "batch_summary.json"), {
+        "settings": settings, "wall_sec": round(total_wall, 3), "jobs": results,
+    })
+    print_summary(results, total_wall)
+    return 1 if any(r["status"] == "failed" for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Preview subtitle lookup: full scan per tick (what _update_subtitle did) vs utils.cue_index.CueIndex.
+
+    python benchmarks/bench_cue_index.py                  # 2 h of one-word cues
+    python benchmarks/bench_cue_index.py --hours 6 --check
+
+Simulates the preview: a tick every 200 ms through the whole file, plus random seeks and
+"cues in [t0, t1]" window queries. Every answer is checked against the full scan, on the
+benchmark track and on random tracks with overlaps, zero-length cues and a few very long
+cues (--check runs only those checks).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.cue_index import CueIndex
+
+
+def scan_at(start, end, t):
+    """_update_subtitle before the index: every cue compared on every tick."""
+    hit = np.flatnonzero((start <= t) & (t <= end))
+    return int(hit[0]) if len(hit) else None
+
+
+def scan_between(start, end, t0, t1):
+    return np.flatnonzero((start <= t1) & (end >= t0))
+
+
+def make_track(hours, seed=0, overlap=0.02, n_long=3):
+    """One-word cues (0.1-0.6 s, short gaps), some overlapping the next, a few long cues."""
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 / 0.45)
+    dur = rng.uniform(0.1, 0.6, n)
+    gap = rng.choice([0.0, 0.05, 0.1, 0.3], n)
+    start = np.cumsum(np.r_[0.0, (dur + gap)[:-1]])
+    end = start + dur
+    bump = rng.random(n) < overlap
+    end[bump] += rng.uniform(0.1, 2.0, bump.sum())
+    for _ in range(n_long):  # title cards / music notes over minutes
+        a = rng.uniform(0, start[-1])
+        start = np.r_[start, a]
+        end = np.r_[end, a + rng.uniform(60, 1200)]
+    return start, end
+
+
+def playback_times(duration, rng, seeks=200):
+    """200 ms ticks with a seek (anywhere, forward or back) every now and then."""
+    times, t = [], 0.0
+    seek_at = set(rng.sample(range(int(duration / 0.2)), seeks))
+    for k in range(int(duration / 0.2)):
+        t = rng.uniform(0, duration) if k in seek_at else t + 0.2
+        times.append(min(t, duration))
+    return times
+
+
+def check(start, end, times, windows):
+    index = CueIndex(start, end)
+    for t in times:
+        hits = np.flatnonzero((start <= t) & (t <= end)).tolist()
+        if index.at(t) != (hits[0] if hits else None) or index.active(t) != hits:
+            return f"at / active({t})"
+    for t0, t1 in windows:
+        if not np.array_equal(index.between(t0, t1), scan_between(start, end, t0, t1)):
+            return f"between({t0}, {t1})"
+    return None
+
+
+def check_fuzz(n, seed=0):
+    rng = random.Random(seed)
+    failed = 0
+    for k in range(n):
+        m = rng.randint(0, 60)
+        nprng = np.random.default_rng(rng.randrange(1 << 30))
+        start = np.round(nprng.uniform(0, 30, m), 1)  # ties and shared edges on purpose
+        end = start + np.round(nprng.choice([0.0, 0.1, 0.5, 2.0, 25.0], m), 1)
+        times = [round(rng.uniform(-1, 32), 1) for _ in range(80)]
+        times[rng.randrange(80):] = sorted(times[rng.randrange(80):])  # some forward playback
+        windows = [tuple(sorted((round(rng.uniform(-1, 32), 1), round(rng.uniform(-1, 32), 1)))) for _ in range(20)]
+        problem = check(start, end, times, windows)
+        if problem:
+            failed += 1
+            if failed <= 3:
+                print(f"FAIL fuzz #{k}: {problem}")
+    print(f"fuzz: {n - failed}/{n} ok")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--check", action="store_true", help="only run the parity checks")
+    parser.add_argument("--fuzz", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    start, end = make_track(args.hours)
+    duration = float(end.max())
+    times = playback_times(duration, rng)
+    windows = [(t, t + rng.uniform(1, 60)) for t in (rng.uniform(0, duration) for _ in range(500))]
+    print(f"{len(start)} cues, {args.hours:g} h, {len(times)} ticks, {len(windows)} window queries")
+
+    problem = check(start, end, times, windows)
+    print(f"parity with the full scan: {'ok' if problem is None else 'MISMATCH at ' + problem}")
+    failed = (problem is not None) + check_fuzz(args.fuzz)
+    if args.check or failed:
+        return 1 if failed else 0
+
+    t0 = time.perf_counter()
+    for t in times:
+        scan_at(start, end, t)
+    scan_ms = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    index = CueIndex(start, end)
+    build_ms = (time.perf_counter() - t0) * 1000.0
+    t0 = time.perf_counter()
+    for t in times:
+        index.at(t)
+    index_ms = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    for a, b in windows:
+        scan_between(start, end, a, b)
+    scan_win_ms = (time.perf_counter() - t0) * 1000.0
+    t0 = time.perf_counter()
+    for a, b in windows:
+        index.between(a, b)
+    index_win_ms = (time.perf_counter() - t0) * 1000.0
+
+    print(f"{'full scan per tick':<28}{scan_ms:9.1f} ms  ({scan_ms / len(times) * 1000:.1f} us / tick)")
+    print(f"{'CueIndex.at per tick':<28}{index_ms:9.1f} ms  ({index_ms / len(times) * 1000:.1f} us / tick), "
+          f"build {build_ms:.1f} ms")
+    print(f"{'full scan [t0, t1]':<28}{scan_win_ms:9.1f} ms")
+    print(f"{'CueIndex.between':<28}{index_win_ms:9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Cue segmenter (utils.cue_segmenter) on a million words, plus parity with the grouping loops
+it replaced.
+
+    python benchmarks/bench_cue_segmenter.py               # 1M synthetic words
+    python benchmarks/bench_cue_segmenter.py --check       # parity + fuzz only, no timing
+    python benchmarks/bench_cue_segmenter.py --words 200000 --fuzz 2000
+
+Parity (exact cues, float times, no formatting in between):
+  group_ids      WordStore.group_ids (N words + pause, NaN words)  vs  CueRules(max_words, pause_thre)
+  export_srt     the old per-segment Exporter.export_srt loop      vs  CueRules(..., split_segments=True)
+  n_words        write_srt_n_words / the old SrtStreamWriter        vs  CueRules(max_words)
+Fuzz: random words and random mixes of every limit against a plain word-by-word greedy
+loop, and SrtStreamWriter fed one segment at a time against Exporter.export_words on the
+whole transcript (the streamed file must come out byte-identical).
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from exporters.exporter import Exporter, SrtStreamWriter
+from utils.cue_segmenter import CueRules, cue_starts
+from utils.word_store import WordStore
+
+NAN = float("nan")
+
+
+# ---- the loops this replaced (grouping logic copied, writing replaced by append) -----------
+
+def legacy_group_ids(store, words_per_subtitle=1, pause_thre=None):
+    """WordStore.group_ids before the segmenter."""
+    n = len(store)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    pos = np.arange(n)
+    run_start = np.zeros(n, dtype=bool)
+    run_start[0] = True
+    if pause_thre is not None:
+        prev_end = np.fmax.accumulate(store.end)[:-1]
+        with np.errstate(invalid="ignore"):
+            run_start[1:] = (store.start[1:] - prev_end) > pause_thre
+    first = np.maximum.accumulate(np.where(run_start, pos, 0))
+    new_cue = (pos - first) % max(1, words_per_subtitle) == 0
+    return np.cumsum(new_cue) - 1
+
+
+def legacy_export_srt(segments, words_per_subtitle, pause_thre):
+    """Exporter.export_srt's per-segment loop."""
+    cues = []
+    for segment in segments:
+        words = segment.get("words", [])
+        if not words:
+            continue
+        group_start = group_end = prev_end = None
+        group_text = []
+        for word in words:
+            start, end, text = word["start"], word["end"], word["word"]
+            if group_start is None:
+                group_start = start
+            if prev_end is not None and (start - prev_end) > pause_thre:
+                if group_text:
+                    cues.append((group_start, prev_end, " ".join(group_text)))
+                    group_text = []
+                    group_start = start
+            group_text.append(text)
+            group_end = end
+            prev_end = end
+            if len(group_text) >= words_per_subtitle:
+                cues.append((group_start, group_end, " ".join(group_text)))
+                group_text = []
+                group_start = None
+        if group_text:
+            cues.append((group_start, group_end, " ".join(group_text)))
+    return cues
+
+
+def legacy_n_words(segments, words_per_subtitle):
+    """write_srt_n_words (and the old SrtStreamWriter): N words per cue across segments."""
+    all_w = [w for seg in segments for w in seg["words"]]
+    return [(chunk[0]["start"], chunk[-1]["end"], " ".join(w["word"] for w in chunk))
+            for chunk in (all_w[i:i + words_per_subtitle] for i in range(0, len(all_w), words_per_subtitle))]
+
+
+def reference_starts(start, end, chars, rules, breaks=None):
+    """Word-by-word greedy loop: grow the cue while the next word keeps every limit."""
+    n = len(start)
+    brk = [False] * n if breaks is None else list(breaks)
+    last, running = [], -np.inf
+    for e in end:
+        running = running if np.isnan(e) else max(running, e)
+        last.append(running)
+    if rules.pause_thre is not None:
+        for k in range(1, n):
+            # nothing aligned before: no pause (NaN gap, same as the old group_ids)
+            brk[k] = brk[k] or bool(last[k - 1] > -np.inf and start[k] - last[k - 1] > rules.pause_thre)
+    first_idx, nxt = [n] * n, n
+    for k in range(n - 1, -1, -1):
+        nxt = k if not np.isnan(start[k]) else nxt
+        first_idx[k] = nxt
+    first = [start[k] if k < n else np.inf for k in first_idx]
+
+    def fits(i, j):  # cue = words i .. j-1
+        length = sum(chars[i:j]) + (j - i - 1)
+        if brk[j - 1] or (rules.max_words and j - i > rules.max_words):
+            return False
+        if rules.max_chars is not None and length > rules.max_chars:
+            return False
+        if rules.max_duration is not None and last[j - 1] > first[i] + rules.max_duration:
+            return False
+        if rules.max_cps and first_idx[i] < j and length > rules.max_cps * (last[j - 1] - first[i]):
+            return False
+        return True
+
+    starts, i = [], 0
+    while i < n:
+        starts.append(i)
+        j = i + 1
+        while j < n and fits(i, j + 1):
+            j += 1
+        i = j
+    return starts
+
+
+# ---- data ---------------------------------------------------------------------------------
+
+def make_words(n, seed=0, unaligned=0.0):
+    """Segments of 3-30 words, 1-12 chars, 0.1-0.6 s long, mostly short gaps."""
+    rng = np.random.default_rng(seed)
+    dur = rng.uniform(0.1, 0.6, n)
+    gap = rng.choice([0.0, 0.02, 0.08, 0.3, 1.2], n, p=[0.3, 0.3, 0.2, 0.15, 0.05])
+    start = np.cumsum(np.r_[0.0, (dur + gap)[:-1]])
+    end = start + dur
+    lengths = rng.integers(1, 13, n)
+    lost = rng.random(n) < unaligned
+    segments, k = [], 0
+    while k < n:
+        size = int(rng.integers(3, 31))
+        words = []
+        for i in range(k, min(n, k + size)):
+            w = {"word": "x" * int(lengths[i])}
+            if not lost[i]:
+                w["start"], w["end"] = float(start[i]), float(end[i])
+            words.append(w)
+        segments.append({"words": words})
+        k += size
+    return segments
+
+
+def random_rules(rng):
+    return CueRules(
+        max_words=rng.choice([None, 1, 2, 3, 7]),
+        max_chars=rng.choice([None, 1, 5, 12, 42]),
+        pause_thre=rng.choice([None, 0.0, 0.05, 0.5]),
+        max_duration=rng.choice([None, 0.3, 1.0, 3.0]),
+        max_cps=rng.choice([None, 5.0, 17.0, 25.0, 80.0]),  # 80: cues longer than the cps window
+        split_segments=rng.random() < 0.3,
+    )
+
+
+def as_tuples(track):
+    return list(zip(track.start.tolist(), track.end.tolist(), track.texts))
+
+
+def same_cues(a, b):
+    return len(a) == len(b) and all(
+        abs(x[0] - y[0]) < 1e-9 and abs(x[1] - y[1]) < 1e-9 and x[2] == y[2] for x, y in zip(a, b))
+
+
+# ---- checks -------------------------------------------------------------------------------
+
+def check_parity(n_words):
+    failed = 0
+    store = WordStore.from_segments(make_words(n_words, seed=1, unaligned=0.03))
+    for wps, pause in ((1, None), (3, None), (3, 0.25), (8, 0.0), (5, 1.0)):
+        ids = legacy_group_ids(store, wps, pause)
+        want = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        got = store.cue_starts(CueRules(max_words=wps, pause_thre=pause))
+        ok = np.array_equal(want, got)
+        failed += not ok
+        print(f"parity group_ids  words={wps} pause={pause}: {'ok' if ok else 'MISMATCH'} ({len(got)} cues)")
+
+    segments = make_words(n_words, seed=2)
+    store = WordStore.from_segments(segments)
+    for wps, pause in ((1, 0.1), (4, 0.25), (10, 0.05)):
+        want = legacy_export_srt(segments, wps, pause)
+        got = as_tuples(store.to_track(CueRules(max_words=wps, pause_thre=pause, split_segments=True)))
+        ok = same_cues(want, got)
+        failed += not ok
+        print(f"parity export_srt words={wps} pause={pause}: {'ok' if ok else 'MISMATCH'} ({len(got)} cues)")
+    for wps in (1, 3, 6):
+        want = legacy_n_words(segments, wps)
+        got = as_tuples(store.to_track(CueRules(max_words=wps)))
+        ok = same_cues(want, got)
+        failed += not ok
+        print(f"parity n_words    words={wps}: {'ok' if ok else 'MISMATCH'} ({len(got)} cues)")
+    return failed
+
+
+def check_fuzz(n, seed=0):
+    rng = random.Random(seed)
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for k in range(n):
+            segments = make_words(rng.randint(0, 90), seed=rng.randrange(1 << 30), unaligned=rng.choice([0.0, 0.2]))
+            rules = random_rules(rng)
+            store = WordStore.from_segments(segments)
+            chars = np.char.str_len(store.words) if len(store) else np.zeros(0, int)
+            breaks = np.r_[True, store.segment[1:] != store.segment[:-1]] if rules.split_segments and len(store) else None
+            want = reference_starts(store.start.tolist(), store.end.tolist(), chars.tolist(), rules, breaks)
+            got = store.cue_starts(rules).tolist()
+            if got != want:
+                failed += 1
+                if failed <= 3:
+                    print(f"FAIL fuzz #{k} {rules}: {got} != {want}")
+                continue
+
+            # streaming writer, one segment at a time == one-shot export of the whole thing
+            rules.split_segments = False
+            whole, streamed = os.path.join(tmp, "whole.srt"), os.path.join(tmp, "streamed.srt")
+            with contextlib.redirect_stdout(io.StringIO()):
+                Exporter.export_words(segments, whole, rules)
+                with SrtStreamWriter(streamed, rules) as writer:
+                    for seg in segments:
+                        writer.add_segments([seg])
+            with open(whole, encoding="utf-8") as a, open(streamed, encoding="utf-8") as b:
+                if a.read() != b.read():
+                    failed += 1
+                    if failed <= 3:
+                        print(f"FAIL fuzz #{k} {rules}: streamed SRT differs")
+    print(f"fuzz: {n - failed}/{n} ok")
+    return failed
+
+
+# ---- benchmark ----------------------------------------------------------------------------
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, (time.perf_counter() - t0) * 1000.0
+
+
+def bench(n_words):
+    segments = make_words(n_words, seed=3)
+    store, build_ms = timed(WordStore.from_segments, segments)
+    chars = np.char.str_len(store.vocab)[store.word_id]
+    print(f"{n_words} words in {len(segments)} segments (WordStore.from_segments {build_ms:.0f} ms)")
+
+    _, ms = timed(legacy_export_srt, segments, 3, 0.25)
+    print(f"{'legacy export_srt loop (3 words, pause)':<46}{ms:9.1f} ms")
+    _, ms = timed(legacy_n_words, segments, 3)
+    print(f"{'legacy write_srt_n_words grouping (3 words)':<46}{ms:9.1f} ms")
+    _, ms = timed(legacy_group_ids, store, 3, 0.25)
+    print(f"{'legacy WordStore.group_ids (3 words, pause)':<46}{ms:9.1f} ms")
+
+    mixes = [
+        ("words + pause", CueRules(max_words=3, pause_thre=0.25)),
+        ("words + pause + segments", CueRules(max_words=3, pause_thre=0.25, split_segments=True)),
+        ("max_chars 42", CueRules(max_chars=42)),
+        ("max_duration 3 s", CueRules(max_duration=3.0)),
+        ("max_cps 17", CueRules(max_cps=17.0)),
+        ("max_cps 17 + max_chars 42", CueRules(max_cps=17.0, max_chars=42)),
+        ("all limits", CueRules(max_words=12, max_chars=42, pause_thre=0.5, max_duration=6.0, max_cps=17.0)),
+    ]
+    for name, rules in mixes:
+        starts, ms = timed(cue_starts, store.start, store.end, rules, chars=chars,
+                           breaks=np.r_[True, store.segment[1:] != store.segment[:-1]] if rules.split_segments else None)
+        print(f"{'cue_starts ' + name:<46}{ms:9.1f} ms  -> {len(starts)} cues")
+    track, ms = timed(store.to_track, mixes[-1][1])
+    print(f"{'WordStore.to_track all limits (with texts)':<46}{ms:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=1_000_000)
+    parser.add_argument("--check", action="store_true", help="only run the parity + fuzz checks")
+    parser.add_argument("--fuzz", type=int, default=1000, help="fuzz iterations")
+    args = parser.parse_args()
+
+    failed = check_parity(min(args.words, 200_000)) + check_fuzz(args.fuzz)
+    if args.check or failed:
+        return 1 if failed else 0
+    bench(args.words)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
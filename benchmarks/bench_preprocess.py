@@ -0,0 +1,91 @@
+"""
+Wall time + peak RSS of the preprocessing backends.
+
+    python benchmarks/bench_preprocess.py                 # synthesizes a 1 hour 44.1kHz stereo wav
+    python benchmarks/bench_preprocess.py --input my.wav --backends numpy stream sox
+
+Each backend runs in its own child process so peak RSS isn't polluted by the other run.
+The sox numbers include the sox subprocesses (RUSAGE_CHILDREN).
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+def make_test_wav(path, seconds, sr=44100, channels=2):
+    """Tone bursts over a noise floor, written in 60s pieces so this script stays small."""
+    rng = np.random.default_rng(0)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        for start in range(0, int(seconds), 60):
+            n = int(min(60, seconds - start) * sr)
+            t = (np.arange(n) + start * sr) / sr
+            speech = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.25 * t) > 0)
+            noise = 0.02 * rng.standard_normal(n)
+            mono = (speech + noise).astype(np.float32)
+            frames = np.repeat(mono[:, None], channels, axis=1)
+            wf.writeframes((np.clip(frames, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, kids) / 1024.0
+
+
+def run_one(backend, input_file, output_file):
+    from preprocessors.audio_preprocessor import AudioPreprocessor
+    t0 = time.perf_counter()
+    AudioPreprocessor(backend=backend).process(input_file, output_file)
+    wall = time.perf_counter() - t0
+    print(json.dumps({"backend": backend, "wall_s": wall, "peak_rss_mb": _peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="wav to preprocess (default: synthesize one)")
+    parser.add_argument("--seconds", type=float, default=3600, help="length of the synthesized file")
+    parser.add_argument("--backends", nargs="+", default=["numpy", "stream", "sox"])
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.makedirs("output", exist_ok=True)
+    if args.run_one:
+        run_one(args.run_one, args.input, f"output/bench_{args.run_one}.wav")
+        return
+
+    input_file = args.input
+    if input_file is None:
+        input_file = "output/bench_input.wav"
+        if not os.path.exists(input_file):
+            print(f"Synthesizing {args.seconds:.0f}s test file -> {input_file}")
+            make_test_wav(input_file, args.seconds)
+
+    print(f"{'backend':<10}{'wall (s)':>12}{'peak RSS (MB)':>16}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--run-one", backend, "--input", input_file],
+            capture_output=True, text=True
+        )
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{backend:<10}{'failed':>12}   {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        res = json.loads(lines[-1])
+        print(f"{backend:<10}{res['wall_s']:>12.2f}{res['peak_rss_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
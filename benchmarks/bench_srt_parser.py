@@ -0,0 +1,265 @@
+"""
+Streaming SRT / VTT parser (srt_utils.iter_cues / read_srt) vs the old read-all-and-split read_srt.
+
+    python benchmarks/bench_srt_parser.py                   # 1M-cue SRT, wall + peak RSS
+    python benchmarks/bench_srt_parser.py --check           # regression cases + fuzz, no timing
+    python benchmarks/bench_srt_parser.py --cues 200000 --fuzz 5000
+
+--check runs the regression table (CRLF, BOM, WebVTT, blank lines inside cues, malformed
+blocks with their line numbers) and a seeded fuzz pass: random well-formed files in random
+dialects must parse back exactly, and randomly damaged files must never raise anything but
+SrtParseError (strict), must report line numbers inside the file and must parse the same
+when the handle returns a few characters per read.
+Each parser runs in its own child process so peak RSS isn't shared.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.srt_utils import SrtParseError, format_timestamp, iter_cues, read_srt
+
+
+def legacy_read_srt(file_path):
+    """read_srt as it was before the streaming parser (kept here for comparison)."""
+    subs = []
+    with open(file_path, encoding="utf-8") as f:
+        content = f.read().strip()
+    for block in content.split("\n\n"):
+        lines = block.splitlines()
+        if len(lines) < 3:
+            continue
+        idx = lines[0].strip()
+        times = lines[1]
+        start, end = [t.strip() for t in times.split("-->")]
+        text = " ".join(lines[2:]).strip()
+        subs.append({"index": idx, "start": start, "end": end, "text": text})
+    return subs
+
+
+# ---- regression cases ---------------------------------------------------------------------
+
+A = ("00:00:01,000", "00:00:02,000")
+B = ("00:00:03,000", "00:00:04,500")
+
+CASES = [
+    # name, file content, [(start, end, text)], [error lines]
+    ("plain", "1\n00:00:01,000 --> 00:00:02,000\nhi\n\n2\n00:00:03,000 --> 00:00:04,500\nyo\n",
+     [A + ("hi",), B + ("yo",)], []),
+    ("crlf + bom", "﻿1\r\n00:00:01,000 --> 00:00:02,000\r\nhi\r\n\r\n2\r\n00:00:03,000 --> 00:00:04,500\r\nyo\r\n",
+     [A + ("hi",), B + ("yo",)], []),
+    ("no trailing newline", "1\n00:00:01,000 --> 00:00:02,000\nhi", [A + ("hi",)], []),
+    ("multi-line text", "1\n00:00:01,000 --> 00:00:02,000\nhi\nthere\n", [A + ("hi there",)], []),
+    ("blank line inside cue", "1\n00:00:01,000 --> 00:00:02,000\nhi\n\nthere\n\n2\n00:00:03,000 --> 00:00:04,500\nyo\n",
+     [A + ("hi there",), B + ("yo",)], []),
+    ("blank line then digit text", "1\n00:00:01,000 --> 00:00:02,000\nhi\n\n42\nmore\n",
+     [A + ("hi 42 more",)], []),
+    ("extra blank lines", "\n\n1\n00:00:01,000 --> 00:00:02,000\nhi\n\n\n\n2\n00:00:03,000 --> 00:00:04,500\nyo\n\n\n",
+     [A + ("hi",), B + ("yo",)], []),
+    ("missing ids", "00:00:01,000 --> 00:00:02,000\nhi\n\n00:00:03,000 --> 00:00:04,500\nyo\n",
+     [A + ("hi",), B + ("yo",)], []),
+    ("empty cue", "1\n00:00:01,000 --> 00:00:02,000\n\n2\n00:00:03,000 --> 00:00:04,500\nyo\n",
+     [A + ("",), B + ("yo",)], []),
+    ("webvtt", "WEBVTT - demo\nKind: captions\n\nNOTE a comment\nstill comment\n\nSTYLE\n::cue { color: red }\n\n"
+               "intro\n00:01.000 --> 00:02.000 align:start\nhi\n\n00:00:03.000 --> 00:00:04.500\nyo\n",
+     [A + ("hi",), B + ("yo",)], []),
+    ("text without timing", "junk\nmore\n\n1\n00:00:01,000 --> 00:00:02,000\nhi\n", [A + ("hi",)], [1]),
+    ("bad timestamp", "1\n00:00:01,000 --> 00:61:02,000\nhi\n\n2\n00:00:03,000 --> 00:00:04,500\nyo\n",
+     [B + ("yo",)], [2]),
+    ("end before start", "1\n00:00:02,000 --> 00:00:01,000\nhi\n\n2\n00:00:03,000 --> 00:00:04,500\nyo\n",
+     [B + ("yo",)], [2]),
+    ("arrow in text", "1\n00:00:01,000 --> 00:00:02,000\nhi\na --> b\n", [A + ("hi a --> b",)], []),
+    ("dangling index", "1\n00:00:01,000 --> 00:00:02,000\nhi\n\n2\n", [A + ("hi",)], [5]),
+    ("one-digit vtt hours", "WEBVTT\n\n0:00:01.000 --> 0:00:02.000\nhi\n", [A + ("hi",)], []),
+    ("100+ hours", "1\n100:00:01,000 --> 100:00:02,000\nhi\n\n2\n00:00:03,000 --> 00:00:04,500\nyo\n",
+     [B + ("yo",)], [2]),
+]
+
+
+class ShortReads(io.StringIO):
+    """read() hands back only a few characters at a time, to put chunk boundaries everywhere."""
+
+    def __init__(self, text, rng):
+        super().__init__(text, newline="")
+        self.rng = rng
+
+    def read(self, size=-1):
+        return super().read(self.rng.randint(1, 7))
+
+
+def parse_text(text, strict=False, rng=None):
+    errors = []
+    f = ShortReads(text, rng) if rng is not None else io.StringIO(text, newline="")
+    cues = [(c["start"], c["end"], c["text"]) for c in iter_cues(f, strict, errors)]
+    return cues, [e.line for e in errors]
+
+
+def check_cases():
+    failed = 0
+    for name, text, want_cues, want_errors in CASES:
+        cues, errors = parse_text(text)
+        if cues != want_cues or errors != want_errors:
+            failed += 1
+            print(f"FAIL {name}: cues {cues} errors {errors}")
+        strict_ok = not want_errors
+        try:
+            parse_text(text, strict=True)
+            raised = False
+        except SrtParseError:
+            raised = True
+        if raised == strict_ok:
+            failed += 1
+            print(f"FAIL {name}: strict mode {'raised' if raised else 'did not raise'}")
+    print(f"regression: {len(CASES) - failed}/{len(CASES)} cases ok" if not failed else f"regression: {failed} failures")
+    return failed
+
+
+# ---- fuzz ---------------------------------------------------------------------------------
+
+def random_file(rng):
+    """A well-formed file in a random dialect plus the cues it must parse to."""
+    vtt, crlf, bom, ids = rng.random() < 0.3, rng.random() < 0.5, rng.random() < 0.2, rng.random() < 0.8
+    t, cues, blocks = 0.0, [], []
+    for i in range(rng.randint(0, 30)):
+        t += rng.uniform(0, 5)
+        start, end = t, t + rng.uniform(0, 5)
+        t = end
+        s, e = format_timestamp(start), format_timestamp(end)
+        lines = [" ".join(rng.choice(["word", "ça", "🎵", "-->x", "12", "<i>it</i>"]) for _ in range(rng.randint(1, 4)))
+                 for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.1 and len(lines) > 1:
+            # blank line inside the cue (the line after it can't look like a timing line
+            # or a cue id)
+            lines[1] = lines[1].replace("-->", "->") + " word"
+            lines.insert(1, "")
+        timing = f"{s} --> {e}"
+        if vtt:
+            timing = timing.replace(",", ".") + (" line:0" if rng.random() < 0.2 else "")
+        blocks.append(([str(i + 1)] if ids else []) + [timing] + lines)
+        cues.append((s, e, " ".join(l for l in lines if l)))
+    sep = "\r\n" if crlf else "\n"
+    body = (sep * rng.randint(2, 3)).join(sep.join(b) for b in blocks)
+    text = ("﻿" if bom else "") + ("WEBVTT" + sep * 2 if vtt else "") + body + sep * rng.randint(0, 2)
+    return text, cues
+
+
+def damage(rng, text):
+    lines = text.split("\n")
+    for _ in range(rng.randint(1, 5)):
+        i = rng.randrange(len(lines))
+        op = rng.random()
+        if op < 0.3:
+            del lines[i]
+        elif op < 0.5:
+            lines.insert(i, lines[i])
+        elif op < 0.8 and lines[i]:
+            j = rng.randrange(len(lines[i]))
+            lines[i] = lines[i][:j] + rng.choice(["9", ":", ",", "", "-->", "\x00"]) + lines[i][j + 1:]
+        else:
+            lines.insert(i, "")
+        if not lines:
+            lines = [""]
+    return "\n".join(lines)
+
+
+def check_fuzz(n, seed=0):
+    rng = random.Random(seed)
+    failed = 0
+    for k in range(n):
+        text, want = random_file(rng)
+        got, errors = parse_text(text)
+        if got != want or errors:
+            failed += 1
+            if failed <= 3:
+                print(f"FAIL fuzz #{k} (clean): errors {errors}\n{text!r}")
+        broken = damage(rng, text)
+        n_lines = broken.count("\n") + 1
+        try:
+            got, errors = parse_text(broken)
+            if any(not 1 <= line <= n_lines for line in errors):
+                raise AssertionError(f"error line out of range: {errors}")
+            if parse_text(broken, rng=rng) != (got, errors):
+                raise AssertionError("different result when read in tiny chunks")
+            try:
+                parse_text(broken, strict=True)
+            except SrtParseError:
+                pass
+        except Exception as e:
+            failed += 1
+            if failed <= 3:
+                print(f"FAIL fuzz #{k} (damaged): {type(e).__name__}: {e}\n{broken!r}")
+    print(f"fuzz: {n - failed}/{n} ok")
+    return failed
+
+
+# ---- benchmark ----------------------------------------------------------------------------
+
+def make_srt(path, n):
+    # word-level cues every 0.3 s: a million of them is ~83 hours, still two hour digits
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(f"{i + 1}\n{format_timestamp(i * 0.3)} --> {format_timestamp(i * 0.3 + 0.25)}\n"
+                    f"subtitle number {i}\nsecond line\n\n")
+
+
+def run_one(parser_name, path):
+    t0 = time.perf_counter()
+    if parser_name == "legacy":
+        n = len(legacy_read_srt(path))
+    elif parser_name == "read_srt":
+        n = len(read_srt(path))
+    else:  # stream: count cues without building the list
+        with open(path, encoding="utf-8-sig") as f:
+            n = sum(1 for _ in iter_cues(f))
+    wall = time.perf_counter() - t0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print(json.dumps({"parser": parser_name, "cues": n, "wall_s": wall, "peak_rss_mb": rss}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cues", type=int, default=1_000_000)
+    parser.add_argument("--input", help="SRT to parse (default: synthesize one)")
+    parser.add_argument("--check", action="store_true", help="only run the regression + fuzz checks")
+    parser.add_argument("--fuzz", type=int, default=2000, help="fuzz iterations")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args.run_one, args.input)
+        return 0
+
+    failed = check_cases() + check_fuzz(args.fuzz)
+    if args.check or failed:
+        return 1 if failed else 0
+
+    os.makedirs("output", exist_ok=True)
+    input_file = args.input
+    if input_file is None:
+        input_file = f"output/bench_{args.cues}_cues.srt"
+        if not os.path.exists(input_file):
+            print(f"Writing {args.cues} cues -> {input_file}")
+            make_srt(input_file, args.cues)
+
+    print(f"{'parser':<10}{'cues':>10}{'wall (s)':>12}{'peak RSS (MB)':>16}")
+    for name in ("legacy", "read_srt", "stream"):
+        proc = subprocess.run([sys.executable, __file__, "--run-one", name, "--input", input_file],
+                              capture_output=True, text=True)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{name:<10}{'failed':>10}   {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        res = json.loads(lines[-1])
+        print(f"{name:<10}{res['cues']:>10}{res['wall_s']:>12.2f}{res['peak_rss_mb']:>16.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+smooth_srt (list of dicts with "HH:MM:SS,mmm" strings) vs SubtitleTrack (float64 arrays).
+
+    python benchmarks/bench_subtitle_track.py              # 100k synthetic cues
+    python benchmarks/bench_subtitle_track.py --cues 1000000
+
+Both sides get the same read_srt-style cue dicts. The track timings are split into
+parse (from_cues), smooth (merge-by-gap + min-duration) and format (to_cues), and the
+smoothed output is checked cue for cue against smooth_srt: same texts, times within 1 ms
+(both round to the nearest ms now; format_timestamp used to truncate, 2.698 + 0.5 -> 03,197).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.srt_utils import format_timestamp, smooth_srt
+from utils.subtitle_track import SubtitleTrack
+
+
+def make_cues(n, seed=0):
+    """Word-ish cues: 0.1-0.6 s long, gaps of 0-0.3 s, so plenty of them merge."""
+    rng = np.random.default_rng(seed)
+    dur = rng.uniform(0.1, 0.6, n)
+    gap = rng.choice([0.0, 0.05, 0.15, 0.3], n)
+    start = np.cumsum(np.r_[0.0, (dur + gap)[:-1]])
+    end = start + dur
+    return [{"index": str(i + 1), "start": format_timestamp(s), "end": format_timestamp(e), "text": f"w{i}"}
+            for i, (s, e) in enumerate(zip(start.tolist(), end.tolist()))]
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cues", type=int, default=100_000)
+    args = parser.parse_args()
+
+    cues = make_cues(args.cues)
+    print(f"{args.cues} cues")
+
+    ref, ref_ms = timed(smooth_srt, cues, min_gap=0.1, min_duration=0.5)
+    print(f"smooth_srt              {ref_ms:9.1f} ms  -> {len(ref)} cues")
+
+    track, parse_ms = timed(SubtitleTrack.from_cues, cues)
+    smoothed, smooth_ms = timed(track.smooth, min_gap=0.1, min_duration=0.5)
+    out, format_ms = timed(smoothed.to_cues)
+    print(f"SubtitleTrack parse     {parse_ms:9.1f} ms")
+    print(f"SubtitleTrack smooth    {smooth_ms:9.1f} ms  -> {len(smoothed)} cues")
+    print(f"SubtitleTrack format    {format_ms:9.1f} ms")
+    print(f"SubtitleTrack total     {parse_ms + smooth_ms + format_ms:9.1f} ms")
+
+    _, shift_ms = timed(track.shift, 1.5)
+    _, scale_ms = timed(track.scale, 25 / 23.976)
+    _, repair_ms = timed(track.repair_overlaps, 0.05)
+    print(f"shift / scale / repair  {shift_ms:.2f} / {scale_ms:.2f} / {repair_ms:.2f} ms")
+
+    if not ref and cues:
+        print("parity: skipped, smooth_srt returned no cues (its timestamp regex rejects every cue)")
+        return 0
+    want = SubtitleTrack.from_cues(ref)
+    if len(want) != len(smoothed):
+        print(f"parity: MISMATCH ({len(smoothed)} vs {len(want)} cues)")
+        return 1
+    err = max(np.abs(smoothed.start - want.start).max(), np.abs(smoothed.end - want.end).max(), 0.0)
+    texts_ok = smoothed.texts == want.texts
+    print(f"parity: {len(want)} cues, texts {'identical' if texts_ok else 'DIFFER'}, max time diff {err * 1000:.1f} ms")
+    return 0 if texts_ok and err <= 0.0011 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Subtitle writers: the old per-cue f.write loops vs exporters.subtitle_writer (one pass,
+every format, buffered, atomic).
+
+    python benchmarks/bench_subtitle_writer.py             # 100k cues
+    python benchmarks/bench_subtitle_writer.py --cues 1000000
+
+Rows:
+  legacy re_export_srt     format_timestamp per cue + three f.write calls per cue
+  legacy export_track      vectorized timestamps, one join (what export_track did before)
+  writer srt / srt+vtt+json / all four
+Checks (also run with --check): the new SRT is byte-identical to the old export_track
+output, the VTT parses back (read_srt) to the same cues, ASS lines carry the same times at
+centisecond precision and with braces escaped, the JSON loads back to the same cues and words.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from exporters.subtitle_writer import render, write_subtitles
+from utils.srt_utils import format_timestamp, read_srt
+from utils.subtitle_track import SubtitleTrack, format_timestamps
+from utils.word_store import WordStore
+
+
+def legacy_re_export_srt(subtitles, output_srt_file):
+    """Exporter.re_export_srt before the writer (string cues in)."""
+    with open(output_srt_file, "w", encoding="utf-8") as f:
+        for i, sub in enumerate(subtitles, start=1):
+            f.write(f"{i}\n")
+            f.write(f"{sub['start']} --> {sub['end']}\n")
+            f.write(f"{sub['text']}\n\n")
+
+
+def legacy_export_track(track, output_srt_file):
+    """Exporter.export_track before the writer."""
+    starts, ends = format_timestamps(track.start), format_timestamps(track.end)
+    with open(output_srt_file, "w", encoding="utf-8") as f:
+        f.write("".join(
+            f"{i}\n{s} --> {e}\n{t}\n\n"
+            for i, (s, e, t) in enumerate(zip(starts, ends, track.texts), start=1)
+        ))
+
+
+def make_track(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dur = rng.uniform(0.3, 3.0, n)
+    start = np.cumsum(np.r_[0.0, (dur + rng.uniform(0.0, 0.5, n))[:-1]])
+    texts = [f"subtitle {i} ça va" if i % 7 else f"two\nlines {i}" for i in range(n)]
+    return SubtitleTrack(start, start + dur, texts)
+
+
+def make_words(track):
+    n = len(track)
+    return WordStore(track.start, track.end, np.full(n, 0.9, np.float32), np.arange(n) % 50, np.arange(n),
+                     [f"w{k}" for k in range(50)])
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, (time.perf_counter() - t0) * 1000.0
+
+
+def check(track, folder):
+    failed = 0
+    words = make_words(track)
+    old = os.path.join(folder, "old.srt")
+    legacy_export_track(track, old)
+    paths = write_subtitles(track, os.path.join(folder, "new.srt"), ("srt", "vtt", "ass", "json"), words)
+
+    with open(old, encoding="utf-8", newline="") as a, open(paths["srt"], encoding="utf-8", newline="") as b:
+        ok = a.read() == b.read()
+    failed += not ok
+    print(f"srt  byte-identical to the old export_track: {'ok' if ok else 'MISMATCH'}")
+
+    # read_srt joins multi-line text with a space
+    want = [(s, e, t.replace("\n", " ")) for s, e, t in
+            zip(format_timestamps(track.start), format_timestamps(track.end), track.texts)]
+    got = [(c["start"].replace(".", ","), c["end"].replace(".", ","), c["text"]) for c in read_srt(paths["vtt"])]
+    ok = got == want
+    failed += not ok
+    print(f"vtt  parses back to the same cues:          {'ok' if ok else 'MISMATCH'}")
+
+    with open(paths["ass"], encoding="utf-8") as f:
+        lines = [l for l in f.read().splitlines() if l.startswith("Dialogue:")]
+
+    def ass_sec(t):
+        h, m, s = t.split(":")
+        return int(h) * 3600 + int(m) * 60 + float(s)
+    start = np.array([ass_sec(l.split(",")[1]) for l in lines])
+    # ms rounding, then cs rounding: at most 5.5 ms off
+    ok = len(lines) == len(track) and np.abs(start - track.start).max() <= 0.0056
+    failed += not ok
+    print(f"ass  same cues at centisecond precision:    {'ok' if ok else 'MISMATCH'}")
+
+    # "{...}" in cue text is an ASS override block: it has to come out as literal text
+    ass = render(SubtitleTrack(np.array([1.0]), np.array([2.0]), ["{\\an8}up {top}\nnext"]), ("ass",))["ass"]
+    ok = ass.splitlines()[-1].split(",", 9)[9] == "\uff5b\\an8\uff5dup \uff5btop\uff5d\\Nnext"
+    failed += not ok
+    print(f"ass  braces in text escaped:                {'ok' if ok else 'MISMATCH'}")
+
+    with open(paths["json"], encoding="utf-8") as f:
+        data = json.load(f)
+    ok = (data["cues"]["text"] == track.texts
+          and np.abs(np.array(data["cues"]["start_ms"]) / 1000.0 - track.start).max() <= 0.0005
+          and data["words"]["word"] == words.words.tolist())
+    failed += not ok
+    print(f"json loads back to the same cues + words:   {'ok' if ok else 'MISMATCH'}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cues", type=int, default=100_000)
+    parser.add_argument("--check", action="store_true", help="only run the output checks")
+    args = parser.parse_args()
+
+    track = make_track(args.cues)
+    with tempfile.TemporaryDirectory() as folder:
+        failed = check(make_track(min(args.cues, 20_000), seed=1), folder)
+        if args.check or failed:
+            return 1 if failed else 0
+
+        cues = [{"start": format_timestamp(s), "end": format_timestamp(e), "text": t} for s, e, t in track]
+        words = make_words(track)
+        out = os.path.join(folder, "bench.srt")
+        print(f"\n{args.cues} cues")
+        _, ms = timed(legacy_re_export_srt, cues, out)
+        print(f"{'legacy re_export_srt (strings in)':<36}{ms:9.1f} ms")
+        _, ms = timed(lambda: legacy_re_export_srt(
+            [{"start": format_timestamp(s), "end": format_timestamp(e), "text": t} for s, e, t in track], out))
+        print(f"{'legacy per-cue format + f.write':<36}{ms:9.1f} ms")
+        _, ms = timed(legacy_export_track, track, out)
+        print(f"{'legacy export_track (srt)':<36}{ms:9.1f} ms")
+        for formats in (("srt",), ("srt", "vtt", "json"), ("srt", "vtt", "ass", "json")):
+            _, ms = timed(write_subtitles, track, out, formats, words if "json" in formats else None)
+            print(f"{'writer ' + '+'.join(formats):<36}{ms:9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Timeline editor: one Frame + Label + Entry per cue (what MainWindow.update_timeline did) vs
+timeline_view.VirtualTimeline (a pool of rows for the viewport over a TimelineModel).
+
+    python benchmarks/bench_timeline.py                    # 100k cues
+    python benchmarks/bench_timeline.py --cues 100000 --legacy-cues 10000
+
+Rows: build time, RSS growth and Tk widget count for each editor, then the time to jump to
+random positions (moveto + redraw). The legacy editor takes minutes for 100k cues, so it is
+built for --legacy-cues only (default 10k, 0 to skip).
+Checks: edits typed into pooled rows end up in the model and survive scrolling the row away
+and back; to_cues() returns the edited cues in order.
+Needs a display for the Tk rows; without one (no $DISPLAY) only the model numbers and a
+model-only check run.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.mem_utils import current_rss_bytes
+from utils.srt_utils import format_timestamp
+from utils.timeline_model import TimelineModel
+
+
+def make_cues(n):
+    return [{"start": format_timestamp(i * 0.45), "end": format_timestamp(i * 0.45 + 0.4), "text": f"word{i}"}
+            for i in range(n)]
+
+
+def legacy_build(parent, subtitles):
+    """MainWindow.update_timeline / _add_row before the virtual list (minus the Canvas)."""
+    from tkinter import ttk
+    rows = []
+    for sub in subtitles:
+        row = ttk.Frame(parent, padding=5)
+        ttk.Label(row, text=f"{sub['start']} --> {sub['end']}", width=20).pack(side="left")
+        entry = ttk.Entry(row)
+        entry.insert(0, sub['text'])
+        entry.pack(side="left", fill="x", expand=True)
+        row.pack(fill="x")
+        rows.append({"start": sub["start"], "end": sub["end"], "edit": entry})
+    return rows
+
+
+def count_widgets(widget) -> int:
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def timed(fn, *args):
+    rss = current_rss_bytes()
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - t0) * 1000.0, (current_rss_bytes() - rss) / 1024 ** 2
+
+
+def check_model(cues):
+    model = TimelineModel(cues[:10])
+    model.extend(cues[10:])
+    model.set_text(3, "edited")
+    want = [dict(c) for c in cues]
+    want[3]["text"] = "edited"
+    ok = model.to_cues() == want and len(model) == len(cues)
+    print(f"model edits + to_cues: {'ok' if ok else 'MISMATCH'}")
+    return not ok
+
+
+def check_view(root, cues):
+    from timeline_view import VirtualTimeline
+    view = VirtualTimeline(root, TimelineModel(cues), height=400)
+    view.pack(fill="both", expand=True)
+    root.update()
+    rng = random.Random(0)
+    edits = {}
+    for _ in range(50):
+        view.yview("moveto", rng.random())
+        root.update_idletasks()
+        row = rng.choice([r for r in view.rows if r.index is not None])
+        row.entry.delete(0, "end")
+        row.entry.insert(0, f"fixed {row.index}")  # as if typed
+        edits[row.index] = f"fixed {row.index}"
+    view.yview("moveto", 0.0)
+    view.yview("moveto", 1.0)
+    want = [dict(c) for c in cues]
+    for i, text in edits.items():
+        want[i]["text"] = text
+    shown = all(r.text.get() == view.model.texts[r.index] for r in view.rows if r.index is not None)
+    ok = view.model.to_cues() == want and shown
+    print(f"view edits land in the model across scrolling: {'ok' if ok else 'MISMATCH'}")
+    view.destroy()
+    return not ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cues", type=int, default=100_000)
+    parser.add_argument("--legacy-cues", type=int, default=10_000)
+    parser.add_argument("--jumps", type=int, default=200)
+    parser.add_argument("--check", action="store_true", help="only run the checks")
+    args = parser.parse_args()
+
+    cues = make_cues(args.cues)
+    failed = check_model(cues[:2000])
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.geometry("600x800")
+    except Exception as e:  # no display / no Tk
+        print(f"no Tk display ({type(e).__name__}), model numbers only")
+        root = None
+    if root is not None:
+        failed += check_view(root, cues[:2000])
+    if args.check or failed:
+        return 1 if failed else 0
+
+    tracemalloc.start()
+    model, ms, _ = timed(TimelineModel, cues)
+    model_mb = tracemalloc.get_traced_memory()[0] / 1024 ** 2
+    tracemalloc.stop()
+    print(f"\n{args.cues} cues")
+    print(f"{'TimelineModel build':<28}{ms:9.1f} ms  {model_mb:7.1f} MB (tracemalloc)")
+    _, ms, _ = timed(model.to_cues)
+    print(f"{'TimelineModel.to_cues':<28}{ms:9.1f} ms")
+    if root is None:
+        return 0
+
+    from timeline_view import VirtualTimeline
+
+    def build_view():
+        view = VirtualTimeline(root, model)
+        view.pack(fill="both", expand=True)
+        root.update()
+        return view
+    view, ms, mb = timed(build_view)
+    print(f"{'VirtualTimeline build':<28}{ms:9.1f} ms  {mb:7.1f} MB RSS  {count_widgets(view):7d} widgets")
+    rng = random.Random(1)
+
+    def jumps(scroll):
+        for _ in range(args.jumps):
+            scroll(rng.random())
+            root.update_idletasks()
+    _, ms, _ = timed(jumps, lambda f: view.yview("moveto", f))
+    print(f"{'VirtualTimeline jump':<28}{ms / args.jumps:9.2f} ms / jump")
+    view.destroy()
+
+    if args.legacy_cues:
+        import tkinter as tk
+        from tkinter import ttk
+        canvas = tk.Canvas(root)
+        frame = ttk.Frame(canvas)
+        canvas.create_window((0, 0), window=frame, anchor="nw")
+        canvas.pack(fill="both", expand=True)
+
+        def build_legacy():
+            rows = legacy_build(frame, cues[:args.legacy_cues])
+            root.update()
+            canvas.configure(scrollregion=canvas.bbox("all"))
+            return rows
+        _, ms, mb = timed(build_legacy)
+        print(f"{'legacy rows build':<28}{ms:9.1f} ms  {mb:7.1f} MB RSS  {count_widgets(frame):7d} widgets"
+              f"  ({args.legacy_cues} cues)")
+        _, ms, _ = timed(jumps, lambda f: canvas.yview_moveto(f))
+        print(f"{'legacy canvas jump':<28}{ms / args.jumps:9.2f} ms / jump")
+    root.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Preview audio: decoding the whole file for its length / a waveform vs utils.wav_utils.wav_info
+(header only) and utils.waveform.PeakPyramid (mmap + vectorized min / max, cached).
+
+    python benchmarks/bench_waveform.py                    # synthesizes a 1 hour 44.1kHz stereo wav
+    python benchmarks/bench_waveform.py --input my.wav
+
+Rows: duration via full decode (what pygame.mixer.Sound.get_length costs, read_wav stands in
+for it here) vs from the header; pyramid build (time + RSS growth), cached load, and
+columns() for a 600 px view at several zoom levels.
+Checks (also run with --check): wav_info agrees with `wave` for 8 / 16 / 24 / 32-bit PCM and
+reads float + WAVE_FORMAT_EXTENSIBLE files; every pyramid level and columns() match a
+brute-force min / max over the decoded samples.
+"""
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.mem_utils import current_rss_bytes
+from utils.wav_utils import read_wav, wav_info
+from utils.waveform import PeakPyramid, peaks_path
+
+
+def make_test_wav(path, seconds, sr=44100, channels=2):
+    """Tone bursts over a noise floor, written in 60s pieces."""
+    rng = np.random.default_rng(0)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        for start in range(0, int(np.ceil(seconds)), 60):
+            n = int(min(60, seconds - start) * sr)
+            t = (np.arange(n) + start * sr) / sr
+            mono = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.25 * t) > 0) + 0.02 * rng.standard_normal(n)
+            frames = np.repeat(mono[:, None], channels, axis=1) * np.linspace(1.0, 0.5, channels)
+            wf.writeframes((np.clip(frames, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def write_raw_wav(path, samples, sr, tag, sampwidth, extensible=False):
+    """WAV the `wave` module can't write: float samples and / or a WAVE_FORMAT_EXTENSIBLE header."""
+    channels = samples.shape[1]
+    data = samples.astype("<f4" if tag == 3 else "<i2").tobytes()
+    block = channels * sampwidth
+    if extensible:
+        sub = struct.pack("<H", tag) + b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+        fmt = struct.pack("<HHIIHHHHI", 0xFFFE, channels, sr, sr * block, block, sampwidth * 8, 22,
+                          sampwidth * 8, 0) + sub
+    else:
+        fmt = struct.pack("<HHIIHH", tag, channels, sr, sr * block, block, sampwidth * 8)
+    with open(path, "wb") as f:
+        body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        body += b"LIST" + struct.pack("<I", 4) + b"INFO"  # a chunk to skip
+        body += b"data" + struct.pack("<I", len(data)) + data
+        f.write(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+
+def brute_levels(samples, base, factor):
+    """Every level's (min, max) straight from the decoded (frames, channels) floats."""
+    flat_lo = samples.min(axis=1)
+    flat_hi = samples.max(axis=1)
+    levels, bucket = [], base
+    while True:
+        n = -(-len(flat_lo) // bucket)
+        edges = np.arange(n) * bucket
+        levels.append((np.minimum.reduceat(flat_lo, edges), np.maximum.reduceat(flat_hi, edges)))
+        if n <= 1:
+            return levels
+        bucket *= factor
+
+
+def check(folder):
+    failed = 0
+    rng = np.random.default_rng(1)
+    samples = rng.uniform(-1, 1, (5000, 2)).astype(np.float32)
+
+    ok = True
+    for width in (1, 2, 3, 4):
+        path = os.path.join(folder, f"pcm{width}.wav")
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(2)
+            wf.setsampwidth(width)
+            wf.setframerate(22050)
+            wf.writeframes(rng.integers(0, 256, 5000 * 2 * width, dtype=np.uint8).tobytes())
+        info = wav_info(path)
+        decoded, _ = read_wav(path)
+        pyramid = PeakPyramid.build(path)
+        want = brute_levels(decoded, PeakPyramid.BASE, PeakPyramid.FACTOR)
+        ok &= (info["n_frames"] == 5000 and info["sample_rate"] == 22050 and info["sampwidth"] == width
+               and len(want) == len(pyramid.mins)
+               and all(np.allclose(pyramid.mins[k], lo, atol=1e-6) and np.allclose(pyramid.maxs[k], hi, atol=1e-6)
+                       for k, (lo, hi) in enumerate(want)))
+    failed += not ok
+    print(f"8/16/24/32-bit PCM: header + every pyramid level: {'ok' if ok else 'MISMATCH'}")
+
+    ok = True
+    for name, tag, width, ext in (("float", 3, 4, False), ("ext16", 1, 2, True), ("extfloat", 3, 4, True)):
+        path = os.path.join(folder, f"{name}.wav")
+        data = samples if tag == 3 else np.round(samples * 32767)
+        write_raw_wav(path, data, 48000, tag, width, ext)
+        info = wav_info(path)
+        pyramid = PeakPyramid.build(path)
+        scale = 1.0 if tag == 3 else 1 / 32768.0
+        want = brute_levels(data.astype(np.float64) * scale, PeakPyramid.BASE, PeakPyramid.FACTOR)
+        ok &= (info["n_frames"] == 5000 and info["is_float"] == (tag == 3)
+               and np.allclose(pyramid.mins[0], want[0][0], atol=1e-6))
+    failed += not ok
+    print(f"float / extensible headers:                     {'ok' if ok else 'MISMATCH'}")
+
+    # columns(): each column = the buckets whose start falls in it, at the level columns() picks
+    path = os.path.join(folder, "cols.wav")
+    make_test_wav(path, 30.0, sr=8000, channels=1)
+    decoded, sr = read_wav(path)
+    pyramid = PeakPyramid.build(path)
+    ok = True
+    for t0, t1, width in ((0.0, 30.0, 600), (3.3, 3.5, 600), (10.0, 12.0, 97), (-1.0, 40.0, 300), (29.9, 31.0, 50)):
+        mins, maxs = pyramid.columns(t0, t1, width)
+        per_px = (t1 - t0) * sr / width
+        level, bucket = 0, PeakPyramid.BASE
+        while level + 1 < len(pyramid.mins) and bucket * PeakPyramid.FACTOR <= per_px:
+            level, bucket = level + 1, bucket * PeakPyramid.FACTOR
+        n_buckets = -(-len(decoded) // bucket)
+        for k in range(width):
+            a = int(np.floor((t0 * sr + k * per_px) / bucket))
+            b = int(np.floor((t0 * sr + (k + 1) * per_px) / bucket))
+            if a < 0 or a >= n_buckets:
+                ok &= mins[k] == 0 and maxs[k] == 0
+                continue
+            b = min(max(b, a + 1), n_buckets)
+            seg = decoded[a * bucket:b * bucket]
+            ok &= abs(mins[k] - seg.min()) < 1e-6 and abs(maxs[k] - seg.max()) < 1e-6
+    failed += not ok
+    print(f"columns() vs brute force at 5 zooms:            {'ok' if ok else 'MISMATCH'}")
+    return failed
+
+
+def timed(fn, *args):
+    rss = current_rss_bytes()
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - t0) * 1000.0, (current_rss_bytes() - rss) / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=None, help="wav to use instead of a synthesized one")
+    parser.add_argument("--seconds", type=float, default=3600.0)
+    parser.add_argument("--check", action="store_true", help="only run the checks")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        failed = check(folder)
+        if args.check or failed:
+            return 1 if failed else 0
+
+        path = args.input
+        if path is None:
+            path = os.path.join(folder, "bench.wav")
+            print(f"\nsynthesizing {args.seconds:.0f}s of 44.1 kHz stereo...")
+            make_test_wav(path, args.seconds)
+        size_mb = os.path.getsize(path) / 1024 ** 2
+        print(f"{path}: {size_mb:.0f} MB")
+
+        info, ms, _ = timed(wav_info, path)
+        print(f"{'duration from the header':<30}{ms:9.2f} ms  ({info['n_frames'] / info['sample_rate']:.1f} s)")
+        pyramid, ms, mb = timed(PeakPyramid.build, path)
+        print(f"{'PeakPyramid.build (mmap)':<30}{ms:9.1f} ms  {mb:7.1f} MB RSS  {len(pyramid.mins)} levels")
+        cache = os.path.join(folder, "bench.peaks.npz") if args.input else peaks_path(path)
+        pyramid.save(cache)
+        _, ms, _ = timed(PeakPyramid.load, cache)
+        print(f"{'PeakPyramid.load (cached)':<30}{ms:9.1f} ms  ({os.path.getsize(cache) / 1024 ** 2:.1f} MB on disk)")
+        for span in (pyramid.duration, 600.0, 10.0, 0.5):
+            t0 = time.perf_counter()
+            for k in range(100):
+                pyramid.columns(k / 100 * (pyramid.duration - span), k / 100 * (pyramid.duration - span) + span, 600)
+            ms = (time.perf_counter() - t0) * 10.0
+            print(f"{f'columns() 600 px of {span:g} s':<30}{ms:9.3f} ms")
+        _, ms, mb = timed(read_wav, path)
+        print(f"{'full decode (old duration)':<30}{ms:9.1f} ms  {mb:7.1f} MB RSS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,49 @@
+import gc
+import os
+import queue
 import re  # ❌ UNUSED but kept for any future regex use
+import threading
+import traceback
 from tkinter import filedialog
 
 from transcribers.base_transcriber import TranscriberBase
-from transcribers.stable_whisper_transcriber import StableWhisperTranscriber
-from transcribers.whisperx_transcriber import WhisperXTranscriber
-from transcribers.whisperx_chunked_transcriber import WhisperXChunkedTranscriber
-from preprocessors.audio_preprocessor import AudioPreprocessor
+from transcribers.model_pool import MODEL_POOL
+from transcribers.realigner import Realigner
+from transcribers.language_detect import LanguageDetector
+from controllers.subtitle_pipeline import SubtitlePipeline
+from utils.cancel import CancelToken, Cancelled
 from utils.lang_utils import get_language_code
-from utils.srt_utils import read_srt, smooth_srt
+from utils.subtitle_track import SubtitleTrack
+from utils.word_store import WordStore
 from exporters.exporter import Exporter
 from preview_window import PreviewWindow
 
 # note: 1 sub per word, large, eng, 36 sec audio file takes ~3:41 (3/19/25)
-# note: stop_process doesn’t actually stop the docker container!
+# note: stop_process cancels between stages / chunks / batch groups, a model call that
+# is already running finishes first (one chunk's worth of time at most)
 class AutoSubsController:
+    POLL_MS = 100  # how often the Tk thread drains the worker's message queue
+
     def __init__(self, ui):
         self.ui = ui
         self.audio_file = "output/processed_audio.wav"
+        # preprocess -> transcribe -> export, shared with the headless batch CLI.
+        # It owns the preprocess / result caches and the whisperx-chunked worker count.
+        self.pipeline = SubtitlePipeline()
+        # background job: the worker thread only talks to Tk through this queue
+        self.ui_queue = queue.Queue()
+        self.worker = None
+        self.cancel_token = None
         self.setup_connections()
 
     def setup_connections(self):
         self.ui.audio_source_button.config(command=self.select_audio_file)
         self.ui.start_process_button.config(command=self.start_process)
+        self.ui.stop_process_button.config(command=self.stop_process)
         self.ui.reexport_button.config(command=self.re_export)
         self.ui.priview_button.config(command=self.preview_Transcript)
+        self.ui.regroup_button.config(command=self.regroup)
+        self.ui.realign_button.config(command=self.realign_edits)
 
     def select_audio_file(self):
         file_path = filedialog.askopenfilename(
@@ -44,59 +64,192 @@ class AutoSubsController:
         - pre-process the audio (pydub + sox)
         - transcribe the audio
         - refine via forced alignment
+        all of it on a background thread; stages / cues come back through self.ui_queue
         """
-         
-        language_str = self.ui.language_combo.get()
-        language = get_language_code(language_str)
-        model_size = self.ui.model_size_combo.get()
-        transcriber_s = self.ui.transciber_s_combo.get()
-        
+        if self.worker is not None and self.worker.is_alive():
+            print("A job is already running, cancel it first")
+            return
+
+        # widgets are read here, on the Tk thread; the worker only gets plain values
+        settings = self.job_settings()
+        self.cancel_token = CancelToken()
+
+        # Transcribe & align, streaming: cues go to the SRT and the timeline as each
+        # piece / chunk finishes instead of after the whole file
+        self.ui.update_timeline([])
+        self.ui.set_running(True)
+        self.worker = threading.Thread(
+            target=self._run_job, args=(self.audio_file, settings, self.cancel_token),
+            name="autosubs-job", daemon=True
+        )
+        self.worker.start()
+        self.ui.after(self.POLL_MS, self._poll_queue)
+
+    def _run_job(self, audio_file, settings, cancel_token):
+        """Worker thread: the whole pipeline. Never touches Tk, only posts (kind, data) messages."""
+        post = self.ui_queue.put
+        try:
+            summary = self.pipeline.run(
+                audio_file, settings,
+                srt_path="output/whisperx_transcript.srt",
+                refined_path="output/refinedT.srt",
+                words_path=TranscriberBase.WORDS_PATH,
+                on_cues=lambda cues: post(("cues", cues)),
+                on_stage=lambda name: post(("stage", name)),
+                cancel_token=cancel_token,
+            )
+            post(("done", summary))
+        except Cancelled:
+            post(("cancelled", None))
+        except Exception as e:
+            traceback.print_exc()
+            post(("error", f"{type(e).__name__}: {e}"))
+
+    def _poll_queue(self):
+        """Tk thread: apply everything the worker posted since the last poll, then re-arm."""
+        try:
+            while True:
+                kind, data = self.ui_queue.get_nowait()
+                if kind == "cues":
+                    self.ui.append_timeline(data)
+                elif kind == "stage":
+                    self.ui.set_status(f"{data.capitalize()}...")
+                elif kind == "done":
+                    self.ui.set_running(False)
+                    self.ui.set_status(f"Done: {data['audio_sec']:.0f}s of audio in {data['wall_sec']:.0f}s")
+                    # final (grouped + smoothed) cues replace the streamed ones
+                    self.regroup()
+                elif kind == "realigned":
+                    self._apply_realigned(data)
+                elif kind == "cancelled":
+                    # drop the models too, so a cancelled job really gives its memory back
+                    MODEL_POOL.unload()
+                    gc.collect()
+                    self.ui.set_running(False)
+                    self.ui.set_status("Cancelled")
+                elif kind == "error":
+                    self.ui.set_running(False)
+                    self.ui.set_status(f"Failed: {data}")
+        except queue.Empty:
+            pass
+        if (self.worker is not None and self.worker.is_alive()) or not self.ui_queue.empty():
+            self.ui.after(self.POLL_MS, self._poll_queue)
+
+    def stop_process(self):
+        """Ask the running job to stop at its next safe point."""
+        if self.cancel_token is not None and self.worker is not None and self.worker.is_alive():
+            self.cancel_token.cancel()
+            self.ui.set_status("Cancelling...")
+
+    def job_settings(self) -> dict:
+        """Everything start_process reads from the UI, as a SubtitlePipeline settings dict."""
         try:
             words_per_subtitle = int(self.ui.words_per_subtitle_edit.get())
         except ValueError:
             words_per_subtitle = 1
+        try:
+            pause_thre = float(self.ui.pause_thre_edit.get())
+        except ValueError:
+            pause_thre = None
+        return {
+            "transcriber": self.ui.transciber_s_combo.get(),
+            "language": get_language_code(self.ui.language_combo.get()),
+            "model_size": self.ui.model_size_combo.get(),
+            "words_per_subtitle": words_per_subtitle,
+            "pause_thre": pause_thre,
+        }
 
-        # Pre-process audio
-        preprocessor = AudioPreprocessor()
-        processed_audio = preprocessor.process(
-            self.audio_file,
-            output_file=f"output/{self.audio_file}"
+    def regroup(self):
+        """
+        Re-group the last run's stored word timings with the current UI settings and
+        re-export. Only reads the word store, so it takes milliseconds and loads no model.
+        """
+        if not os.path.exists(TranscriberBase.WORDS_PATH):
+            print(f"No word timings at {TranscriberBase.WORDS_PATH}, run Start Process first")
+            return
+        smoothed = self.pipeline.export(
+            TranscriberBase.WORDS_PATH, "output/whisperx_transcript.srt", "output/refinedT.srt", self.job_settings()
         )
-
-        # Choose transcriber
-        if transcriber_s.startswith("whisperx-chunked"):
-            transcriber: TranscriberBase = WhisperXChunkedTranscriber(model_size, language)
-        elif transcriber_s.startswith("whisperx"):
-            transcriber = WhisperXTranscriber(model_size, language)
-        else:
-            transcriber = StableWhisperTranscriber(model_size, language)
-
-        # Transcribe & align
-        aligned = transcriber.transcribe(processed_audio)
-
-        # If using chunked whisperx, .transcribe writes the SRT itself.
-        # Now smooth and re-export
-        subtitles = read_srt("output/whisperx_transcript.srt")
-        print(f"Loaded {len(subtitles)} subtitles")
-        
-        smoothed = smooth_srt(subtitles, min_gap=0.1, min_duration=0.5)
-        
-        print(f"Original subs: {len(subtitles)}, Smoothed subs: {len(smoothed)}")
-        Exporter.re_export_srt(smoothed, "output/refinedT.srt")
         self.ui.update_timeline(smoothed)
 
     def re_export(self):
         """
         Re-export edited subtitles from UI.
+        The edits are in the timeline model (the editor only has widgets for the visible rows).
+        """
+        Exporter.re_export_srt(self.ui.timeline_model.to_cues(), "output/transcript_reexported.srt")
+
+    def realign_edits(self):
         """
-        updated_subs = []
-        for row in self.ui.subtitle_rows:
-            updated_subs.append({
-                "start": row["start"],
-                "end": row["end"],
-                "text": row["edit"].get()
-            })
-        Exporter.re_export_srt(updated_subs, "output/transcript_reexported.srt")
+        Re-time only the cues edited in the timeline: forced alignment of their new text
+        against their own bit of audio, no transcription. Runs on the worker thread like
+        start_process; the new times come back as a ("realigned", {index: cue}) message.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            print("A job is already running, cancel it first")
+            return
+        model = self.ui.timeline_model
+        edited = sorted(model.edited)
+        if not edited:
+            print("No edited cues to re-align")
+            return
+        language = self.job_settings()["language"]
+        self.cancel_token = CancelToken()
+        self.ui.set_running(True)
+        self.worker = threading.Thread(
+            target=self._run_realign, args=(self.audio_file, model.to_cues(), edited, language, self.cancel_token),
+            name="autosubs-realign", daemon=True
+        )
+        self.worker.start()
+        self.ui.after(self.POLL_MS, self._poll_queue)
+
+    def _run_realign(self, audio_file, cues, edited, language, cancel_token):
+        """Worker thread: align the edited cues, splice the words into the stored ones."""
+        post = self.ui_queue.put
+        processed_audio = None
+        try:
+            post(("stage", "re-aligning"))
+            # cached, so this is just a lookup when the file was processed before
+            processed_audio = self.pipeline.preprocess(audio_file)
+            if language is None:
+                # "Detect": the language the transcriber detected for this audio (cached per
+                # audio hash); aligning with another language's model gives garbage times
+                detected = LanguageDetector().cached(processed_audio)
+                if detected is None:
+                    post(("error", "No detected language for this audio, pick the language and re-align"))
+                    return
+                language = detected[0]
+                print(f"Re-aligning with the detected language: {language}")
+            realigner = Realigner(language)
+            realigner.cancel_token = cancel_token
+            words_path = TranscriberBase.WORDS_PATH
+            store = WordStore.load(words_path) if os.path.exists(words_path) else None
+            track, store = realigner.realign(processed_audio, SubtitleTrack.from_cues(cues), edited, store)
+            if store is not None:
+                # so Regroup keeps the fixes
+                store.save(words_path)
+            new_cues = track.to_cues()
+            post(("realigned", {i: new_cues[i] for i in edited}))
+        except Cancelled:
+            post(("cancelled", None))
+        except Exception as e:
+            traceback.print_exc()
+            post(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            if processed_audio is not None:
+                self.pipeline.preprocess_cache.release(processed_audio)
+
+    def _apply_realigned(self, cues):
+        """Tk thread: new times into the timeline model, then the usual re-export."""
+        model = self.ui.timeline_model
+        for i, cue in cues.items():
+            model.set_times(i, cue["start"], cue["end"])
+            if model.texts[i] == cue["text"]:  # not edited again while aligning
+                model.edited.discard(i)
+        self.ui.timeline.refresh()
+        self.ui.set_running(False)
+        self.ui.set_status(f"Re-aligned {len(cues)} cues")
+        self.re_export()
 
     def preview_Transcript(self):
         """
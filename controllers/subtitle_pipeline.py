@@ -0,0 +1,175 @@
+import time
+
+import numpy as np
+
+from transcribers.base_transcriber import TranscriberBase
+from transcribers.stable_whisper_transcriber import StableWhisperTranscriber
+from transcribers.whisperx_transcriber import WhisperXTranscriber
+from transcribers.whisperx_chunked_transcriber import WhisperXChunkedTranscriber
+from transcribers.stub_transcriber import StubTranscriber
+from transcribers.result_cache import ResultCache
+from preprocessors.audio_preprocessor import AudioPreprocessor
+from preprocessors.preprocess_cache import PreprocessCache
+from preprocessors.vad import VoiceActivityDetector
+from utils.cue_segmenter import CueRules
+from utils.wav_utils import wav_duration
+from utils.word_store import WordStore
+from exporters.exporter import Exporter, SrtStreamWriter
+
+# what start_process reads from the Tk combos / entries
+DEFAULT_SETTINGS = {
+    "transcriber": "whisperx",      # whisperx | whisperx-chunked | stable | stub (no model, for testing)
+    "language": "en",               # ISO code, None = detect
+    "model_size": "tiny",
+    "words_per_subtitle": 1,
+    "pause_thre": None,             # seconds, None = no pause splitting
+    "max_chars": None,              # cue length limits (utils.cue_segmenter.CueRules), None = off
+    "max_duration": None,           # seconds
+    "max_cps": None,                # reading speed, characters per second
+    "formats": ["srt"],             # refined outputs: any of srt, vtt, ass, json (+ word timings)
+}
+
+
+class SubtitlePipeline:
+    """
+    preprocess -> transcribe (streaming) -> word store -> SubtitleTrack.smooth -> Exporter, without any UI.
+
+    Used by the Tk controller for one file at a time and by batch_cli.py for many files on
+    several threads. Models come from the process-wide MODEL_POOL, so every job running in
+    this process shares the ones already loaded.
+    """
+
+    def __init__(self, preprocess_cache: PreprocessCache = None, result_cache: ResultCache = None,
+                 chunk_workers: int = 1, bypass_result_cache: bool = False):
+        self.preprocess_cache = preprocess_cache or PreprocessCache()
+        self.result_cache = result_cache or ResultCache()
+        self.chunk_workers = chunk_workers
+        self.bypass_result_cache = bypass_result_cache
+
+    def make_transcriber(self, settings: dict) -> TranscriberBase:
+        # VAD keeps silences / music beds away from the model
+        vad = VoiceActivityDetector()
+        name, model_size, language = settings["transcriber"], settings["model_size"], settings["language"]
+        if name.startswith("whisperx-chunked"):
+            return WhisperXChunkedTranscriber(
+                model_size, language, vad=vad, workers=self.chunk_workers, batched=True,
+                words_per_subtitle=settings["words_per_subtitle"]
+            )
+        elif name.startswith("whisperx"):
+            return WhisperXTranscriber(model_size, language, vad=vad, batched=True)
+        elif name == "stub":
+            return StubTranscriber(model_size, language, delay=settings.get("stub_delay", 0.0))
+        return StableWhisperTranscriber(model_size, language, vad=vad)
+
+    def preprocess(self, audio_file: str) -> str:
+        # the cache locks its own index; the DSP of parallel jobs runs side by side
+        return self.preprocess_cache.process(AudioPreprocessor(), audio_file)
+
+    def transcribe(self, transcriber: TranscriberBase, processed_audio: str, settings: dict, srt_path: str,
+                   on_cues=None, cancel_token=None) -> list:
+        """
+        Stream the transcript into `srt_path` (raw word groups) and return the segments.
+        on_cues(cues) is called with every batch of new cues as they are written.
+        cancel_token (utils.cancel.CancelToken) is checked by the transcriber between pieces
+        / chunks / batch groups and here between segments; cancelling raises Cancelled.
+        """
+        transcriber.cancel_token = cancel_token
+        stream = self.result_cache.stream(transcriber, processed_audio, bypass=self.bypass_result_cache)
+        writer = SrtStreamWriter(srt_path, CueRules.from_settings(settings))
+        segments = []
+        try:
+            for segment in stream:
+                if cancel_token is not None:
+                    cancel_token.check()
+                segments.append(segment)
+                cues = writer.add_segments([segment])
+                if cues and on_cues is not None:
+                    on_cues(cues)
+        finally:
+            # stop the transcriber right here (pools, batch report) instead of whenever GC gets to it
+            stream.close()
+            writer.close()
+        return segments
+
+    def export(self, words_path: str, srt_path: str, refined_path: str, settings: dict,
+               write_raw: bool = True) -> list:
+        """
+        Group the stored words, write the raw SRT + the smoothed subtitles in every format of
+        settings["formats"] (one pass, next to refined_path), return the smoothed cues.
+        write_raw=False when srt_path already holds these cues (run() streamed it with the
+        same rules, byte for byte).
+        """
+        store = WordStore.load(words_path)
+        track = store.to_track(CueRules.from_settings(settings))
+        if write_raw:
+            Exporter.export_track(track, srt_path)
+        print(f"Loaded {len(track)} subtitles")
+
+        # same rules as smooth_srt, on float arrays (no timestamp re-parsing)
+        smoothed = track.smooth(min_gap=0.1, min_duration=0.5)
+        print(f"Original subs: {len(track)}, Smoothed subs: {len(smoothed)}")
+        Exporter.export_track(smoothed, refined_path, settings.get("formats") or ["srt"], words=store)
+        return smoothed.to_cues()
+
+    @staticmethod
+    def audio_duration(audio_path: str, words_path: str = None) -> float:
+        """
+        Seconds of audio for the job summary. From the wav header when there is one; when
+        preprocessing fell back to the original input (mp3 / flac / m4a / ogg) -- which the
+        transcribers decode in memory (AudioBuffer.for_wav) -- pydub decodes it, and if that
+        fails too the last aligned word's end is the best guess.
+        """
+        try:
+            return wav_duration(audio_path)
+        except (OSError, ValueError):
+            pass
+        try:
+            from pydub import AudioSegment
+            return AudioSegment.from_file(audio_path).duration_seconds
+        except Exception as e:
+            print(f"Couldn't read the duration of {audio_path} ({e}), using the last word's end")
+        try:
+            end = WordStore.load(words_path).end
+            return float(np.nanmax(end)) if np.any(~np.isnan(end)) else 0.0
+        except (OSError, ValueError, TypeError):
+            return 0.0
+
+    def run(self, audio_file: str, settings: dict, srt_path: str, refined_path: str, words_path: str,
+            on_cues=None, cancel_token=None, on_stage=None) -> dict:
+        """
+        Whole pipeline for one file. Returns a summary (duration, wall time, real-time factor).
+        on_stage(name) is called as every stage starts; cancel_token is checked between them.
+        """
+        def stage(name):
+            if cancel_token is not None:
+                cancel_token.check()
+            if on_stage is not None:
+                on_stage(name)
+
+        t0 = time.perf_counter()
+        stage("preprocessing")
+        processed_audio = self.preprocess(audio_file)
+        try:
+            stage("loading model")
+            transcriber = self.make_transcriber(settings)
+            stage("transcribing")
+            segments = self.transcribe(transcriber, processed_audio, settings, srt_path,
+                                       on_cues=on_cues, cancel_token=cancel_token)
+            stage("exporting")
+            # keep the aligned words so grouping can change later without re-running ASR
+            transcriber.save_words(segments, words_path)
+            smoothed = self.export(words_path, srt_path, refined_path, settings, write_raw=False)
+            wall = time.perf_counter() - t0
+            duration = self.audio_duration(processed_audio, words_path)
+        finally:
+            # a degraded (uncached) preprocess result isn't needed past this job
+            self.preprocess_cache.release(processed_audio)
+        return {
+            "input": audio_file,
+            "output": refined_path,
+            "settings": settings,
+            "audio_sec": round(duration, 3),
+            "wall_sec": round(wall, 3),
+            "rtf": round(wall / duration, 4) if duration else None,
+            "cues": len(smoothed),
+        }
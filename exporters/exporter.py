@@ -1,4 +1,9 @@
-from utils.srt_utils import format_timestamp
+import os
+import numpy as np
+from exporters.subtitle_writer import write_subtitles
+from utils.cue_segmenter import CueRules
+from utils.subtitle_track import SubtitleTrack
+from utils.word_store import WordStore
 
 class Exporter:
     @staticmethod
@@ -45,23 +50,11 @@ class Exporter:
         Uses the actual word-level timestamps and groups words based on words_per_subtitle. (3/14/25)
 
         Uses word-level timestamps and optionally groups words based on pause detection.(3/14/25)
-        """
-        def get_words(segment):
-            if hasattr(segment, "words"):
-                return segment.words
-            elif isinstance(segment, dict):
-                return segment.get("words", [])
-            else:
-                return []
-
-        def get_val(item, key):
-            if hasattr(item, key):
-                return getattr(item, key)
-            elif isinstance(item, dict):
-                return item.get(key)
-            else:
-                raise AttributeError(f"Item has no attribute or key '{key}'.")
 
+        Both now go through the cue segmenter (utils.cue_segmenter): same cues as the old
+        per-segment loop -- a cue never spans two segments, starts at its first word and ends
+        at its last word's end.
+        """
         # Fix for hybrid support: object or dict
         if hasattr(transcription, "segments"):
             segments = transcription.segments
@@ -70,63 +63,18 @@ class Exporter:
         else:
             raise TypeError("transcription must be an object with a 'segments' attribute or a dict with a 'segments' key.")
 
-        srt_index = 1
-
-        with open(output_srt_file, "w", encoding="utf-8") as f:
-            for segment in segments:
-                words = get_words(segment)
-                if not words:
-                    print(f"Segment has no words: {segment}")
-                    continue
-
-                group_start = None
-                group_end = None
-                group_text = []
-                prev_end = None
-
-                for word in words:
-                    start = get_val(word, "start")
-                    end = get_val(word, "end")
-                    text = get_val(word, "word")
-
-                    if group_start is None:
-                        group_start = start
-
-                    if prev_end is not None and (start - prev_end) > pause_thre:
-                        # Write current group
-                        if group_text:
-                            start_str = format_timestamp(group_start if group_start is not None else 0.0)
-                            end_str = format_timestamp(prev_end)
-                            f.write(f"{srt_index}\n")
-                            f.write(f"{start_str} --> {end_str}\n")
-                            f.write(f"{' '.join(group_text)}\n\n")
-                            srt_index += 1
-                            group_text = []
-                            group_start = start
-
-                    group_text.append(text)
-                    group_end = end
-                    prev_end = end
-
-                    if len(group_text) >= words_per_subtitle:
-                        start_str = format_timestamp(group_start if group_start is not None else 0.0)
-                        end_str = format_timestamp(group_end if group_end is not None else 0.0)
-                        f.write(f"{srt_index}\n")
-                        f.write(f"{start_str} --> {end_str}\n")
-                        f.write(f"{' '.join(group_text)}\n\n")
-                        srt_index += 1
-                        group_text = []
-                        group_start = None
-
-                if group_text:
-                    start_str = format_timestamp(group_start if group_start is not None else 0.0)
-                    end_str = format_timestamp(group_end if group_end is not None else 0.0)
-                    f.write(f"{srt_index}\n")
-                    f.write(f"{start_str} --> {end_str}\n")
-                    f.write(f"{' '.join(group_text)}\n\n")
-                    srt_index += 1
-
-        print(f"SRT file saved to {output_srt_file}")
+        rules = CueRules(max_words=words_per_subtitle, pause_thre=pause_thre, split_segments=True)
+        Exporter.export_words(segments, output_srt_file, rules)
+
+    @staticmethod
+    def export_words(segments, output_srt_file, rules: CueRules):
+        """
+        Group the words of `segments` (whisperx dicts or stable-ts objects) into cues under
+        `rules` and write them as SRT. Returns the SubtitleTrack that was written.
+        """
+        track = WordStore.from_segments(segments).to_track(rules)
+        Exporter.export_track(track, output_srt_file)
+        return track
 
     @staticmethod
     def re_export_srt(subtitles, output_srt_file):
@@ -134,9 +82,78 @@ class Exporter:
         Re-export subtitles to an SRT file.
         'subtitles' is expected to be a list of dicts with keys 'start', 'end', 'text' (3/18/2025)
         """
-        with open(output_srt_file, "w", encoding="utf-8") as f:
-            for i, sub in enumerate(subtitles, start=1):
-                f.write(f"{i}\n")
-                f.write(f"{sub['start']} --> {sub['end']}\n")
-                f.write(f"{sub['text']}\n\n")
-        print(f"SRT file re-exported to {output_srt_file}")
+        Exporter.export_track(SubtitleTrack.from_cues(subtitles), output_srt_file)
+
+    @staticmethod
+    def export_track(track, output_srt_file, formats=("srt",), words=None):
+        """
+        Write a SubtitleTrack (utils.subtitle_track) in every format of `formats` (srt, vtt,
+        ass, json) in one pass, each file written atomically next to `output_srt_file` with
+        its own extension (exporters.subtitle_writer). `words` (a WordStore) adds word
+        timings to the JSON. Returns format -> path.
+        """
+        paths = write_subtitles(track, output_srt_file, formats, words)
+        print(f"Subtitles saved to {', '.join(paths.values())}")
+        return paths
+
+
+class SrtStreamWriter:
+    """
+    Append-as-you-go SRT writer for transcribe_stream(): segments go in as they arrive, and
+    every cue the cue segmenter has closed is written (and flushed) straight away, so the
+    file on disk and the timeline grow while the job is still running. (dicts or stable-ts
+    objects)
+    """
+
+    def __init__(self, output_srt_file, rules: CueRules = None):
+        self.path = output_srt_file
+        self.rules = rules or CueRules(max_words=1)
+        self.index = 1
+        self._pending = []  # words of the cue that may still grow (can span segments)
+        os.makedirs(os.path.dirname(output_srt_file) or ".", exist_ok=True)
+        self._f = open(output_srt_file, "w", encoding="utf-8")
+
+    def _write(self, words):
+        # words whisperx couldn't align have no timestamps; the track times cues from the
+        # ones that do and drops cues with none
+        track = WordStore.from_segments([{"words": words}]).to_track(self.rules)
+        cues = track.to_cues()
+        self._f.write("".join(
+            f"{i}\n{c['start']} --> {c['end']}\n{c['text']}\n\n" for i, c in enumerate(cues, start=self.index)
+        ))
+        self.index += len(cues)
+        return cues
+
+    def add_segments(self, segments):
+        """Write every cue the new segments close. Returns the cues written."""
+        for segment in segments:
+            words = segment.get("words", []) if isinstance(segment, dict) else getattr(segment, "words", [])
+            self._pending.extend(words or [])
+        if not self._pending:
+            return []
+        # the last cue stays open (the next segment may still belong to it), and so does the
+        # last one with a timestamp: unaligned cues after it get their text appended to it
+        store = WordStore.from_segments([{"words": self._pending}])
+        starts = store.cue_starts(self.rules)
+        timed = np.flatnonzero(~np.isnan(np.fmin.reduceat(store.start, starts)))
+        done = int(starts[timed[-1]]) if len(timed) else 0
+        cues = self._write(self._pending[:done]) if done else []
+        self._pending = self._pending[done:]
+        self._f.flush()
+        return cues
+
+    def close(self):
+        """Write the last cue and close the file. Returns the cues written."""
+        if self._f.closed:
+            return []
+        cues = self._write(self._pending) if self._pending else []
+        self._pending = []
+        self._f.close()
+        print(f"SRT file saved to {self.path}")
+        return cues
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,125 @@
+import json
+import os
+
+import numpy as np
+
+from utils.fs_utils import atomic_write_text
+from utils.subtitle_track import matrix_rows, timestamp_matrix, to_ms
+
+FORMATS = ("srt", "vtt", "ass", "json")
+
+# ASS text: \N is the line break, and "{...}" would be read as an override block ({\an8},
+# {\b1}, or just hidden), so braces become their fullwidth lookalikes
+_ASS_TEXT = str.maketrans({"\n": "\\N", "{": "\uff5b", "}": "\uff5d"})
+
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+PlayResX: 1920
+PlayResY: 1080
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,64,&H00FFFFFF,&H000000FF,&H00000000,&H80000000,0,0,0,0,100,100,0,0,1,3,1,2,60,60,50,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+def output_paths(path: str, formats) -> dict:
+    """format -> file path: `path` with its extension swapped ("out/a.srt" -> "out/a.vtt", ...)."""
+    base = os.path.splitext(path)[0]
+    return {fmt: f"{base}.{fmt}" for fmt in formats}
+
+
+def _const(text: str, n: int) -> np.ndarray:
+    """The same ascii text on every row, as a character matrix to hstack with timestamps."""
+    return np.broadcast_to(np.frombuffer(text.encode("ascii"), dtype=np.uint8), (n, len(text)))
+
+
+def _blocks(ids, timings, texts) -> str:
+    """SRT / VTT body (id, timing line, text, blank line per cue) as a single join."""
+    if not texts:
+        return ""
+    parts = [""] * (4 * len(texts))
+    parts[0::4] = ids
+    parts[1::4] = timings
+    parts[2::4] = texts
+    return "\n".join(parts) + "\n"
+
+
+def _json_ms(seconds: np.ndarray) -> list:
+    """Seconds -> int ms for JSON (ints encode several times faster than floats), NaN -> null."""
+    missing = np.isnan(seconds)
+    values = to_ms(np.where(missing, 0.0, seconds)).tolist()
+    for i in np.flatnonzero(missing).tolist():
+        values[i] = None
+    return values
+
+
+def render(track, formats=("srt",), words=None) -> dict:
+    """
+    format -> file text for a SubtitleTrack. The cue times are rounded to int ms once;
+    every format then comes out of the same arrays:
+    1. SRT / VTT: whole timing lines ("HH:MM:SS,mmm --> HH:MM:SS,mmm") as one character
+       matrix -- VTT is the same matrix with '.' markers -- then one join per file
+    2. ASS: "Dialogue: 0,H:MM:SS.cc,H:MM:SS.cc,Default,,0,0,0,," prefixes the same way, at
+       centisecond precision
+    3. JSON: columns, times in int ms -- cues.start_ms / end_ms / text, plus words.word /
+       start_ms / end_ms / score when a WordStore is passed -- one json.dumps
+    """
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown subtitle format(s) {unknown}, expected some of {FORMATS}")
+    n, texts = len(track), track.texts
+    ms_start, ms_end = to_ms(track.start), to_ms(track.end)
+    out = {}
+
+    if "srt" in formats or "vtt" in formats:
+        timing = np.hstack([timestamp_matrix(ms_start), _const(" --> ", n), timestamp_matrix(ms_end)])
+        ids = list(map(str, range(1, n + 1)))
+        if "srt" in formats:
+            out["srt"] = _blocks(ids, matrix_rows(timing), texts)
+        if "vtt" in formats:
+            timing[:, [8, 25]] = ord(".")
+            out["vtt"] = "WEBVTT\n\n" + _blocks(ids, matrix_rows(timing), texts)
+
+    if "ass" in formats:
+        cs_start, cs_end = (ms_start + 5) // 10 * 10, (ms_end + 5) // 10 * 10
+        # one hour digit ("0:00:01.23") unless some cue needs two
+        first = 0 if n and cs_end.max() >= 10 * 3600 * 1000 else 1
+        prefix = matrix_rows(np.hstack([
+            _const("Dialogue: 0,", n), timestamp_matrix(cs_start, ".")[:, first:11], _const(",", n),
+            timestamp_matrix(cs_end, ".")[:, first:11], _const(",Default,,0,0,0,,", n),
+        ]))
+        # translate() is slow per call; most cues need nothing
+        lines = [t.translate(_ASS_TEXT) if "\n" in t or "{" in t or "}" in t else t for t in texts]
+        out["ass"] = ASS_HEADER + ("\n".join(map(str.__add__, prefix, lines)) + "\n" if n else "")
+
+    if "json" in formats:
+        data = {"cues": {"start_ms": ms_start.tolist(), "end_ms": ms_end.tolist(), "text": texts}}
+        if words is not None:
+            score = np.round(words.score.astype(np.float64), 3)
+            data["words"] = {
+                "word": words.words.tolist(),
+                "start_ms": _json_ms(words.start),
+                "end_ms": _json_ms(words.end),
+                "score": [None if s != s else s for s in score.tolist()],
+            }
+        out["json"] = json.dumps(data, ensure_ascii=False)
+    return out
+
+
+def write_subtitles(track, path: str, formats=("srt",), words=None) -> dict:
+    """
+    Render `track` in every requested format and write each file atomically (temp file +
+    rename, so a player or the preview never reads half a file). Paths come from
+    output_paths(path, formats). Returns format -> path.
+    """
+    rendered = render(track, formats, words)
+    paths = output_paths(path, formats)
+    for fmt, text in rendered.items():
+        atomic_write_text(paths[fmt], text)
+    return paths
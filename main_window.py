@@ -1,6 +1,10 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, filedialog
 from controllers.auto_subs_controller import AutoSubsController
+from transcribers.model_pool import MODEL_POOL
+from timeline_view import VirtualTimeline
+from utils.timeline_model import TimelineModel
 
 class MainWindow(tk.Tk):
     def __init__(self):
@@ -19,8 +23,6 @@ class MainWindow(tk.Tk):
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=2)
 
-        self.subtitle_rows = []  # YYYY/MM/DD
-
         # Pass this window as UI to controller
         self.controller = AutoSubsController(self)
 
@@ -28,21 +30,20 @@ class MainWindow(tk.Tk):
         frame = ttk.Frame(self, padding=10)
         ttk.Label(frame, text="Generate Subtitles", font=("Arial", 18, "bold")).pack(pady=(0, 10))
 
-        self.timeline_container = tk.Canvas(frame)
-        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.timeline_container.yview)
-        self.timeline_frame = ttk.Frame(self.timeline_container)
-
-        self.timeline_frame.bind("<Configure>", lambda e: self.timeline_container.configure(scrollregion=self.timeline_container.bbox("all")))
-        self.timeline_container.create_window((0, 0), window=self.timeline_frame, anchor="nw")
-        self.timeline_container.configure(yscrollcommand=self.scrollbar.set)
-
-        self.timeline_container.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
+        # the cues (and the user's edits) live in the model, the view only has widgets for
+        # the rows on screen
+        self.timeline_model = TimelineModel()
+        self.timeline = VirtualTimeline(frame, self.timeline_model)
+        self.timeline.pack(fill="both", expand=True)
 
         bottom_frame = ttk.Frame(frame)
         self.reexport_button = ttk.Button(bottom_frame, text="Re-Export")
         self.reexport_button.pack(side="left")
 
+        # forced alignment of just the edited cues, no re-transcription
+        self.realign_button = ttk.Button(bottom_frame, text="Re-Align Edits")
+        self.realign_button.pack(side="left")
+
         self.priview_button = ttk.Button(bottom_frame, text="preivew")
         self.priview_button.pack(side="left")
         bottom_frame.pack(fill="x", pady=(10, 0))
@@ -58,6 +59,10 @@ class MainWindow(tk.Tk):
         step1 = ttk.LabelFrame(frame, text="Process Settings", padding=10)
         self.start_process_button = ttk.Button(step1, text="Start Process")
         self.start_process_button.pack()
+        self.stop_process_button = ttk.Button(step1, text="Cancel", state="disabled")
+        self.stop_process_button.pack(pady=(5, 0))
+        self.status_label = ttk.Label(step1, text="Idle")
+        self.status_label.pack(pady=(5, 0))
         step1.pack(fill="x", pady=10)
 
         # Audio Source
@@ -93,35 +98,72 @@ class MainWindow(tk.Tk):
         self.words_per_subtitle_edit.insert(0, "1")
         self.words_per_subtitle_edit.pack(fill="x")
 
+        ttk.Label(step4, text="Pause Threshold (s, empty = off):").pack(anchor="w", pady=(10, 0))
+        self.pause_thre_edit = ttk.Entry(step4)
+        self.pause_thre_edit.pack(fill="x")
+
+        # re-group the last run's aligned words with the settings above, no model involved
+        self.regroup_button = ttk.Button(step4, text="Regroup")
+        self.regroup_button.pack(pady=(10, 0))
+
         step4.pack(fill="x", pady=10)
 
         return frame
 
     def update_timeline(self, subtitles):
-        # YYYY/MM/DD: clear old rows
-        for widget in self.timeline_frame.winfo_children():
-            widget.destroy()
-        self.subtitle_rows = []
-
-        for sub in subtitles:
-            row = ttk.Frame(self.timeline_frame, padding=5)
-            ttk.Label(row, text=f"{sub['start']} --> {sub['end']}", width=20).pack(side="left")
-            entry = ttk.Entry(row)
-            entry.insert(0, sub['text'])
-            entry.pack(side="left", fill="x", expand=True)
-            row.pack(fill="x")
-
-            self.subtitle_rows.append({
-                "start": sub["start"],
-                "end": sub["end"],
-                "edit": entry
-            })
+        # replace every cue, back to the top
+        self.timeline_model.reset(subtitles)
+        self.timeline.top = 0
+        self.timeline.refresh()
+
+    def append_timeline(self, subtitles):
+        """Add rows below the existing ones (cues arriving from transcribe_stream)."""
+        self.timeline_model.extend(subtitles)
+        self.timeline.refresh()
+
+    def set_running(self, running: bool):
+        """Start / Cancel buttons while a background job runs (Tk thread only)."""
+        self.start_process_button.config(state="disabled" if running else "normal")
+        self.stop_process_button.config(state="normal" if running else "disabled")
+
+    def set_status(self, text: str):
+        self.status_label.config(text=text)
 
     def close(self):
+        # let a running job stop at its next safe point instead of dying mid-write
+        if self.controller.cancel_token is not None:
+            self.controller.cancel_token.cancel()
         self.destroy()
 
 def main():
+    parser = argparse.ArgumentParser(description="AutoSubs UI")
+    parser.add_argument("--warm-up", nargs="*", default=[], metavar="BACKEND:SIZE",
+                        help="pre-load models in the background, e.g. --warm-up whisperx:small stable:tiny")
+    parser.add_argument("--model-budget-mb", type=int, default=None,
+                        help="RAM budget for loaded models (default: half of system RAM)")
+    parser.add_argument("--chunk-workers", type=int, default=1,
+                        help="worker processes for whisperx-chunked (each loads its own model)")
+    parser.add_argument("--no-result-cache", action="store_true",
+                        help="always re-transcribe instead of reusing a cached result for the same audio/model/language")
+    parser.add_argument("--result-cache-mb", type=int, default=None,
+                        help="disk budget for cached transcription results (default: 512)")
+    args = parser.parse_args()
+
+    if args.model_budget_mb is not None:
+        MODEL_POOL.max_bytes = args.model_budget_mb * 1024 ** 2
+    if args.warm_up:
+        specs = []
+        for spec in args.warm_up:
+            backend, _, size = spec.partition(":")
+            specs.append(("stable", size, None, None) if backend == "stable" else (backend, size))
+        MODEL_POOL.warm_up(specs, background=True)
+
     app = MainWindow()
+    pipeline = app.controller.pipeline
+    pipeline.chunk_workers = args.chunk_workers
+    pipeline.bypass_result_cache = args.no_result_cache
+    if args.result_cache_mb is not None:
+        pipeline.result_cache.max_bytes = args.result_cache_mb * 1024 ** 2
     app.protocol("WM_DELETE_WINDOW", app.close)
     app.mainloop()
 
@@ -1,40 +1,154 @@
 import subprocess
-from pydub import AudioSegment
+import wave
 from pathlib import Path
 
+import numpy as np
+
+from preprocessors import dsp
+from utils.wav_utils import read_wav, write_wav, iter_wav_blocks, wav_sample_rate, WavWriter
+from utils.audio_buffer import SidecarWriter, sidecar_path
+
+
 class AudioPreprocessor:
-    def __init__(self, noise_sec: float = 0.5):
+    BACKENDS = ("numpy", "stream", "sox")
+
+    def __init__(self, noise_sec: float = 0.5, target_dbfs: float = -20.0, backend: str = "numpy",
+                 block_size: int = 1 << 18):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown preprocessing backend '{backend}' (expected one of {self.BACKENDS})")
         self.noise_sec = noise_sec
+        self.target_dbfs = target_dbfs
+        self.backend = backend
+        # frames per block for backend="stream" (2^18 ~ 6s at 44.1kHz)
+        self.block_size = block_size
+        # True after process() if the output isn't the full result (normalized only, or the
+        # untouched input), so callers like PreprocessCache don't keep it
+        self.degraded = False
 
     def process(self, input_file: str, output_file: str) -> str:
         """
-            Pre-process the audio file by converting it to mono and normalizing its volume.
-            Requires pydub. (3/18/25)
+            Pre-process the audio file: mono, normalized to target_dbfs, noise-reduced.
+            backend="numpy" does everything in memory, backend="stream" does the same work in
+            fixed-size blocks (constant memory for multi-hour files), backend="sox" is the old
+            pydub + SoX path.
+            The numpy backends also write the 16 kHz float32 sidecar (utils.audio_buffer) that
+            the transcribers map instead of decoding the wav again.
+        """
+        self.degraded = False
+        # Make sure output directory exists
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+
+        if self.backend == "sox":
+            return self._process_sox(input_file, output_file)
+        if self.backend == "stream":
+            return self._process_stream(input_file, output_file)
+        return self._process_numpy(input_file, output_file)
+
+    def _process_numpy(self, input_file: str, output_file: str) -> str:
+        """
+            In-process engine: no temp files, no subprocesses.
+            downmix -> gain normalization -> spectral gate, all on float32 arrays.
         """
-        
         normalized = None
+        sr = None
         try:
-            
-            # Make sure output directory exists
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+            # 1) Load & downmix
+            samples, sr = read_wav(input_file)
+            mono = dsp.downmix(samples)
+            del samples
+
+            # 2) Normalize to target dBFS
+            normalized = dsp.normalize(mono, self.target_dbfs)
+            del mono
 
+            # 3) Spectral gating, noise profile from the first noise_sec seconds
+            cleaned = dsp.reduce_noise(normalized, sr, noise_sec=self.noise_sec)
+            write_wav(output_file, cleaned, sr)
 
+            # 4) 16 kHz float32 sidecar for the rest of the pipeline
+            with SidecarWriter(sidecar_path(output_file), sr) as sidecar:
+                sidecar.write(cleaned)
+
+            print(f"Pre-processed audio (noise-reduced in-process) saved to {output_file}")
+            return output_file
+
+        except Exception as e:
+            print("Error during audio pre-processing:", e)
+            return self._fallback(normalized, sr, input_file, output_file)
+
+    def _process_stream(self, input_file: str, output_file: str) -> str:
+        """
+            Bounded-memory version of the numpy engine for long recordings.
+            Pass 1 scans the file for its RMS, pass 2 applies the gain + spectral gate block
+            by block (overlap-add carries across block edges) and writes output as it goes.
+            Peak memory depends on block_size only, not on the file length.
+        """
+        try:
+            sr = wav_sample_rate(input_file)
+        except wave.Error:
+            # float / extensible wavs can't be read incrementally by the stdlib
+            print("Input is not a plain PCM wav, falling back to the in-memory engine")
+            return self._process_numpy(input_file, output_file)
+
+        try:
+            # 1) RMS scan
+            sum_sq, n = 0.0, 0
+            for block in iter_wav_blocks(input_file, self.block_size):
+                mono = dsp.downmix(block)
+                sum_sq += float(np.square(mono, dtype=np.float64).sum())
+                n += len(mono)
+            current = 10.0 * np.log10(max(sum_sq / n, 1e-20)) if n else -float("inf")
+            gain = np.float32(dsp.gain_for_target(current, self.target_dbfs))
+
+            # 2) Noise profile from the first noise_sec seconds (normalized, like the in-memory path)
+            noise_frames = max(int(self.noise_sec * sr), 1)
+            noise_clip = dsp.downmix(next(iter_wav_blocks(input_file, noise_frames))) * gain
+            gate = dsp.SpectralGate(noise_clip)
+
+            # 3) Gain + gate + write (wav + 16 kHz sidecar), one block at a time.
+            # sidecar is the outer context so it is closed last and isn't older than the wav
+            with SidecarWriter(sidecar_path(output_file), sr) as sidecar, WavWriter(output_file, sr) as writer:
+                for block in iter_wav_blocks(input_file, self.block_size):
+                    cleaned = gate.process(dsp.downmix(block) * gain)
+                    writer.write(cleaned)
+                    sidecar.write(cleaned)
+                cleaned = gate.flush()
+                writer.write(cleaned)
+                sidecar.write(cleaned)
+
+            print(f"Pre-processed audio (streamed, noise-reduced in-process) saved to {output_file}")
+            return output_file
+
+        except Exception as e:
+            print("Error during streamed audio pre-processing:", e)
+            print(f"Using original input file as fallback: {input_file}")
+            self.degraded = True
+            return input_file
+
+    def _process_sox(self, input_file: str, output_file: str) -> str:
+        """
+            Pre-process the audio file by converting it to mono and normalizing its volume.
+            Requires pydub + the sox binary. (3/18/25)
+        """
+        from pydub import AudioSegment
+
+        normalized = None
+        try:
             # 1) Load & normalize with Pydub
             audio = AudioSegment.from_file(input_file, format="wav")
             audio = audio.set_channels(1)
-            # target -20 dBFS
-            change_in_dBFS = -20.0 - audio.dBFS
+            change_in_dBFS = self.target_dbfs - audio.dBFS
             normalized = audio.apply_gain(change_in_dBFS)
 
             # 2) Write out a temp WAV
             temp_wav = "output/temp_for_noise.wav"
             normalized.export(temp_wav, format="wav")
 
-            # 3) Create a noise profile from the first 0.5s
+            # 3) Create a noise profile from the first noise_sec seconds
             noise_prof = "output/noise.prof"
             subprocess.run([
                 "sox", temp_wav, "-n",
-                "trim", "0", "0.5",      # take first half-second as “noise”
+                "trim", "0", str(self.noise_sec),
                 "noiseprof", noise_prof
             ], check=True)
 
@@ -49,6 +163,7 @@ class AudioPreprocessor:
 
         except Exception as e:
             print("Error during audio pre-processing:", e)
+            self.degraded = True
             # Fallback: return the normalized version
             try:
                 if normalized is not None:
@@ -58,6 +173,19 @@ class AudioPreprocessor:
                 else:
                     print(f"Using original input file as fallback: {input_file}")
                     return input_file
-                
+
             except:
-                return input_file
\ No newline at end of file
+                return input_file
+
+    def _fallback(self, normalized, sr, input_file: str, output_file: str) -> str:
+        # Fallback: return the normalized version, or the untouched input
+        self.degraded = True
+        try:
+            if normalized is not None:
+                write_wav(output_file, normalized, sr)
+                print(f"Exported normalized audio (no noise reduction) to {output_file}")
+                return output_file
+            print(f"Using original input file as fallback: {input_file}")
+            return input_file
+        except Exception:
+            return input_file
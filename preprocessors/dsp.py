@@ -0,0 +1,213 @@
+import numpy as np
+
+# In-process replacement for the pydub -> temp wav -> sox noiseprof/noisered chain.
+# Everything works on float32 arrays in [-1, 1].
+
+_EPS = 1e-10
+
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """(frames, channels) -> (frames,) float32 mono."""
+    if samples.ndim == 1:
+        return samples.astype(np.float32, copy=False)
+    return samples.mean(axis=1, dtype=np.float32)
+
+
+def dbfs(samples: np.ndarray) -> float:
+    """RMS level in dBFS (same definition pydub's AudioSegment.dBFS uses)."""
+    if samples.size == 0:
+        return -float("inf")
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    return 20.0 * np.log10(max(rms, _EPS))
+
+
+def gain_for_target(current_dbfs: float, target_dbfs: float) -> float:
+    """Linear gain that moves `current_dbfs` to `target_dbfs` (1.0 for digital silence)."""
+    if not np.isfinite(current_dbfs) or current_dbfs <= 20.0 * np.log10(_EPS):
+        return 1.0
+    return float(10.0 ** ((target_dbfs - current_dbfs) / 20.0))
+
+
+def normalize(samples: np.ndarray, target_dbfs: float = -20.0) -> np.ndarray:
+    gain = gain_for_target(dbfs(samples), target_dbfs)
+    return samples * np.float32(gain)
+
+
+def _window(n_fft: int) -> np.ndarray:
+    # sqrt of a periodic hann: analysis * synthesis sums to 1 at 50% overlap,
+    # so plain overlap-add reconstructs the input exactly when the gate is open
+    return np.sqrt(np.hanning(n_fft + 1)[:-1]).astype(np.float32)
+
+
+def _frames(buf: np.ndarray, n_fft: int, hop: int) -> np.ndarray:
+    """Strided (n_frames, n_fft) view of `buf`; no copy."""
+    if len(buf) < n_fft:
+        return np.empty((0, n_fft), dtype=np.float32)
+    return np.lib.stride_tricks.sliding_window_view(buf, n_fft)[::hop]
+
+
+class SpectralGate:
+    """
+    Stationary spectral-gating noise reduction (the same idea as sox noisered / noisereduce).
+
+    A noise profile (per-bin mean + std of the magnitude in dB) is taken from a
+    noise-only clip, then every STFT frame is gated against `mean + n_std * std`.
+    The gate is per-frame (only smoothed across frequency), so the signal can be fed
+    in any block sizes and the output is identical to processing it in one go.
+    """
+
+    def __init__(self, noise_clip: np.ndarray, n_fft: int = 2048, n_std: float = 1.5,
+                 prop_decrease: float = 1.0, freq_smooth: int = 3, frames_per_batch: int = 1024):
+        self.n_fft = n_fft
+        self.hop = n_fft // 2
+        self.prop_decrease = prop_decrease
+        self.freq_smooth = freq_smooth
+        self.frames_per_batch = frames_per_batch
+        self.window = _window(n_fft)
+        self.threshold_db = self._profile(noise_clip, n_std)
+        self.reset()
+
+    def reset(self):
+        # front-pad with one hop so the first real sample sits under a full window
+        self._in = np.zeros(self.hop, dtype=np.float32)
+        self._pending = np.zeros(self.hop, dtype=np.float32)
+        self._skip = self.hop
+        self._fed = 0
+        self._emitted = 0
+
+    def _profile(self, noise_clip: np.ndarray, n_std: float) -> np.ndarray:
+        clip = np.asarray(noise_clip, dtype=np.float32)
+        if len(clip) < self.n_fft:
+            clip = np.pad(clip, (0, self.n_fft - len(clip)))
+        spec = np.fft.rfft(_frames(clip, self.n_fft, self.hop) * self.window, axis=1)
+        mag_db = 20.0 * np.log10(np.abs(spec) + _EPS)
+        return (mag_db.mean(axis=0) + n_std * mag_db.std(axis=0)).astype(np.float32)
+
+    def _gate(self, frames: np.ndarray) -> np.ndarray:
+        spec = np.fft.rfft(frames * self.window, axis=1)
+        mag_db = 20.0 * np.log10(np.abs(spec) + _EPS)
+        mask = (mag_db > self.threshold_db).astype(np.float32)
+        if self.freq_smooth > 1:
+            k = np.ones(self.freq_smooth, dtype=np.float32) / self.freq_smooth
+            pad = self.freq_smooth // 2
+            padded = np.pad(mask, ((0, 0), (pad, self.freq_smooth - 1 - pad)), mode="edge")
+            # moving average along frequency for every frame at once
+            csum = np.cumsum(padded, axis=1, dtype=np.float32)
+            csum = np.concatenate([np.zeros((csum.shape[0], 1), np.float32), csum], axis=1)
+            mask = (csum[:, self.freq_smooth:] - csum[:, :-self.freq_smooth]) * k[0]
+        gain = 1.0 - self.prop_decrease * (1.0 - mask)
+        return np.fft.irfft(spec * gain, n=self.n_fft, axis=1).astype(np.float32) * self.window
+
+    def _overlap_add(self, frames: np.ndarray) -> np.ndarray:
+        out = []
+        for i in range(0, len(frames), self.frames_per_batch):
+            y = self._gate(frames[i:i + self.frames_per_batch])
+            # hop == n_fft / 2: each output hop is the head of frame k plus the tail of frame k-1
+            tails = np.concatenate([self._pending[None, :], y[:-1, self.hop:]], axis=0)
+            out.append((y[:, :self.hop] + tails).ravel())
+            self._pending = y[-1, self.hop:].copy()
+        return np.concatenate(out) if out else np.empty(0, dtype=np.float32)
+
+    def _emit(self, out: np.ndarray) -> np.ndarray:
+        if self._skip:
+            drop = min(self._skip, len(out))
+            out = out[drop:]
+            self._skip -= drop
+        out = out[:max(self._fed - self._emitted, 0)]
+        self._emitted += len(out)
+        return out
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Feed the next block of mono samples; returns whatever output is final so far."""
+        block = np.asarray(block, dtype=np.float32)
+        self._fed += len(block)
+        buf = np.concatenate([self._in, block])
+        frames = _frames(buf, self.n_fft, self.hop)
+        self._in = buf[len(frames) * self.hop:].copy()
+        return self._emit(self._overlap_add(frames))
+
+    def flush(self) -> np.ndarray:
+        """Push out the remaining samples (zero-padded tail)."""
+        buf = np.concatenate([self._in, np.zeros(self.n_fft, dtype=np.float32)])
+        frames = _frames(buf, self.n_fft, self.hop)
+        self._in = np.zeros(0, dtype=np.float32)
+        return self._emit(self._overlap_add(frames))
+
+
+def reduce_noise(samples: np.ndarray, sample_rate: int, noise_sec: float = 0.5, **gate_kwargs) -> np.ndarray:
+    """Gate the whole mono signal using its first `noise_sec` seconds as the noise profile."""
+    noise_clip = samples[:int(noise_sec * sample_rate)]
+    gate = SpectralGate(noise_clip, **gate_kwargs)
+    return np.concatenate([gate.process(samples), gate.flush()])
+
+
+class Resampler:
+    """
+    Block-friendly sample-rate converter: windowed-sinc low-pass (when downsampling) followed
+    by linear interpolation. Filter history and the interpolation position carry across
+    blocks, so feeding a signal in pieces gives the same result as feeding it whole.
+    """
+
+    def __init__(self, sr_in: int, sr_out: int, taps: int = 48):
+        self.sr_in = sr_in
+        self.sr_out = sr_out
+        self.step = sr_in / float(sr_out)  # input samples per output sample
+        if sr_out < sr_in:
+            n = np.arange(taps) - (taps - 1) / 2.0
+            cutoff = 0.5 * sr_out / sr_in * 0.9  # a little below the new nyquist
+            h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(taps)
+            self.h = (h / h.sum()).astype(np.float32)
+        else:
+            self.h = np.ones(1, dtype=np.float32)
+        self.delay = (len(self.h) - 1) / 2.0
+        self._hist = np.zeros(len(self.h) - 1, dtype=np.float32)
+        self._prev = np.zeros(1, dtype=np.float32)   # last filtered sample of the previous block
+        self._base = -1                              # filtered-stream index of self._prev
+        self._pos = self.delay                       # next output position (filtered-stream index)
+        self._fed = 0
+        self._emitted = 0
+
+    def _filter(self, block: np.ndarray) -> np.ndarray:
+        buf = np.concatenate([self._hist, block])
+        if len(self.h) > 1:
+            self._hist = buf[len(buf) - (len(self.h) - 1):].copy()
+        return np.convolve(buf, self.h, mode="valid").astype(np.float32)
+
+    def _interp(self, filtered: np.ndarray) -> np.ndarray:
+        buf = np.concatenate([self._prev, filtered])
+        last = self._base + len(buf) - 1
+        if self._pos > last:
+            n_out = 0
+        else:
+            n_out = int(np.floor((last - self._pos) / self.step)) + 1
+        positions = self._pos + self.step * np.arange(n_out)
+        out = np.interp(positions - self._base, np.arange(len(buf)), buf).astype(np.float32)
+        self._pos += self.step * n_out
+        self._prev = buf[-1:].copy()
+        self._base = last
+        return out
+
+    def _emit(self, out: np.ndarray) -> np.ndarray:
+        want = int(np.ceil(self._fed / self.step))
+        out = out[:max(want - self._emitted, 0)]
+        self._emitted += len(out)
+        return out
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        block = np.asarray(block, dtype=np.float32)
+        if self.sr_in == self.sr_out:
+            return block
+        self._fed += len(block)
+        return self._emit(self._interp(self._filter(block)))
+
+    def flush(self) -> np.ndarray:
+        if self.sr_in == self.sr_out:
+            return np.zeros(0, dtype=np.float32)
+        # push the filter's group delay (plus one sample for interpolation) through
+        pad = np.zeros(int(np.ceil(self.delay)) + 2, dtype=np.float32)
+        return self._emit(self._interp(self._filter(pad)))
+
+
+def resample(samples: np.ndarray, sr_in: int, sr_out: int) -> np.ndarray:
+    r = Resampler(sr_in, sr_out)
+    return np.concatenate([r.process(samples), r.flush()])
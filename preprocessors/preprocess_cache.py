@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+import hashlib
+import uuid
+from contextlib import contextmanager
+
+from utils.audio_buffer import cached_sidecar_path, sidecar_path
+from utils.fs_utils import atomic_write_json, file_lock, read_json
+from utils.hash_utils import memo_file_sha256
+
+
+class PreprocessCache:
+    """
+    Content-addressed cache of preprocessed wavs.
+
+    Key = sha256(input file contents) + the preprocessing settings (noise_sec, target dBFS,
+    backend), so re-running "Start Process" on the same file only to try another model size
+    or words-per-subtitle skips preprocessing entirely. Entries are evicted least-recently-used
+    once the folder goes over `max_bytes`.
+    """
+    VERSION = 1  # bump when the preprocessing output changes for the same settings
+
+    def __init__(self, cache_dir: str = "output/cache/preprocessed", max_bytes: int = 4 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._read_index()
+        self.session_hits = 0
+        self.session_misses = 0
+        # guards the index (lookups, inserts, saves) for every job in this process; the
+        # preprocessing itself runs outside it
+        self._lock = threading.RLock()
+
+    def _read_index(self) -> dict:
+        return read_json(self.index_path, default=None) or {
+            "entries": {}, "hashes": {}, "hits": 0, "misses": 0, "evictions": 0
+        }
+
+    def _save(self):
+        atomic_write_json(self.index_path, self.index)
+
+    @contextmanager
+    def _updating(self):
+        """
+        Read-modify-write of index.json. Other processes may share the cache folder, so
+        under the file lock the index is re-read first (their entries and counters stay),
+        this process's hash memo merged in, and saved after.
+        """
+        with self._lock, file_lock(self.index_path):
+            hashes = self.index["hashes"]
+            self.index = self._read_index()
+            self.index["hashes"].update(hashes)
+            yield self.index
+            self._save()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def content_hash(self, input_file: str) -> str:
+        """sha256 of the file, memoized on (size, mtime) so unchanged files aren't re-read."""
+        return memo_file_sha256(input_file, self.index["hashes"])
+
+    def key(self, input_file: str, preprocessor) -> str:
+        params = {
+            "v": self.VERSION,
+            "noise_sec": preprocessor.noise_sec,
+            "target_dbfs": preprocessor.target_dbfs,
+            "backend": preprocessor.backend,
+        }
+        blob = self.content_hash(input_file) + json.dumps(params, sort_keys=True)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+    def get(self, key: str):
+        """Cached wav path for `key` (and mark it recently used), or None."""
+        entry = self.index["entries"].get(key)
+        path = self._path(key)
+        if entry is None or not os.path.exists(path):
+            self.index["entries"].pop(key, None)
+            return None
+        entry["last_used"] = time.time()
+        return path
+
+    def put(self, key: str, wav_path: str) -> str:
+        """Move a freshly written wav (and its 16 kHz sidecar) into the cache and enforce the disk budget."""
+        path = self._path(key)
+        os.replace(wav_path, path)
+        size = os.path.getsize(path)
+        if os.path.exists(sidecar_path(wav_path)):
+            os.replace(sidecar_path(wav_path), sidecar_path(path))
+            size += os.path.getsize(sidecar_path(path))
+        self.index["entries"][key] = {"size": size, "last_used": time.time()}
+        self._evict(keep=key)
+        return path
+
+    def _evict(self, keep=None):
+        entries = self.index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries.pop(key)["size"]
+            self.index["evictions"] += 1
+            self._remove_files(key)
+
+    def _remove_files(self, key: str):
+        for path in (self._path(key), sidecar_path(self._path(key))):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def release(self, path: str):
+        """
+        Call when a job is done with what process() returned: an uncached (degraded) temp
+        wav and its sidecars are deleted, cached wavs and the original input are left alone.
+        """
+        if (os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.cache_dir)
+                or not os.path.basename(path).startswith(".tmp_")):
+            return
+        for p in (path, sidecar_path(path), cached_sidecar_path(path)):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def process(self, preprocessor, input_file: str) -> str:
+        """
+        Return the cached preprocessed wav for input_file, running the preprocessor on a miss.
+        Only the index lookup and the insert hold the lock (hashing is memoized, cheap next
+        to the DSP), so jobs on other files preprocess in parallel.
+        """
+        with self._lock:
+            key = self.key(input_file, preprocessor)
+            with self._updating():
+                cached = self.get(key)
+                if cached is not None:
+                    self.index["hits"] += 1
+                    self.session_hits += 1
+                else:
+                    self.index["misses"] += 1
+                    self.session_misses += 1
+            if cached is not None:
+                print(f"[Cache] Preprocessed audio hit: {cached}")
+                self.print_stats()
+                return cached
+
+        # own temp name: two jobs on the same file can both miss and preprocess at once
+        tmp = os.path.join(self.cache_dir, f".tmp_{key}_{uuid.uuid4().hex[:8]}.wav")
+        try:
+            result = preprocessor.process(input_file, output_file=tmp)
+        except BaseException:
+            self.release(tmp)
+            raise
+        if result != tmp or preprocessor.degraded:
+            # preprocessing fell back (normalized only, or the original input); use it for this
+            # run but don't cache it, the next run should try the full preprocessing again.
+            # A half-written temp goes now, a degraded one when the job calls release()
+            if result != tmp:
+                self.release(tmp)
+            return result
+        with self._updating():
+            path = self.put(key, tmp)
+        print(f"[Cache] Preprocessed audio miss, stored: {path}")
+        self.print_stats()
+        return path
+
+    def clear(self):
+        with self._updating():
+            for key in list(self.index["entries"]):
+                self._remove_files(key)
+            self.index["entries"] = {}
+
+    def stats(self) -> dict:
+        entries = self.index["entries"]
+        lookups = self.index["hits"] + self.index["misses"]
+        return {
+            "entries": len(entries),
+            "bytes": sum(e["size"] for e in entries.values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.index["hits"],
+            "misses": self.index["misses"],
+            "evictions": self.index["evictions"],
+            "hit_rate": self.index["hits"] / lookups if lookups else 0.0,
+            "session_hits": self.session_hits,
+            "session_misses": self.session_misses,
+        }
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"[Cache] {s['entries']} entries, {s['bytes'] / 1024 ** 2:.1f}/{s['max_bytes'] / 1024 ** 2:.0f} MB, "
+              f"hits={s['hits']} misses={s['misses']} (hit rate {s['hit_rate']:.0%}), evictions={s['evictions']}")
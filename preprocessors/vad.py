@@ -0,0 +1,149 @@
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """
+    Frame energy + zero-crossing-rate voice activity detection, all vectorized in NumPy.
+
+    A frame counts as speech when its energy is `energy_margin_db` above the recording's
+    noise floor (a low percentile of frame energies) and it isn't noise-like (high ZCR), or
+    when it is loud enough that the ZCR doesn't matter. Short gaps are bridged, blips are
+    dropped, and every region gets `padding_sec` on both sides so word edges survive.
+    """
+
+    def __init__(self, frame_ms: float = 30.0, energy_margin_db: float = 10.0, loud_margin_db: float = 20.0,
+                 zcr_max: float = 0.35, min_speech_sec: float = 0.25, min_silence_sec: float = 0.6,
+                 padding_sec: float = 0.3, floor_percentile: float = 10.0):
+        self.frame_ms = frame_ms
+        self.energy_margin_db = energy_margin_db
+        self.loud_margin_db = loud_margin_db
+        self.zcr_max = zcr_max
+        self.min_speech_sec = min_speech_sec
+        self.min_silence_sec = min_silence_sec
+        self.padding_sec = padding_sec
+        self.floor_percentile = floor_percentile
+
+    def frame_features(self, samples: np.ndarray, sample_rate: int):
+        """Per-frame energy (dBFS) and zero-crossing rate, shape (n_frames,) each."""
+        frame_len = max(int(sample_rate * self.frame_ms / 1000.0), 1)
+        n_frames = len(samples) // frame_len
+        frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+        energy_db = 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_len
+        return energy_db, zcr
+
+    def speech_mask(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        energy_db, zcr = self.frame_features(samples, sample_rate)
+        if len(energy_db) == 0:
+            return np.zeros(0, dtype=bool)
+        floor = np.percentile(energy_db, self.floor_percentile)
+        voiced = (energy_db > floor + self.energy_margin_db) & (zcr < self.zcr_max)
+        loud = energy_db > floor + self.loud_margin_db
+        return voiced | loud
+
+    def detect(self, samples: np.ndarray, sample_rate: int):
+        """Return speech regions as a list of (start_sec, end_sec) on the input's timeline."""
+        mask = self.speech_mask(samples, sample_rate)
+        frame_sec = self.frame_ms / 1000.0
+        duration = len(samples) / sample_rate
+
+        # run edges of the boolean mask
+        edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+        starts = np.flatnonzero(edges == 1) * frame_sec
+        ends = np.flatnonzero(edges == -1) * frame_sec
+        if len(starts) == 0:
+            return []
+
+        # bridge short silences
+        keep = np.concatenate([[True], (starts[1:] - ends[:-1]) >= self.min_silence_sec])
+        starts = starts[keep]
+        ends = np.maximum.reduceat(ends, np.flatnonzero(keep))
+
+        # drop blips, pad, clamp, then merge regions the padding made overlap
+        long_enough = (ends - starts) >= self.min_speech_sec
+        starts = np.maximum(starts[long_enough] - self.padding_sec, 0.0)
+        ends = np.minimum(ends[long_enough] + self.padding_sec, duration)
+        if len(starts) == 0:
+            return []
+        new = np.concatenate([[True], starts[1:] > ends[:-1]])
+        idx = np.flatnonzero(new)
+        return list(zip(starts[idx].tolist(), np.maximum.reduceat(ends, idx).tolist()))
+
+
+class SpeechMap:
+    """
+    Maps times in the condensed (speech-only) audio back to the original timeline.
+    Built from the VAD regions that were concatenated, in order.
+    """
+
+    def __init__(self, regions):
+        self.orig_starts = np.array([r[0] for r in regions], dtype=np.float64)
+        lengths = np.array([r[1] - r[0] for r in regions], dtype=np.float64)
+        self.cond_starts = np.concatenate([[0.0], np.cumsum(lengths)[:-1]]) if len(regions) else np.zeros(0)
+        self.speech_sec = float(lengths.sum()) if len(regions) else 0.0
+
+    def condense(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Concatenate the speech regions of `samples` (must be the audio the regions came from)."""
+        pieces = []
+        for start, length in zip(self.orig_starts, np.diff(np.append(self.cond_starts, self.speech_sec))):
+            a = int(round(start * sample_rate))
+            pieces.append(samples[a:a + int(round(length * sample_rate))])
+        return np.concatenate(pieces) if pieces else samples[:0]
+
+    def to_original(self, times, ends: bool = False):
+        """
+        Vectorized condensed -> original time. With ends=True a time sitting exactly on a join
+        maps to the end of the earlier region instead of the start of the next one.
+        """
+        t = np.asarray(times, dtype=np.float64)
+        side = "left" if ends else "right"
+        idx = np.clip(np.searchsorted(self.cond_starts, t, side=side) - 1, 0, None)
+        return self.orig_starts[idx] + (t - self.cond_starts[idx])
+
+    def remap_segments(self, segments, offset: float = 0.0):
+        """
+        Shift segment and word start/end (dicts or stable-ts objects) from condensed time to
+        original time (+ offset), in place. Items reachable twice (whisperx's word_segments
+        share dicts with segment words) are only shifted once.
+        """
+        slots = []  # (item, key)
+        seen = set()
+
+        def add(item):
+            if id(item) in seen:
+                return
+            seen.add(id(item))
+            # whisperx leaves start/end off words it couldn't align (numbers etc.)
+            slots.extend((item, k) for k in ("start", "end") if _get(item, k) is not None)
+
+        for seg in segments:
+            add(seg)
+            words = seg.get("words", []) if isinstance(seg, dict) else getattr(seg, "words", None) or []
+            for w in words:
+                add(w)
+        if not slots or len(self.orig_starts) == 0:
+            return segments
+        times = np.array([_get(item, k) for item, k in slots], dtype=np.float64)
+        is_end = np.array([k == "end" for _, k in slots])
+        mapped = np.where(is_end, self.to_original(times, ends=True), self.to_original(times)) + offset
+        for (item, k), t in zip(slots, mapped.tolist()):
+            _set(item, k, t)
+        return segments
+
+
+def _get(item, key):
+    if isinstance(item, dict):
+        return item.get(key)
+    return getattr(item, key, None)
+
+
+def _set(item, key, value):
+    if isinstance(item, dict):
+        item[key] = value
+        return
+    try:
+        setattr(item, key, value)
+    except AttributeError:
+        # e.g. stable-ts segment start/end are derived from their words
+        pass
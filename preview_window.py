@@ -1,9 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, filedialog
+import numpy as np
 import pygame
 
 
+from utils.cue_index import CueIndex
 from utils.srt_utils import read_srt
+from utils.subtitle_track import SubtitleTrack
+from utils.wav_utils import wav_duration
+from utils.waveform import PeakPyramid
 
 class PreviewWindow(tk.Toplevel):
     def __init__(self, master, audio_path, srt_path):
@@ -13,14 +18,10 @@ class PreviewWindow(tk.Toplevel):
         self.audio_path = audio_path
 
         # Load subtitles
-        self.sub_entries = []  # list of (start_sec, end_sec, text)
-        if srt_path:
-            raw = read_srt(srt_path)
-            self.sub_entries = []
-            for ent in raw:
-                start = self._parse_ts(ent['start'])
-                end = self._parse_ts(ent['end'])
-                self.sub_entries.append((start, end, ent['text']))
+        # float start / end arrays, the timestamps are parsed once here
+        self.track = SubtitleTrack.from_cues(read_srt(srt_path)) if srt_path else SubtitleTrack.empty()
+        # bisect + playback cursor, so a tick doesn't scan every cue
+        self.cue_index = CueIndex(self.track.start, self.track.end)
 
         # Pre-init pygame mixer
         pygame.mixer.pre_init(frequency=44100, size=-16, channels=1, buffer=4096)
@@ -30,17 +31,19 @@ class PreviewWindow(tk.Toplevel):
             pass
         pygame.mixer.init()
         pygame.mixer.music.load(self.audio_path)
-        sound = pygame.mixer.Sound(self.audio_path)
-        self.duration = sound.get_length()
+        self.duration = self._probe_duration(self.audio_path)
         self.start_offset = 0.0
+        # min / max envelope at every zoom level, cached next to the audio
+        self.peaks = self._load_peaks(self.audio_path)
 
         # Subtitle display
         self.subtitle_label = ttk.Label(self, text="", wraplength=580, anchor="center", font=("Arial", 12))
         self.subtitle_label.pack(pady=(10, 0))
 
-        # Tick canvas
-        self.tick_canvas = tk.Canvas(self, height=20)
+        # Tick canvas: cue ticks on top, waveform below
+        self.tick_canvas = tk.Canvas(self, height=60)
         self.tick_canvas.pack(fill="x", padx=10)
+        self._draw_waveform()
         self._draw_ticks()
 
         # Progress bar scale
@@ -58,17 +61,46 @@ class PreviewWindow(tk.Toplevel):
 
         self._updating = False
 
-    def _parse_ts(self, ts_str):
-        # "HH:MM:SS,mmm" -> seconds
-        h, m, rest = ts_str.split(":")
-        s, ms = rest.split(",")
-        return int(h)*3600 + int(m)*60 + int(s) + int(ms)/1000.0
+    @staticmethod
+    def _probe_duration(audio_path):
+        # the wav header is enough; pygame's Sound would decode the whole file into RAM
+        try:
+            return wav_duration(audio_path)
+        except (OSError, ValueError):
+            # not a wav (mp3, ogg, ...): let pygame work it out
+            return pygame.mixer.Sound(audio_path).get_length()
+
+    @staticmethod
+    def _load_peaks(audio_path):
+        try:
+            return PeakPyramid.for_wav(audio_path)
+        except (OSError, ValueError) as e:
+            print(f"No waveform for {audio_path}: {e}")
+            return None
 
-    def _draw_ticks(self):
+    def _draw_waveform(self, t0=0.0, t1=None):
+        """One min / max line per pixel column of [t0, t1], whatever the zoom."""
+        w = self.tick_canvas.winfo_reqwidth() or 580
+        t1 = self.duration if t1 is None else t1
+        if self.peaks is None or t1 <= t0:
+            return
+        mins, maxs = self.peaks.columns(t0, t1, w)
+        mid, half = 38, 21
+        tops = (mid - maxs * half).astype(int).tolist()
+        bottoms = (mid - mins * half).astype(int).tolist()
+        for x, (top, bottom) in enumerate(zip(tops, bottoms)):
+            self.tick_canvas.create_line(x, top, x, bottom + 1, fill="gray50")
+
+    def _draw_ticks(self, t0=0.0, t1=None):
         w = self.tick_canvas.winfo_reqwidth() or 580
-        for start, _, _ in self.sub_entries:
-            x = int((start/self.duration) * w)
-            self.tick_canvas.create_line(x, 0, x, 20)
+        t1 = self.duration if t1 is None else t1
+        if t1 <= t0:
+            return
+        visible = self.cue_index.between(t0, t1)
+        # at most one line per pixel column, however many cues land in it
+        xs = np.unique(((self.track.start[visible] - t0) / (t1 - t0) * w).astype(int))
+        for x in xs[xs >= 0].tolist():  # cues that started before t0 have no tick
+            self.tick_canvas.create_line(x, 0, x, 14)
 
     def play(self):
         if pygame.mixer.music.get_busy():
@@ -102,9 +134,6 @@ class PreviewWindow(tk.Toplevel):
 
     def _update_subtitle(self, current_time):
         # Find matching subtitle
-        text = ''
-        for start, end, txt in self.sub_entries:
-            if start <= current_time <= end:
-                text = txt
-                break
+        i = self.cue_index.at(current_time)
+        text = self.track.texts[i] if i is not None else ''
         self.subtitle_label.config(text=text)
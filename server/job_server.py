@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from controllers.subtitle_pipeline import SubtitlePipeline, DEFAULT_SETTINGS
+from transcribers.model_pool import MODEL_POOL
+from utils.cancel import CancelToken, Cancelled
+from utils.lang_utils import get_language_code
+
+# Small local job server: other tools POST subtitle jobs instead of driving the Tk UI.
+# Plain asyncio + stdlib HTTP/1.1 (no web framework), TCP on localhost or a Unix socket.
+#
+#   POST   /jobs              {"audio_path": ..., "priority": 0, <settings>}  -> 202 {"id": ...}
+#   GET    /jobs              all jobs (status only)
+#   GET    /jobs/<id>         status + summary
+#   GET    /jobs/<id>/events  server-sent events: status / stage / cues / done / failed
+#   DELETE /jobs/<id>         cancel a queued job, or stop a running one at its next chunk
+#   GET    /health
+
+TERMINAL = ("done", "failed", "cancelled")
+
+
+class Job:
+    def __init__(self, job_id, audio_path, settings, priority, output_dir):
+        self.id = job_id
+        self.audio_path = audio_path
+        self.settings = settings
+        self.priority = priority
+        self.output_dir = output_dir
+        self.status = "queued"
+        self.stage = None    # pipeline stage while running (preprocessing, transcribing, ...)
+        self.created = time.time()
+        self.summary = None
+        self.error = None
+        self.cancel_token = CancelToken()
+        self.events = []     # every event so far; late SSE subscribers get a replay
+        self._changed = asyncio.Event()
+
+    def publish(self, event: str, data: dict):
+        """Record an event and wake every SSE stream of this job (event loop thread only)."""
+        self.events.append((event, data))
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def next_change(self) -> asyncio.Event:
+        """Event set by the next publish(); take it before reading `events`, then wait on it."""
+        return self._changed
+
+    def info(self) -> dict:
+        return {
+            "id": self.id, "audio_path": self.audio_path, "settings": self.settings,
+            "priority": self.priority, "status": self.status, "stage": self.stage, "created": self.created,
+            "summary": self.summary, "error": self.error,
+        }
+
+
+class JobServer:
+    """
+    Priority queue of subtitle jobs in front of a fixed pool of `workers` threads.
+
+    Every worker runs SubtitlePipeline.run on the shared MODEL_POOL, so models stay loaded
+    (warm) between jobs; `warm_up` specs are loaded before the first job is taken. Higher
+    `priority` runs first, equal priorities run in submit order.
+    """
+
+    def __init__(self, pipeline: SubtitlePipeline = None, workers: int = 1, output_dir: str = "output/jobs",
+                 warm_up=None):
+        self.pipeline = pipeline or SubtitlePipeline()
+        self.workers = max(1, workers)
+        self.output_dir = output_dir
+        self.warm_up = warm_up or []
+        self.jobs = {}
+        self._seq = itertools.count()
+        self._queue = None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        self._tasks = []
+
+    # ---- queue / workers ------------------------------------------------------------------
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+        loop = asyncio.get_running_loop()
+        if self.warm_up:
+            await loop.run_in_executor(self._executor, MODEL_POOL.warm_up, self.warm_up)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    def submit(self, audio_path: str, settings: dict, priority: int = 0) -> Job:
+        job_id = f"{int(time.time())}-{next(self._seq)}"
+        job = Job(job_id, audio_path, settings, priority, os.path.join(self.output_dir, job_id))
+        self.jobs[job_id] = job
+        self._queue.put_nowait((-priority, next(self._seq), job_id))
+        job.publish("status", {"status": "queued"})
+        return job
+
+    def cancel(self, job: Job) -> bool:
+        """
+        Queued jobs are dropped (the worker skips them when they come up); running jobs get
+        their cancel token set and stop at the next stage / chunk boundary.
+        """
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.publish("cancelled", {"status": "cancelled"})
+            return True
+        if job.status == "running":
+            job.cancel_token.cancel()
+            job.publish("status", {"status": "cancelling"})
+            return True
+        return False
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs[job_id]
+            if job.status != "queued":
+                continue
+            job.status = "running"
+            job.publish("status", {"status": "running"})
+
+            def on_cues(cues, job=job):
+                # called on the worker thread; hand the cues over to the event loop
+                loop.call_soon_threadsafe(job.publish, "cues", {"cues": cues, "until": cues[-1]["end"]})
+
+            def set_stage(name, job=job):
+                job.stage = name
+                job.publish("stage", {"stage": name})
+
+            def on_stage(name):
+                # worker thread too: preprocessing / loading model / transcribing / exporting
+                loop.call_soon_threadsafe(set_stage, name)
+
+            try:
+                os.makedirs(job.output_dir, exist_ok=True)
+                job.summary = await loop.run_in_executor(
+                    self._executor, self.pipeline.run, job.audio_path, job.settings,
+                    os.path.join(job.output_dir, "transcript.raw.srt"),
+                    os.path.join(job.output_dir, "transcript.srt"),
+                    os.path.join(job.output_dir, "words.npz"),
+                    on_cues,
+                    job.cancel_token,
+                    on_stage,
+                )
+                job.status = "done"
+                job.publish("done", job.summary)
+            except Cancelled:
+                job.status = "cancelled"
+                job.publish("cancelled", {"status": "cancelled"})
+            except Exception as e:
+                job.status = "failed"
+                job.error = f"{type(e).__name__}: {e}"
+                job.publish("failed", {"error": job.error})
+
+    # ---- HTTP -----------------------------------------------------------------------------
+
+    def job_settings(self, body: dict) -> dict:
+        settings = dict(DEFAULT_SETTINGS)
+        for key in settings:
+            if key in body:
+                settings[key] = body[key]
+        if isinstance(settings["language"], str):
+            settings["language"] = get_language_code(settings["language"])
+        if "stub_delay" in body:
+            settings["stub_delay"] = float(body["stub_delay"])
+        return settings
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, path, body = await _read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                return await _respond(writer, 400, {"error": "bad request"})
+            await self.route(method, path, body, writer)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body, writer):
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        if parts == ["health"]:
+            return await _respond(writer, 200, {"ok": True, "workers": self.workers,
+                                                "queued": sum(j.status == "queued" for j in self.jobs.values())})
+        if parts == ["jobs"] and method == "GET":
+            return await _respond(writer, 200, [j.info() for j in self.jobs.values()])
+        if parts == ["jobs"] and method == "POST":
+            try:
+                data = json.loads(body or b"{}")
+                audio_path = data["audio_path"]
+            except (ValueError, KeyError):
+                return await _respond(writer, 400, {"error": "JSON body with audio_path required"})
+            if not os.path.exists(audio_path):
+                return await _respond(writer, 400, {"error": f"no such file: {audio_path}"})
+            job = self.submit(audio_path, self.job_settings(data), int(data.get("priority", 0)))
+            return await _respond(writer, 202, {"id": job.id, "status": job.status})
+
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return await _respond(writer, 404, {"error": "unknown job"})
+            if len(parts) == 2 and method == "GET":
+                return await _respond(writer, 200, job.info())
+            if len(parts) == 2 and method == "DELETE":
+                if self.cancel(job):
+                    return await _respond(writer, 200, job.info())
+                return await _respond(writer, 409, {"error": f"job is {job.status}"})
+            if len(parts) == 3 and parts[2] == "events" and method == "GET":
+                return await self.stream_events(job, writer)
+        return await _respond(writer, 404, {"error": "not found"})
+
+    async def stream_events(self, job: Job, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        sent = 0
+        while True:
+            # take the event object now, synchronously, before sending: anything published
+            # while we write / drain below sets this one, so the wait returns at once and the
+            # final "done" can't slip in between the drain and the wait
+            change = job.next_change()
+            for event, data in job.events[sent:]:
+                writer.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            sent = len(job.events)
+            await writer.drain()
+            if job.status in TERMINAL and sent == len(job.events):
+                return
+            await change.wait()
+
+
+async def _read_request(reader):
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    method, path, _ = request_line.split(" ", 2)
+    length = 0
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, body
+
+
+async def _respond(writer, status: int, data):
+    reasons = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 409: "Conflict"}
+    payload = json.dumps(data).encode("utf-8")
+    writer.write(f"HTTP/1.1 {status} {reasons.get(status, '')}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload)
+    await writer.drain()
+
+
+async def serve(server: JobServer, host="127.0.0.1", port=8765, unix_socket=None):
+    await server.start()
+    if unix_socket:
+        listener = await asyncio.start_unix_server(server.handle, path=unix_socket)
+        print(f"[JobServer] Listening on unix:{unix_socket} with {server.workers} worker(s)")
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        print(f"[JobServer] Listening on http://{host}:{port} with {server.workers} worker(s)")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AutoSubs local job server")
+    parser.add_argument("--host", default="127.0.0.1", help="bind address (keep it local)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=1, help="jobs transcribed at the same time")
+    parser.add_argument("--output-dir", default="output/jobs")
+    parser.add_argument("--warm-up", nargs="*", default=[], metavar="BACKEND:SIZE",
+                        help="models to load before taking jobs, e.g. whisperx:small")
+    args = parser.parse_args(argv)
+
+    specs = []
+    for spec in args.warm_up:
+        backend, _, size = spec.partition(":")
+        specs.append(("stable", size, None, None) if backend == "stable" else (backend, size))
+    server = JobServer(workers=args.workers, output_dir=args.output_dir, warm_up=specs)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import tkinter as tk
+from tkinter import ttk
+
+from utils.timeline_model import TimelineModel
+
+
+class _Row:
+    """One pooled row: "start --> end" label + text entry, bound to a cue index (or None)."""
+
+    def __init__(self, parent, on_edit):
+        self.index = None
+        self.shown = None  # label text currently on screen
+        self.frame = ttk.Frame(parent, padding=5)
+        self.label = ttk.Label(self.frame, width=20)
+        self.label.pack(side="left")
+        self.text = tk.StringVar(self.frame)
+        self.entry = ttk.Entry(self.frame, textvariable=self.text)
+        self.entry.pack(side="left", fill="x", expand=True)
+        self.text.trace_add("write", lambda *_: on_edit(self))
+
+
+class VirtualTimeline(ttk.Frame):
+    """
+    Timeline editor that only has widgets for the rows on screen.
+
+    A handful of rows (enough to fill the viewport, re-counted on resize) are created once
+    and re-bound to other cue indices when scrolling -- a 100k cue timeline costs the same
+    widgets as a 10 cue one. Typing goes straight into the TimelineModel through each row's
+    StringVar, so nothing is lost when a row scrolls away and is re-used.
+    """
+
+    DEFAULT_ROW_HEIGHT = 32  # until the first row reports its real height
+
+    def __init__(self, master, model: TimelineModel = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = model if model is not None else TimelineModel()
+        self.top = 0  # cue index shown in the first row
+        self.rows = []
+        self.row_height = self.DEFAULT_ROW_HEIGHT
+        self._binding = False  # True while rows are filled in, so the edit callback ignores it
+
+        self.body = ttk.Frame(self)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body.pack_propagate(False)
+        self.body.bind("<Configure>", lambda e: self._resize(e.height))
+        self._bind_wheel(self.body)
+
+    # ---- model -> rows
+
+    def refresh(self):
+        """Call after the model changed (reset / extend / set_times): re-binds the visible rows."""
+        self.top = min(self.top, self._max_top())
+        self._bind_rows()
+
+    def _resize(self, height: int):
+        if self.rows and self.rows[0].frame.winfo_reqheight() > 1:
+            self.row_height = self.rows[0].frame.winfo_reqheight()
+        wanted = max(1, height // self.row_height + 1)
+        while len(self.rows) < wanted:
+            row = _Row(self.body, self._on_edit)
+            for widget in (row.frame, row.label, row.entry):
+                self._bind_wheel(widget)
+            self.rows.append(row)
+        self.refresh()
+
+    def _bind_rows(self):
+        n = len(self.model)
+        self._binding = True
+        try:
+            for k, row in enumerate(self.rows):
+                i = self.top + k
+                if i < n:
+                    label = self.model.label(i)
+                    if row.shown != label:
+                        row.shown = label
+                        row.label.config(text=label)
+                    if row.index != i or row.text.get() != self.model.texts[i]:
+                        row.index = i
+                        row.text.set(self.model.texts[i])
+                    if not row.frame.winfo_manager():
+                        row.frame.pack(fill="x")
+                else:
+                    row.index = None
+                    row.frame.pack_forget()
+        finally:
+            self._binding = False
+        visible = min(len(self.rows), n)
+        self.scrollbar.set(*((self.top / n, (self.top + visible) / n) if n else (0.0, 1.0)))
+
+    def _on_edit(self, row: _Row):
+        if not self._binding and row.index is not None:
+            self.model.set_text(row.index, row.text.get())
+
+    # ---- scrolling
+
+    def scroll_to(self, top: int):
+        top = max(0, min(int(top), self._max_top()))
+        if top != self.top:
+            self.top = top
+            self._bind_rows()
+
+    def _max_top(self) -> int:
+        # the last row may be cut off by the viewport, so the last cue can sit one row higher
+        return max(0, len(self.model) - len(self.rows) + 1)
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units" | "pages")."""
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.model)))
+        elif args[0] == "scroll":
+            step = max(1, len(self.rows) - 1) if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.yview("scroll", -1 if e.delta > 0 else 1, "units"))
+        widget.bind("<Button-4>", lambda e: self.yview("scroll", -1, "units"))  # X11
+        widget.bind("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
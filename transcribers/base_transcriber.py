@@ -1,11 +1,59 @@
 from abc import ABC, abstractmethod
 
+from preprocessors.vad import SpeechMap
+from utils.word_store import WordStore
+
 class TranscriberBase(ABC):
-    def __init__(self, model_size: str, language: str = "en"):
+    SAMPLE_RATE = 16000  # whisper / alignment models take 16 kHz mono float32
+    # aligned words of the last run, re-grouped from here without re-running ASR
+    WORDS_PATH = "output/transcript_words.npz"
+    # identity used by the result cache: which backend / precision produced a result
+    BACKEND = None
+    COMPUTE_TYPE = None
+
+    def __init__(self, model_size: str, language: str = "en", vad=None):
         self.model_size = model_size
         self.language = language
+        self.vad = vad  # optional VoiceActivityDetector: only speech regions get transcribed
+        self.cancel_token = None  # optional utils.cancel.CancelToken, checked between pieces of work
+
+    def check_cancel(self):
+        """Raise utils.cancel.Cancelled if the job was cancelled (no-op without a token)."""
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+
+    def speech_only(self, audio):
+        """
+        Cut silence out of a 16 kHz buffer before it goes to the model.
+        Returns (audio_to_transcribe, speech_map); speech_map is None when VAD is off.
+        Use speech_map.remap_segments(...) to put timestamps back on the original timeline.
+        """
+        if self.vad is None:
+            return audio, None
+        regions = self.vad.detect(audio, self.SAMPLE_RATE)
+        speech_map = SpeechMap(regions)
+        total = len(audio) / self.SAMPLE_RATE
+        print(f"[VAD] {len(regions)} speech regions, transcribing {speech_map.speech_sec:.1f}s of {total:.1f}s")
+        return speech_map.condense(audio, self.SAMPLE_RATE), speech_map
+
+    def save_words(self, segments, path: str = None) -> WordStore:
+        """Persist the aligned words (start/end/score columns + word table) of `segments`."""
+        store = WordStore.from_segments(segments)
+        store.save(path or self.WORDS_PATH)
+        print(f"Saved {len(store)} aligned words to {path or self.WORDS_PATH}")
+        return store
 
     @abstractmethod
     def transcribe(self, audio_path: str) -> dict:
         """Return dict with 'segments' and/or .text"""
-        pass
\ No newline at end of file
+        pass
+
+    def transcribe_stream(self, audio_path: str):
+        """
+        Yield segments (dicts or result objects, original timeline) as they become available.
+        Default: run transcribe() and hand out its segments; backends that can work piece by
+        piece override this so callers see the first cues early.
+        """
+        result = self.transcribe(audio_path)
+        segments = result["segments"] if isinstance(result, dict) else getattr(result, "segments", [])
+        yield from segments
\ No newline at end of file
@@ -0,0 +1,85 @@
+import time
+
+from utils.mem_utils import available_ram_bytes
+
+# rough extra RAM per 30 s window decoded in the same forward pass (int8, CPU)
+_BYTES_PER_WINDOW = {
+    "tiny": 40 * 1024 ** 2, "base": 50 * 1024 ** 2, "small": 80 * 1024 ** 2,
+    "medium": 150 * 1024 ** 2, "large": 250 * 1024 ** 2, "large-v2": 250 * 1024 ** 2,
+    "large-v3": 250 * 1024 ** 2,
+}
+
+
+class AdaptiveBatcher:
+    """
+    Picks the `batch_size` passed to the WhisperX pipeline (how many 30 s windows CTranslate2
+    decodes per forward pass) for the batches of a job.
+
+    The ceiling comes from available RAM. Within it the batcher probes: the first batch runs at
+    batch_size=1 (the old serial behaviour, kept as the baseline), then the size doubles for as
+    long as measured throughput (audio seconds per wall second) keeps improving, and settles on
+    the best size seen.
+    """
+    WINDOW_SEC = 30.0
+
+    def __init__(self, model_size: str = "small", max_batch: int = 32, mem_fraction: float = 0.5,
+                 min_gain: float = 1.05):
+        per_window = _BYTES_PER_WINDOW.get(model_size, _BYTES_PER_WINDOW["large"])
+        ram_cap = int(available_ram_bytes() * mem_fraction // per_window)
+        self.cap = max(1, min(max_batch, ram_cap))
+        self.min_gain = min_gain
+        self.batch_size = 1
+        self.settled = self.cap == 1
+        self.stats = {}  # batch_size -> [audio_sec, wall_sec, batches]
+
+    def next_batch_size(self) -> int:
+        return self.batch_size
+
+    def group_seconds(self) -> float:
+        """Audio per model call that gives the current batch size something to batch."""
+        return self.batch_size * self.WINDOW_SEC
+
+    def throughput(self, batch_size: int) -> float:
+        audio, wall, _ = self.stats.get(batch_size, (0.0, 0.0, 0))
+        return audio / wall if wall > 0 else 0.0
+
+    def best(self) -> int:
+        return max(self.stats, key=self.throughput) if self.stats else self.batch_size
+
+    def record(self, batch_size: int, audio_sec: float, wall_sec: float):
+        entry = self.stats.setdefault(batch_size, [0.0, 0.0, 0])
+        entry[0] += audio_sec
+        entry[1] += wall_sec
+        entry[2] += 1
+        if self.settled:
+            return
+        # the last batch of a job may be short; only a full-ish batch is a fair measurement
+        if audio_sec < 0.5 * batch_size * self.WINDOW_SEC and batch_size > 1:
+            return
+        best = self.best()
+        if best == batch_size and batch_size < self.cap:
+            previous = self.throughput(batch_size // 2) if batch_size > 1 else 0.0
+            if previous == 0.0 or self.throughput(batch_size) >= previous * self.min_gain:
+                self.batch_size = min(batch_size * 2, self.cap)
+                return
+        self.batch_size = best
+        self.settled = True
+
+    def timed(self, fn, audio_sec: float, *args, **kwargs):
+        """Run fn(*args, batch_size=..., **kwargs), record its timing, return its result."""
+        bs = self.batch_size
+        t0 = time.perf_counter()
+        result = fn(*args, batch_size=bs, **kwargs)
+        self.record(bs, audio_sec, time.perf_counter() - t0)
+        return result
+
+    def report(self):
+        if not self.stats:
+            return
+        serial = self.throughput(1)
+        print(f"[Batching] RAM cap {self.cap}, chosen batch_size={self.best()}")
+        for bs in sorted(self.stats):
+            audio, wall, n = self.stats[bs]
+            speedup = f", {self.throughput(bs) / serial:.2f}x serial" if serial else ""
+            print(f"[Batching]   batch_size={bs:<3} {n} batches, {audio:.0f}s audio in {wall:.1f}s "
+                  f"-> {self.throughput(bs):.2f} audio-s/wall-s{speedup}")
@@ -0,0 +1,105 @@
+from collections import namedtuple
+
+import numpy as np
+
+from utils.wav_utils import iter_wav_blocks, wav_sample_rate
+
+# start/end: what gets cut out and transcribed (core widened by the overlap)
+# core_start/core_end: the part this chunk "owns" when words are merged back together
+ChunkSpan = namedtuple("ChunkSpan", ["start", "end", "core_start", "core_end"])
+
+
+def frame_energy(samples: np.ndarray, sample_rate: int, frame_ms: float = 20.0) -> np.ndarray:
+    """Per-frame energy in dB of a mono float signal (partial last frame dropped)."""
+    frame_len = max(int(sample_rate * frame_ms / 1000.0), 1)
+    n = len(samples) // frame_len
+    frames = samples[:n * frame_len].reshape(n, frame_len)
+    return 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-12)
+
+
+def wav_frame_energy(path: str, frame_ms: float = 20.0, frames_per_block: int = 4096):
+    """frame_energy over a whole wav, read block by block. Returns (energy_db, duration_sec)."""
+    sr = wav_sample_rate(path)
+    frame_len = max(int(sr * frame_ms / 1000.0), 1)
+    energies, total = [], 0
+    for block in iter_wav_blocks(path, frame_len * frames_per_block):
+        mono = block.mean(axis=1)
+        total += len(mono)
+        energies.append(frame_energy(mono, sr, frame_ms))
+    energy = np.concatenate(energies) if energies else np.zeros(0)
+    return energy, total / float(sr)
+
+
+def smooth_energy(energy_db: np.ndarray, smooth_frames: int = 5) -> np.ndarray:
+    """Moving average so cuts land in a silent stretch, not on a single quiet frame."""
+    if smooth_frames > 1 and len(energy_db) >= smooth_frames:
+        return np.convolve(energy_db, np.ones(smooth_frames) / smooth_frames, mode="same")
+    return energy_db
+
+
+def find_cut(smoothed: np.ndarray, frame_sec: float, target: float, search_window: float, duration: float) -> float:
+    """Time of the quietest frame within +/- search_window of `target` (ties: nearest the target)."""
+    lo = int(max(target - search_window, 0) / frame_sec)
+    hi = int(min(target + search_window, duration) / frame_sec)
+    window = smoothed[lo:hi]
+    if len(window) == 0:
+        return float(min(target, duration))
+    quietest = np.flatnonzero(window == window.min())
+    best = quietest[np.argmin(np.abs((lo + quietest + 0.5) * frame_sec - target))]
+    return float((lo + best + 0.5) * frame_sec)
+
+
+def plan_chunks(energy_db: np.ndarray, frame_sec: float, duration: float, chunk_len: float = 60.0,
+                search_window: float = 5.0, overlap: float = 0.5, smooth_frames: int = 5):
+    """
+    Pick chunk cut points at the quietest spot within +/- search_window of every chunk_len
+    target, instead of cutting mid-word at fixed boundaries. Each chunk is then widened by
+    `overlap` seconds on both sides; the words in the overlap get de-duplicated later using
+    the chunk cores (see keep_core_words).
+    """
+    if search_window >= chunk_len:
+        raise ValueError("search_window must be smaller than chunk_len")
+
+    smoothed = smooth_energy(energy_db, smooth_frames)
+
+    cuts = [0.0]
+    while duration - (cuts[-1] + chunk_len) >= search_window:
+        cuts.append(find_cut(smoothed, frame_sec, cuts[-1] + chunk_len, search_window, duration))
+    cuts.append(float(duration))
+
+    spans = []
+    for i in range(len(cuts) - 1):
+        core_start = cuts[i] if i > 0 else -np.inf
+        core_end = cuts[i + 1] if i < len(cuts) - 2 else np.inf
+        spans.append(ChunkSpan(
+            start=max(cuts[i] - overlap, 0.0),
+            end=min(cuts[i + 1] + overlap, duration),
+            core_start=float(core_start),
+            core_end=float(core_end),
+        ))
+    return spans
+
+
+def keep_core_words(segments, span: ChunkSpan):
+    """
+    Drop the words (absolute timestamps) whose midpoint lies outside the chunk's core, so a
+    word heard in the overlap of two chunks is only kept once. Words without timestamps
+    follow the word before them. Segments left without words are dropped.
+    """
+    kept_segments = []
+    for seg in segments:
+        kept, keep_prev = [], True
+        for w in seg.get("words", []):
+            if "start" in w and "end" in w:
+                mid = 0.5 * (w["start"] + w["end"])
+                keep_prev = span.core_start <= mid < span.core_end
+            if keep_prev:
+                kept.append(w)
+        timed = [w for w in kept if "start" in w]
+        if not timed:
+            continue
+        seg["words"] = kept
+        seg["start"] = timed[0]["start"]
+        seg["end"] = timed[-1]["end"]
+        kept_segments.append(seg)
+    return kept_segments
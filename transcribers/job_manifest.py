@@ -0,0 +1,66 @@
+import os
+
+from utils.fs_utils import atomic_write_json, read_json
+
+
+class JobManifest:
+    """
+    On-disk record of a chunked transcription job, so a crashed job resumes where it died.
+
+    folder/manifest.json    job signature (input hash, model, language, settings) + chunk plan
+    folder/chunk_NNN.json   aligned segments of one chunk, on the chunk's own timeline
+
+    Every file is written to a temp file and renamed, so a chunk file either exists complete
+    or not at all; its presence is what marks the chunk as done.
+    """
+
+    def __init__(self, folder: str, signature: dict, plan: list, finished: bool = False):
+        self.folder = folder
+        self.signature = signature
+        self.plan = plan
+        self.finished = finished
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.folder, "manifest.json")
+
+    def chunk_path(self, idx: int) -> str:
+        return os.path.join(self.folder, f"chunk_{idx:03}.json")
+
+    @classmethod
+    def load(cls, folder: str, signature: dict):
+        """The manifest in `folder` if it belongs to the same job (same signature), else None."""
+        data = read_json(os.path.join(folder, "manifest.json"))
+        if not data or data.get("signature") != signature:
+            return None
+        return cls(folder, data["signature"], data["plan"], data.get("finished", False))
+
+    @classmethod
+    def create(cls, folder: str, signature: dict, plan: list):
+        """Start a fresh job: drop any chunk results left over from a different job."""
+        os.makedirs(folder, exist_ok=True)
+        for name in os.listdir(folder):
+            if name.startswith("chunk_") and name.endswith(".json"):
+                os.remove(os.path.join(folder, name))
+        manifest = cls(folder, signature, plan)
+        manifest.save()
+        return manifest
+
+    def save(self):
+        atomic_write_json(self.path, {"signature": self.signature, "plan": self.plan, "finished": self.finished})
+
+    def is_done(self, idx: int) -> bool:
+        return os.path.exists(self.chunk_path(idx))
+
+    def done_count(self) -> int:
+        return sum(self.is_done(i) for i in range(len(self.plan)))
+
+    def save_chunk(self, idx: int, segments: list):
+        atomic_write_json(self.chunk_path(idx), segments)
+
+    def load_chunk(self, idx: int) -> list:
+        return read_json(self.chunk_path(idx), default=[])
+
+    def mark_finished(self):
+        self.finished = True
+        self.save()
@@ -0,0 +1,120 @@
+import numpy as np
+
+from .chunk_planner import frame_energy
+from utils.fs_utils import atomic_write_json, file_lock, read_json
+from utils.hash_utils import memo_file_sha256
+
+WINDOW_SEC = 30.0  # whisper looks at (at most) one 30 s window per language guess
+
+
+def speech_windows(samples: np.ndarray, sample_rate: int, n_windows: int = 3, window_sec: float = WINDOW_SEC):
+    """
+    (start, end) sample ranges of the `n_windows` most speech-dense, non-overlapping windows.
+    Density = share of 20 ms frames within 25 dB of the file's loud level (90th percentile),
+    so intros / music beds / silence don't decide the language.
+    """
+    frame_sec = 0.02
+    energy = frame_energy(samples, sample_rate, frame_sec * 1000.0)
+    win = int(window_sec / frame_sec)
+    if len(energy) <= win:
+        return [(0, len(samples))]
+    active = (energy > np.percentile(energy, 90) - 25.0).astype(np.float64)
+    csum = np.concatenate([[0.0], np.cumsum(active)])
+    hop = win // 2
+    starts = np.arange(0, len(energy) - win + 1, hop)
+    density = csum[starts + win] - csum[starts]
+
+    picked = []
+    for i in np.argsort(-density, kind="stable"):
+        s = int(starts[i])
+        if all(abs(s - p) >= win for p in picked):
+            picked.append(s)
+        if len(picked) == n_windows:
+            break
+    to_sample = sample_rate * frame_sec
+    return [(int(s * to_sample), int((s + win) * to_sample)) for s in sorted(picked)]
+
+
+def detect_window(model, window: np.ndarray):
+    """(language, probability) for one <= 30 s window, with a whisperx (faster-whisper) pipeline."""
+    try:
+        from whisperx.audio import log_mel_spectrogram, N_SAMPLES
+        fw = model.model  # faster_whisper.WhisperModel inside the whisperx pipeline
+        n_mels = fw.feat_kwargs.get("feature_size") or 80
+        mel = log_mel_spectrogram(window[:N_SAMPLES], n_mels=n_mels,
+                                  padding=max(N_SAMPLES - len(window), 0))
+        token, prob = fw.model.detect_language(fw.encode(mel))[0][0]
+        return token[2:-2], float(prob)
+    except (AttributeError, ImportError, TypeError):
+        # older / different whisperx: only the language code is exposed
+        return model.detect_language(window), 1.0
+
+
+class LanguageDetector:
+    """
+    Detect the language of a file once, from a few speech-dense windows, and remember it
+    per audio hash (output/cache/language.json) so re-runs and every chunk reuse it.
+
+    min_confidence: below this the file counts as uncertain (mixed language, bad audio);
+    piece_language() then lets a confident per-chunk guess override the file language.
+    """
+
+    def __init__(self, cache_path: str = "output/cache/language.json", n_windows: int = 3,
+                 min_confidence: float = 0.6):
+        self.cache_path = cache_path
+        self.n_windows = n_windows
+        self.min_confidence = min_confidence
+
+    def _read(self) -> dict:
+        return read_json(self.cache_path, default=None) or {"hashes": {}, "languages": {}}
+
+    def cached(self, audio_path: str):
+        """(language, confidence) detected earlier for this audio, or None. No model needed."""
+        cache = self._read()
+        digest = memo_file_sha256(audio_path, cache["hashes"])
+        hit = cache["languages"].get(digest)
+        return (hit["language"], hit["confidence"]) if hit else None
+
+    def detect(self, model, samples: np.ndarray, sample_rate: int, audio_path: str = None):
+        """(language, confidence) for the whole file; cached by audio hash when audio_path is given."""
+        cache = self._read()
+        digest = memo_file_sha256(audio_path, cache["hashes"]) if audio_path else None
+        if digest in cache["languages"]:
+            hit = cache["languages"][digest]
+            print(f"[Language] {hit['language']} ({hit['confidence']:.2f}, cached)")
+            return hit["language"], hit["confidence"]
+        hashes = cache["hashes"]
+
+        # vote: sum of per-window probabilities, confidence = the winner's mean probability
+        votes = {}
+        windows = speech_windows(samples, sample_rate, self.n_windows)
+        for a, b in windows:
+            language, prob = detect_window(model, samples[a:b])
+            votes[language] = votes.get(language, 0.0) + prob
+        language = max(votes, key=votes.get)
+        confidence = votes[language] / len(windows)
+        print(f"[Language] Detected {language} ({confidence:.2f}) from {len(windows)} speech windows")
+
+        if digest is not None:
+            # other jobs may have written the file since it was read above: re-read and merge
+            # under the lock, so nobody's entries (or hash memo) get overwritten
+            with file_lock(self.cache_path):
+                cache = self._read()
+                cache["hashes"].update(hashes)
+                cache["languages"][digest] = {"language": language, "confidence": confidence}
+                atomic_write_json(self.cache_path, cache)
+        return language, confidence
+
+    def piece_language(self, model, piece: np.ndarray, sample_rate: int, language: str, confidence: float) -> str:
+        """
+        Language for one chunk / piece: the file language, unless the file detection was
+        uncertain and this piece is confidently something else.
+        """
+        if confidence is None or confidence >= self.min_confidence or len(piece) == 0:
+            return language
+        a, b = speech_windows(piece, sample_rate, 1)[0]
+        piece_lang, prob = detect_window(model, piece[a:b])
+        if piece_lang != language and prob >= self.min_confidence:
+            print(f"[Language] Piece override: {piece_lang} ({prob:.2f}) instead of {language}")
+            return piece_lang
+        return language
@@ -0,0 +1,159 @@
+import gc
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from utils.mem_utils import current_rss_bytes, total_ram_bytes
+
+# rough resident sizes (bytes) used when the RSS delta of a load can't be measured
+_APPROX_SIZES = {
+    "tiny": 150 * 1024 ** 2, "base": 300 * 1024 ** 2, "small": 700 * 1024 ** 2,
+    "medium": 1800 * 1024 ** 2, "large": 3500 * 1024 ** 2, "large-v2": 3500 * 1024 ** 2,
+    "large-v3": 3500 * 1024 ** 2, "align": 400 * 1024 ** 2,
+}
+
+
+class ModelPool:
+    """
+    Process-wide cache of loaded Whisper / alignment models.
+
+    Whisper models are keyed by (backend, model_size, compute_type, device), alignment models
+    by ("align", language, device). Loading a model that would push the pool past `max_bytes`
+    evicts the least recently used ones first. Models that are still referenced by a running
+    transcriber stay alive until it lets go of them; eviction only drops the pool's reference.
+
+    A shared model is not safe to transcribe with from two threads at once (whisperx's
+    pipeline swaps its tokenizer / options per call), so every transcribe call goes through
+    lock_for(model); preprocessing, alignment and export of parallel jobs still overlap.
+    """
+
+    def __init__(self, max_bytes: int = None):
+        # default budget: half the machine's RAM
+        self.max_bytes = max_bytes if max_bytes is not None else total_ram_bytes() // 2
+        self._entries = OrderedDict()  # key -> {"model": ..., "bytes": int, "loaded_at": float}
+        self._lock = threading.RLock()
+        self._model_locks = weakref.WeakKeyDictionary()  # model -> Lock, gone with the model
+        self.hits = 0
+        self.misses = 0
+
+    # ---- public API -------------------------------------------------------------------
+
+    def get_whisper(self, backend: str, model_size: str, compute_type: str = "int8", device: str = "cpu"):
+        """backend is "whisperx" or "stable"."""
+        key = (backend, model_size, compute_type, device)
+        return self._get(key, lambda: self._load_whisper(backend, model_size, compute_type, device),
+                         _APPROX_SIZES.get(model_size, _APPROX_SIZES["large"]))
+
+    def get_align(self, language: str, device: str = "cpu"):
+        """Returns (align_model, metadata) for `language`."""
+        key = ("align", language, device)
+        return self._get(key, lambda: self._load_align(language, device), _APPROX_SIZES["align"])
+
+    def lock_for(self, model) -> threading.Lock:
+        """The lock to hold around `model.transcribe` (one per model object)."""
+        with self._lock:
+            lock = self._model_locks.get(model)
+            if lock is None:
+                lock = self._model_locks[model] = threading.Lock()
+            return lock
+
+    def warm_up(self, specs, background: bool = False):
+        """
+        Pre-load models, e.g. specs=[("whisperx", "small")] or [("whisperx", "small", "int8", "cpu")].
+        With background=True the loads run on a daemon thread and this returns immediately.
+        """
+        def _run():
+            for spec in specs:
+                try:
+                    self.get_whisper(*spec)
+                except Exception as e:
+                    print(f"[ModelPool] Warm-up of {spec} failed: {e}")
+
+        if background:
+            t = threading.Thread(target=_run, name="model-warmup", daemon=True)
+            t.start()
+            return t
+        _run()
+
+    def unload(self, key=None):
+        """Drop one model (by key) or, with key=None, everything."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        self._release_memory()
+
+    def loaded(self):
+        with self._lock:
+            return {k: e["bytes"] for k, e in self._entries.items()}
+
+    def used_bytes(self) -> int:
+        with self._lock:
+            return sum(e["bytes"] for e in self._entries.values())
+
+    # ---- internals --------------------------------------------------------------------
+
+    def _get(self, key, loader, approx_bytes: int):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                print(f"[ModelPool] Reusing loaded model {key}")
+                return entry["model"]
+
+            self.misses += 1
+            self._make_room(approx_bytes)
+            print(f"[ModelPool] Loading {key}...")
+            before = current_rss_bytes()
+            t0 = time.perf_counter()
+            model = loader()
+            delta = current_rss_bytes() - before
+            size = delta if delta > 0 else approx_bytes
+            self._entries[key] = {"model": model, "bytes": size, "loaded_at": time.time()}
+            print(f"[ModelPool] Loaded {key} in {time.perf_counter() - t0:.1f}s (~{size / 1024 ** 2:.0f} MB)")
+            self._make_room(0)
+            return model
+
+    def _make_room(self, incoming: int):
+        evicted = False
+        while self._entries and self.used_bytes() + incoming > self.max_bytes:
+            # never evict the model we just loaded (it is last in the order)
+            if incoming == 0 and len(self._entries) == 1:
+                break
+            key, _ = self._entries.popitem(last=False)
+            print(f"[ModelPool] Evicting {key} (budget {self.max_bytes / 1024 ** 2:.0f} MB)")
+            evicted = True
+        if evicted:
+            self._release_memory()
+
+    @staticmethod
+    def _release_memory():
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    @staticmethod
+    def _load_whisper(backend: str, model_size: str, compute_type: str, device: str):
+        if backend == "stable":
+            import stable_whisper
+            if device is None:
+                return stable_whisper.load_model(model_size)
+            return stable_whisper.load_model(model_size, device=device)
+        import whisperx
+        return whisperx.load_model(model_size, device, compute_type=compute_type)
+
+    @staticmethod
+    def _load_align(language: str, device: str):
+        import whisperx
+        return whisperx.load_align_model(language_code=language, device=device)
+
+
+# shared by every transcriber in this process
+MODEL_POOL = ModelPool()
@@ -0,0 +1,91 @@
+import numpy as np
+import whisperx
+
+from .model_pool import MODEL_POOL
+from utils.audio_buffer import AudioBuffer
+from utils.subtitle_track import SubtitleTrack
+from utils.word_store import WordStore
+
+
+class Realigner:
+    """
+    Re-time only the cues a user edited, without running ASR again.
+
+    Each edited cue's new text is force-aligned (whisperx.align, alignment model from
+    MODEL_POOL so it's loaded once per language) against its own audio, the old cue span plus
+    `margin` seconds on each side -- a fixed word moves a little, it doesn't jump around.
+    The new word timings are spliced into the track (and the word store); every other cue
+    keeps its times. Ten fixed cues in an hour of audio is ten sub-second align calls.
+    """
+
+    MARGIN = 0.3  # seconds of audio around the old cue span
+
+    def __init__(self, language: str = "en", device: str = "cpu", margin: float = None):
+        self.language = language
+        self.device = device
+        self.margin = self.MARGIN if margin is None else margin
+        self.cancel_token = None  # optional utils.cancel.CancelToken, checked between cues
+
+    def align_cue(self, audio: AudioBuffer, start: float, end: float, text: str) -> list:
+        """Aligned words (original timeline) of `text` inside [start - margin, end + margin]."""
+        a = max(start - self.margin, 0.0)
+        b = min(end + self.margin, audio.duration)
+        piece = audio.slice(a, b)
+        align_model, metadata = MODEL_POOL.get_align(self.language, self.device)
+        # one segment covering the whole piece: whisperx places the words anywhere inside it
+        aligned = whisperx.align([{"start": 0.0, "end": b - a, "text": text}], align_model, metadata,
+                                 piece, device=self.device)
+        words = [w for seg in aligned["segments"] for w in seg.get("words", [])]
+        for w in words:
+            if "start" in w:
+                w["start"] += a
+                w["end"] += a
+        return words
+
+    def realign(self, audio_path: str, track: SubtitleTrack, edited, store: WordStore = None) -> tuple:
+        """
+        Re-align the cues `edited` (indices into `track`) against `audio_path` (16 kHz wav).
+        Returns (new track, new store or None). steps:
+        1. per edited cue: slice its span (+ margin), align its current text
+        2. clamp the new words to [old start, next cue's start): the margin lets whisperx
+           look around, but the words must stay in the old cue's slot or the store (and every
+           regroup after it) goes out of time order
+        3. cue start / end = first / last aligned word; a cue with no aligned word (or no
+           text) keeps its old times
+        4. store: the words that started inside the old cue are swapped for the new ones
+        """
+        audio = AudioBuffer.for_wav(audio_path)
+        start, end = track.start.copy(), track.end.copy()
+        # old cue i owns [its start, next cue's start), in start order
+        order = np.argsort(track.start, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        next_start = np.r_[track.start[order][1:], np.inf][rank] if len(track) else np.zeros(0)
+        new_words = {}
+        for i in sorted(set(edited)):
+            if self.cancel_token is not None:
+                self.cancel_token.check()
+            text = track.texts[i].strip()
+            if not text:
+                continue
+            words = self.align_cue(audio, float(track.start[i]), float(track.end[i]), text)
+            lo, hi = float(track.start[i]), float(next_start[i])
+            for w in words:
+                if "start" in w:
+                    # a start exactly at hi would belong to the next cue; 1 ms before it
+                    w["start"] = min(max(w["start"], lo), max(lo, hi - 0.001))
+                    w["end"] = min(max(w["end"], w["start"]), hi)
+            new_words[i] = words
+            times = [(w["start"], w["end"]) for w in words if "start" in w]
+            if times:
+                start[i] = min(s for s, _ in times)
+                end[i] = max(e for _, e in times)
+        print(f"[Realign] {len(new_words)} cues re-aligned ({len(set(edited)) - len(new_words)} empty skipped)")
+
+        if store is not None and len(track):
+            # all spans come from the old store, then get spliced from the back so earlier
+            # positions stay put
+            spans = sorted((store.span(track.start[i], next_start[i]), i) for i in new_words)
+            for (lo, hi), i in reversed(spans):
+                store = store.splice(lo, hi, WordStore.from_segments([{"words": new_words[i]}]))
+        return SubtitleTrack(start, end, list(track.texts)), store
@@ -0,0 +1,232 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.fs_utils import atomic_write_json, file_lock, read_json
+from utils.hash_utils import memo_file_sha256
+
+
+def _plain(item):
+    """Segment / word as a JSON-able dict (whisperx gives dicts, stable-ts gives objects)."""
+    if isinstance(item, dict):
+        return item
+    out = {}
+    for key in ("start", "end", "text", "word", "probability", "score"):
+        val = getattr(item, key, None)
+        if val is not None:
+            out[key] = val
+    words = getattr(item, "words", None)
+    if words is not None:
+        out["words"] = [_plain(w) for w in words]
+    return out
+
+
+class ResultCache:
+    """
+    Persistent cache of aligned transcription results.
+
+    Key = sha256(processed audio) + backend + model size + compute type + language + VAD
+    settings, so "Start Process" on the same file with the same combo hands back the stored
+    segments instead of minutes of ASR. Entries are one JSON file each, evicted
+    least-recently-used once the folder goes over `max_bytes`.
+
+    python -m transcribers.result_cache list | stats | purge [--all | KEY ...]
+    """
+    VERSION = 1  # bump when transcribers change what they return for the same settings
+    CHUNK_PARAMS = ("chunk_len", "search_window", "overlap", "batched")
+
+    def __init__(self, cache_dir: str = "output/cache/results", max_bytes: int = 512 * 1024 ** 2):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._read_index()
+        # several jobs (batch threads / job server) may share one cache
+        self._lock = threading.RLock()
+
+    def _read_index(self) -> dict:
+        return read_json(self.index_path, default=None) or {
+            "entries": {}, "hashes": {}, "hits": 0, "misses": 0, "evictions": 0
+        }
+
+    def _save(self):
+        atomic_write_json(self.index_path, self.index)
+
+    @contextmanager
+    def _updating(self):
+        """
+        Read-modify-write of index.json. Other processes (batch_cli runs, the job server)
+        share the folder, so under the file lock the index is re-read first -- keeping their
+        entries and counters -- with this process's hash memo merged in, and saved after.
+        """
+        with self._lock, file_lock(self.index_path):
+            hashes = self.index["hashes"]
+            self.index = self._read_index()
+            self.index["hashes"].update(hashes)
+            yield self.index
+            self._save()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def params(self, audio_path: str, transcriber) -> dict:
+        vad = getattr(transcriber, "vad", None)
+        return {
+            "v": self.VERSION,
+            "audio_sha256": memo_file_sha256(audio_path, self.index["hashes"]),
+            "backend": transcriber.BACKEND,
+            "model_size": transcriber.model_size,
+            "compute_type": transcriber.COMPUTE_TYPE,
+            "language": transcriber.language,
+            "vad": vars(vad) if vad is not None else None,
+            # chunking / batching change the segments too (only the backends that have them)
+            "chunking": {k: getattr(transcriber, k) for k in self.CHUNK_PARAMS if hasattr(transcriber, k)},
+        }
+
+    def key(self, params: dict) -> str:
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+    def get(self, key: str):
+        """Cached segments for `key` (and mark them recently used), or None."""
+        entry = self.index["entries"].get(key)
+        data = read_json(self._path(key)) if entry is not None else None
+        if data is None:
+            self.index["entries"].pop(key, None)
+            return None
+        entry["last_used"] = time.time()
+        return data["segments"]
+
+    def put(self, key: str, params: dict, segments: list):
+        path = self._path(key)
+        atomic_write_json(path, {"params": params, "segments": [_plain(s) for s in segments]})
+        now = time.time()
+        self.index["entries"][key] = {
+            "size": os.path.getsize(path),
+            "created": now,
+            "last_used": now,
+            "backend": params["backend"],
+            "model_size": params["model_size"],
+            "language": params["language"],
+            "audio_sha256": params["audio_sha256"],
+            "segments": len(segments),
+        }
+        self._evict(keep=key)
+
+    def _evict(self, keep=None):
+        entries = self.index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries.pop(key)["size"]
+            self.index["evictions"] += 1
+            self._remove_file(key)
+
+    def _remove_file(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def stream(self, transcriber, audio_path: str, bypass: bool = False):
+        """
+        transcriber.transcribe_stream(audio_path), served from the cache when possible.
+        On a miss the live segments are passed through as they arrive and stored once the
+        stream completes (a cancelled / failed run stores nothing). bypass=True skips the
+        lookup but still refreshes the entry.
+        """
+        with self._lock:
+            params = self.params(audio_path, transcriber)
+            key = self.key(params)
+            with self._updating():
+                cached = None if bypass else self.get(key)
+                if cached is not None:
+                    self.index["hits"] += 1
+                elif not bypass:
+                    self.index["misses"] += 1
+        if cached is not None:
+            print(f"[ResultCache] Hit ({params['backend']}/{params['model_size']}/{params['language']}): "
+                  f"{len(cached)} segments, skipping transcription")
+            yield from cached
+            return
+
+        segments = []
+        for seg in transcriber.transcribe_stream(audio_path):
+            segments.append(seg)
+            yield seg
+        with self._updating():
+            self.put(key, params, segments)
+        print(f"[ResultCache] Stored {len(segments)} segments under {key}")
+
+    def purge(self, keys=None) -> int:
+        """Remove the given entries (all of them if keys is None). Returns how many went."""
+        with self._updating():
+            targets = list(self.index["entries"]) if keys is None else [k for k in keys if k in self.index["entries"]]
+            for key in targets:
+                self.index["entries"].pop(key)
+                self._remove_file(key)
+        return len(targets)
+
+    def stats(self) -> dict:
+        entries = self.index["entries"]
+        lookups = self.index["hits"] + self.index["misses"]
+        return {
+            "entries": len(entries),
+            "bytes": sum(e["size"] for e in entries.values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.index["hits"],
+            "misses": self.index["misses"],
+            "evictions": self.index["evictions"],
+            "hit_rate": self.index["hits"] / lookups if lookups else 0.0,
+        }
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"[ResultCache] {s['entries']} entries, {s['bytes'] / 1024 ** 2:.1f}/{s['max_bytes'] / 1024 ** 2:.0f} MB, "
+              f"hits={s['hits']} misses={s['misses']} (hit rate {s['hit_rate']:.0%}), evictions={s['evictions']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect / purge the transcription result cache")
+    parser.add_argument("--cache-dir", default="output/cache/results")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="one line per cached result, most recently used first")
+    sub.add_parser("stats", help="entry count, size and hit rate")
+    purge = sub.add_parser("purge", help="delete entries")
+    purge.add_argument("keys", nargs="*", help="keys to delete (see `list`)")
+    purge.add_argument("--all", action="store_true", help="delete every entry")
+    purge.add_argument("--older-than", type=float, metavar="DAYS", help="delete entries not used for DAYS")
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(args.cache_dir)
+    entries = cache.index["entries"]
+    if args.cmd == "list":
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"], reverse=True):
+            e = entries[key]
+            used = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["last_used"]))
+            print(f"{key}  {e['backend']:<17} {e['model_size']:<9} {str(e['language']):<5} "
+                  f"{e['segments']:>6} segs {e['size'] / 1024:>9.1f} KB  audio {e['audio_sha256'][:12]}  used {used}")
+        cache.print_stats()
+    elif args.cmd == "stats":
+        cache.print_stats()
+    else:
+        if args.all:
+            keys = None
+        elif args.older_than is not None:
+            cutoff = time.time() - args.older_than * 86400
+            keys = [k for k, e in entries.items() if e["last_used"] < cutoff]
+        elif args.keys:
+            keys = args.keys
+        else:
+            parser.error("purge needs KEY..., --all or --older-than")
+        print(f"[ResultCache] Purged {cache.purge(keys)} entries")
+
+
+if __name__ == "__main__":
+    main()
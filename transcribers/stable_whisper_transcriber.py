@@ -1,16 +1,36 @@
-import stable_whisper
 from .base_transcriber import TranscriberBase
+from .model_pool import MODEL_POOL
+from utils.audio_buffer import AudioBuffer
 
 class StableWhisperTranscriber(TranscriberBase):
-    def __init__(self, model_size, language=None):
-        super().__init__(model_size, language)
+    BACKEND = "stable"
+    COMPUTE_TYPE = "default"  # stable-ts / openai-whisper picks fp16/fp32 from the device
+    def __init__(self, model_size, language=None, vad=None):
+        super().__init__(model_size, language, vad)
         print("Loading Stable Whisper model...")
-        self.model = stable_whisper.load_model(self.model_size)
+        self.model = MODEL_POOL.get_whisper("stable", self.model_size, compute_type=None, device=None)
 
     def transcribe(self, audio_path: str) -> dict:
         print("Transcribing Audio using Stable Whisper...")
-        return self.model.transcribe(
-            audio_path,
-            language=self.language,
-            word_timestamps=True
-        )
\ No newline at end of file
+        self.check_cancel()
+        # shared 16 kHz buffer instead of letting stable-ts decode the file with ffmpeg
+        audio, speech_map = self.speech_only(AudioBuffer.for_wav(audio_path).samples)
+        if len(audio) == 0:
+            print("No speech found, nothing to transcribe")
+            # same type as model.transcribe returns, so callers can use its methods either way
+            from stable_whisper import WhisperResult
+            result = WhisperResult({"segments": [], "language": self.language})
+            self.save_words(result.segments)
+            return result
+        with MODEL_POOL.lock_for(self.model):  # other jobs in this process may share the model
+            result = self.model.transcribe(
+                audio,
+                language=self.language,
+                word_timestamps=True
+            )
+        # stable-ts runs the whole file in one call; the earliest a cancel can land is here
+        self.check_cancel()
+        if speech_map is not None:
+            speech_map.remap_segments(result.segments)
+        self.save_words(result.segments)
+        return result
\ No newline at end of file
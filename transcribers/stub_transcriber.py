@@ -0,0 +1,44 @@
+import time
+
+from .base_transcriber import TranscriberBase
+from utils.wav_utils import wav_duration
+
+
+class StubTranscriber(TranscriberBase):
+    """
+    Model-free stand-in for the job server / batch CLI: emits one fake word every
+    `word_sec` seconds of audio, in pieces of `piece_sec`, optionally sleeping `delay`
+    seconds per piece so queueing / progress can be watched without loading Whisper.
+    """
+    BACKEND = "stub"
+    COMPUTE_TYPE = "none"
+
+    def __init__(self, model_size="stub", language="en", vad=None, word_sec: float = 0.5,
+                 piece_sec: float = 30.0, delay: float = 0.0):
+        super().__init__(model_size, language, vad)
+        self.word_sec = word_sec
+        self.piece_sec = piece_sec
+        self.delay = delay
+
+    def transcribe_stream(self, audio_path: str):
+        duration = wav_duration(audio_path)
+        n = 0
+        start = 0.0
+        while start < duration:
+            self.check_cancel()
+            end = min(start + self.piece_sec, duration)
+            words = []
+            t = start
+            while t + self.word_sec <= end:
+                words.append({"word": f"w{n}", "start": round(t, 3), "end": round(t + self.word_sec * 0.8, 3), "score": 1.0})
+                n += 1
+                t += self.word_sec
+            if self.delay:
+                time.sleep(self.delay)
+            if words:
+                yield {"start": words[0]["start"], "end": words[-1]["end"],
+                       "text": " ".join(w["word"] for w in words), "words": words}
+            start = end
+
+    def transcribe(self, audio_path: str) -> dict:
+        return {"segments": list(self.transcribe_stream(audio_path)), "language": self.language}
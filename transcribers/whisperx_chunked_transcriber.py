@@ -1,67 +1,304 @@
 import os
-from pydub import AudioSegment
+import copy
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 import whisperx
 from .base_transcriber import TranscriberBase
-from utils.srt_utils import write_srt_n_words
+from .model_pool import MODEL_POOL
+from .batching import AdaptiveBatcher
+from .chunk_planner import ChunkSpan, frame_energy, plan_chunks, keep_core_words
+from .job_manifest import JobManifest
+from .language_detect import LanguageDetector
+from utils.audio_buffer import AudioBuffer
+from utils.hash_utils import file_sha256
+from utils.cue_segmenter import CueRules
+from exporters.exporter import Exporter
+
+# per-process state for parallel mode (set by _init_worker in each worker process)
+_WORKER = {}
+
+
+def _init_worker(model_size, language, language_confidence, vad, device, threads, sidecar):
+    # cap torch / ctranslate2 threads so N workers don't oversubscribe the box
+    import torch
+    torch.set_num_threads(threads)
+    transcriber = WhisperXChunkedTranscriber(model_size, language, vad=vad)
+    transcriber.language_confidence = language_confidence
+    _WORKER["transcriber"] = transcriber
+    _WORKER["device"] = device
+    _WORKER["models"] = transcriber.load_models(device, threads=threads)
+    # every worker maps the same sidecar; chunks are just slices of it
+    _WORKER["buffer"] = AudioBuffer.open(sidecar) if sidecar else None
+
+
+def _run_chunk(idx, start, end, samples=None):
+    model, align_model, metadata = _WORKER["models"]
+    if samples is None:
+        samples = _WORKER["buffer"].slice_samples(start, end)
+    segments = _WORKER["transcriber"].transcribe_chunk(samples, model, align_model, metadata, _WORKER["device"])
+    return idx, segments
+
 
 class WhisperXChunkedTranscriber(TranscriberBase):
-    def transcribe(self, audio_path: str) -> dict:
-        chunk_len = 60 # 60 seconds per chunk
-        
-        #prep chuck folder
+    BACKEND = "whisperx-chunked"
+    COMPUTE_TYPE = "int8"
+
+    def __init__(self, model_size, language="en", vad=None, workers: int = 1, threads_per_worker: int = None,
+                 chunk_len: float = 60.0, search_window: float = 5.0, overlap: float = 0.5,
+                 batched: bool = False, words_per_subtitle: int = 1, chunk_srts: bool = False):
+        super().__init__(model_size, language, vad)
+        self.words_per_subtitle = words_per_subtitle
+        # one SRT per chunk as it finishes (debugging); the pipeline already streams the
+        # same cues into its own SRT, so it's off by default
+        self.chunk_srts = chunk_srts
+        # language=None ("Detect"): transcribe_stream detects it once (cached per audio hash)
+        # and sets self.language, so every chunk and the one align model use the same code.
+        # language_confidence stays None when the language was given.
+        self.detector = LanguageDetector()
+        self.language_confidence = None
+        # batched=True (serial mode) groups consecutive chunks into one model call and lets
+        # AdaptiveBatcher pick the batch_size; results are still split back per chunk
+        self.batched = batched
+        # chunks are cut at the quietest point within +/- search_window of every chunk_len
+        # and widened by `overlap` seconds; duplicated overlap words are dropped on merge
+        self.chunk_len = chunk_len
+        self.search_window = search_window
+        self.overlap = overlap
+        # workers > 1 spreads chunks over a process pool, each worker loads the model once
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+
+    def load_models(self, device, threads=None):
+        if threads is None:
+            model = MODEL_POOL.get_whisper("whisperx", self.model_size, self.COMPUTE_TYPE, device)
+        else:
+            # worker process: ctranslate2's thread count is fixed when the model is loaded
+            model = whisperx.load_model(self.model_size, device, compute_type=self.COMPUTE_TYPE, threads=threads)
+        align_model, metadata = MODEL_POOL.get_align(self.language, device)
+        return model, align_model, metadata
+
+    def transcribe_chunk(self, wav, model, align_model, metadata, device, batcher=None):
+        """Transcribe + align one chunk (16 kHz slice). Returns segments on the chunk's own timeline."""
+        audio_sec = len(wav) / self.SAMPLE_RATE
+        wav, speech_map = self.speech_only(wav)
+        if len(wav) == 0:
+            print("[WhisperX] Chunk has no speech, skipping")
+            return []
+        language = self.detector.piece_language(model, wav, self.SAMPLE_RATE, self.language, self.language_confidence)
+        if language != self.language:
+            align_model, metadata = MODEL_POOL.get_align(language, device)
+        with MODEL_POOL.lock_for(model):  # other jobs in this process may share the model
+            if batcher is None:
+                res = model.transcribe(wav, batch_size=1, language=language)
+            else:
+                res = batcher.timed(model.transcribe, audio_sec, wav, language=language)
+        self.check_cancel()
+        aligned = whisperx.align(res["segments"], align_model, metadata, wav, device=device)
+        if speech_map is not None:
+            # back from speech-only time to the chunk's timeline
+            speech_map.remap_segments(aligned["segments"])
+        return aligned["segments"]
+
+    def _transcribe_serial(self, buffer, chunks, todo, device):
+        if not todo:
+            return
+        model, align_model, metadata = self.load_models(device)
+        if not self.batched:
+            for idx in todo:
+                self.check_cancel()
+                start, end, _ = chunks[idx]
+                yield idx, self.transcribe_chunk(buffer.slice_samples(start, end), model, align_model, metadata, device)
+            return
+
+        batcher = AdaptiveBatcher(self.model_size)
+        i = 0
+        while i < len(todo):
+            self.check_cancel()
+            # enough consecutive chunks to give the current batch_size windows to batch
+            n = max(1, int(round(batcher.group_seconds() / self.chunk_len)))
+            group = [todo[i]]
+            while len(group) < n and i + len(group) < len(todo) and todo[i + len(group)] == group[-1] + 1:
+                group.append(todo[i + len(group)])
+            start, end = chunks[group[0]][0], chunks[group[-1]][1]
+            segments = self.transcribe_chunk(
+                buffer.slice_samples(start, end), model, align_model, metadata, device, batcher=batcher
+            )
+            yield from self._split_group(group, chunks, segments)
+            i += len(group)
+        batcher.report()
+
+    def _split_group(self, group, chunks, segments):
+        """
+        Hand a group's segments (timed from the group start) back per chunk. Every chunk gets
+        its own copy shifted to its own timeline; the core filter in transcribe() then keeps
+        only the words that belong to that chunk.
+        """
+        group_start = chunks[group[0]][0]
+        for idx in group:
+            shift = (chunks[idx][0] - group_start) / self.SAMPLE_RATE
+            own = segments if len(group) == 1 else copy.deepcopy(segments)
+            for seg in own:
+                for item in [seg] + seg.get("words", []):
+                    if "start" in item:
+                        item["start"] -= shift
+                        item["end"] -= shift
+            yield idx, own
+
+    def _transcribe_parallel(self, buffer, chunks, todo, device):
+        print(f"[WhisperX] Transcribing {len(todo)} chunks on {self.workers} workers "
+              f"x {self.threads_per_worker} threads...")
+        # spawn, not fork: forking a process that already has torch threads running can deadlock
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(todo)),
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self.model_size, self.language, self.language_confidence, self.vad, device,
+                      self.threads_per_worker, buffer.path),
+        ) as pool:
+            futures = []
+            for idx in todo:
+                start, end, _ = chunks[idx]
+                # without a sidecar on disk the slice itself has to be shipped to the worker
+                samples = None if buffer.path else buffer.slice_samples(start, end)
+                futures.append(pool.submit(_run_chunk, idx, start, end, samples))
+            # hand results back in chunk order so offsets / SRTs match the serial path
+            try:
+                for fut in futures:
+                    self.check_cancel()
+                    yield fut.result()
+            except BaseException:
+                # cancelled / consumer gone: drop queued chunks, the pool only waits for the
+                # ones already running (at most one chunk per worker)
+                for fut in futures:
+                    fut.cancel()
+                raise
+
+    def _with_checkpoints(self, manifest, fresh):
+        """
+        Yield (idx, segments) for every chunk in order: finished chunks come from the
+        manifest, the rest from `fresh` (which yields exactly the missing ones, in order).
+        New results are saved before anything else touches them.
+        """
+        for idx in range(len(manifest.plan)):
+            if manifest.is_done(idx):
+                yield idx, manifest.load_chunk(idx)
+                continue
+            got, segments = next(fresh)
+            manifest.save_chunk(got, segments)
+            yield got, segments
+        # run `fresh` to its end so it can clean up (batcher report, process pool shutdown)
+        for _ in fresh:
+            pass
+
+    def plan(self, buffer: AudioBuffer):
+        """Silence-aware chunk plan over the shared 16 kHz buffer."""
+        frame_ms = 20.0
+        energy = frame_energy(buffer.samples, buffer.SAMPLE_RATE, frame_ms)
+        return plan_chunks(energy, frame_ms / 1000.0, buffer.duration, self.chunk_len, self.search_window, self.overlap)
+
+    def job_signature(self, audio_path: str) -> dict:
+        """Everything that changes the per-chunk results; a manifest is only reused if this matches."""
+        return {
+            "input_sha256": file_sha256(audio_path),
+            "model_size": self.model_size,
+            "compute_type": self.COMPUTE_TYPE,
+            "language": self.language,
+            "chunk_len": self.chunk_len,
+            "search_window": self.search_window,
+            "overlap": self.overlap,
+            # batched mode decodes several chunks in one model call, which changes their results
+            "batched": self.batched,
+            "vad": vars(self.vad) if self.vad is not None else None,
+        }
+
+    def transcribe_stream(self, audio_path: str):
+        """
+        Yield the merged (original timeline, overlap de-duplicated) segments chunk by chunk,
+        as each chunk finishes. The manifest is marked finished once the stream is exhausted.
+        """
+        #prep chuck folder (chunk SRTs + job manifest)
         stem = os.path.splitext(os.path.basename(audio_path))[0]
         folder = os.path.join(os.path.dirname(audio_path) or ".", stem)
         os.makedirs(folder, exist_ok=True)
 
-        # 1) Split into chunks
-        print(f"Chunking audio file {audio_path} into {chunk_len} second segments...")
-        
-        audio = AudioSegment.from_file(audio_path)
+        buffer = AudioBuffer.for_wav(audio_path)
+        device = "cpu"
+
+        # 0) "Detect": one language for the whole job, from a few speech-dense windows
+        if self.language is None:
+            model = MODEL_POOL.get_whisper("whisperx", self.model_size, self.COMPUTE_TYPE, device)
+            self.language, self.language_confidence = self.detector.detect(
+                model, buffer.samples, buffer.SAMPLE_RATE, audio_path
+            )
+
+        # 1) Resume from the manifest if this exact job ran before, otherwise plan the chunks:
+        # cut in the quietest spot near every chunk_len.
+        # chunks are zero-copy slices of one 16 kHz buffer, no chunk wavs / ffmpeg per chunk
+        signature = self.job_signature(audio_path)
+        manifest = JobManifest.load(folder, signature)
+        if manifest is None:
+            print(f"Chunking audio file {audio_path} into ~{self.chunk_len:g} second segments...")
+            spans = self.plan(buffer)
+            manifest = JobManifest.create(folder, signature, [list(s) for s in spans])
+        else:
+            spans = [ChunkSpan(*s) for s in manifest.plan]
+            state = "finished, rebuilding output" if manifest.finished else "resuming"
+            print(f"[WhisperX] Found job manifest ({manifest.done_count()}/{len(spans)} chunks done), {state}...")
+
+        sr = buffer.SAMPLE_RATE
         chunks = []
-        for i, start_ms in enumerate(range(0, len(audio), chunk_len * 1000)):
-            seg = audio[start_ms:start_ms + chunk_len * 1000]
-            wav_path = os.path.join(folder, f"chunk_{i:03}.wav")
-            seg.export(wav_path, format="wav")
-            chunks.append((wav_path, start_ms / 1000.0))
+        for span in spans:
+            first = int(round(span.start * sr))
+            # offset is the exact sample position the chunk starts at
+            chunks.append((first, int(round(span.end * sr)), first / sr))
+        todo = [idx for idx in range(len(chunks)) if not manifest.is_done(idx)]
 
-        device = "cpu"
-        
-        # 2) Load models once
-        #TODO: make model loading configurable (so i don't have to load model every new transcription)
-        print(f"[WhisperX] Loading Whisper model '{self.model_size}' on {device}...")
-        model = whisperx.load_model(self.model_size, device, compute_type="int8")
-        align_model, metadata = whisperx.load_align_model(self.language, device)
-
-        # 3) For each chunk, transcribe, align, offset *word* times, and write chunk-SRT
-        all_segments = []
-        for idx, (fpath, offset) in enumerate(chunks):
-            wav = whisperx.load_audio(fpath)
-            res = model.transcribe(wav, batch_size=1, language=self.language)
-            aligned = whisperx.align(res["segments"], align_model, metadata, wav, device=device)
-
-            # Offset *every word* in each segment by the chunk start
-            for seg in aligned["segments"]:
+        # 2) Models come from the process-wide pool (serial) or are loaded once per worker (parallel).
+        # Generators are lazy, so nothing is loaded when every chunk is already checkpointed.
+        if todo:
+            print(f"[WhisperX] Loading Whisper model '{self.model_size}' on {device}...")
+        if self.workers > 1 and len(todo) > 1:
+            fresh = self._transcribe_parallel(buffer, chunks, todo, device)
+        else:
+            fresh = self._transcribe_serial(buffer, chunks, todo, device)
+        results = self._with_checkpoints(manifest, fresh)
+
+        # 3) For each chunk, offset *word* times, drop overlap duplicates, and write chunk-SRT
+        for idx, segments in results:
+            _, _, offset = chunks[idx]
+
+            # Offset *every word* (and the segment itself) by the chunk start
+            for seg in segments:
+                for key in ("start", "end"):
+                    if key in seg:
+                        seg[key] += offset
                 for w in seg["words"]:
-                    w["start"] += offset
-                    w["end"] += offset
-                all_segments.append(seg)
-                
+                    # words whisperx couldn't align have no timestamps
+                    if "start" in w:
+                        w["start"] += offset
+                        w["end"] += offset
+
+            # words in the overlap belong to whichever chunk's core they fall in
+            segments = keep_core_words(segments, spans[idx])
+            if not segments:
+                continue
+
             # Write this chunk’s SRT right away
-            chunk_srt_path = os.path.join(folder, f"chunk_{idx:03}.srt")
-            write_srt_n_words(
-                {"segments": aligned["segments"]},
-                fpath,
-                chunk_srt_path,
-                words_per_subtitle=1 # TODO: make this configurable (so i don't have to re-run)
-            )
+            if self.chunk_srts:
+                chunk_srt_path = os.path.join(folder, f"chunk_{idx:03}.srt")
+                Exporter.export_words(segments, chunk_srt_path, CueRules(max_words=self.words_per_subtitle))
+            yield from segments
+
+        manifest.mark_finished()
+
+    def transcribe(self, audio_path: str) -> dict:
+        all_segments = list(self.transcribe_stream(audio_path))
+        self.save_words(all_segments)
 
         # 4) Write the final SRT with all segments
         print(f"Writing final SRT with {len(all_segments)} segments...")
-        write_srt_n_words(
-            {"segments": all_segments},
-            audio_path,
-            "output/whisperx_transcript.srt",
-            words_per_subtitle=1 #TODO: make this value configurable from UI
-        )
+        Exporter.export_words(all_segments, "output/whisperx_transcript.srt",
+                              CueRules(max_words=self.words_per_subtitle))
         print(f"Chunked WhisperX done.")
         return {"segments": all_segments}
\ No newline at end of file
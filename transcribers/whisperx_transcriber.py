@@ -1,9 +1,102 @@
 import whisperx
-import os
-from whisperx.utils import get_writer
 from .base_transcriber import TranscriberBase
+from .model_pool import MODEL_POOL
+from .batching import AdaptiveBatcher
+from .chunk_planner import frame_energy, smooth_energy, find_cut
+from .language_detect import LanguageDetector
+from utils.audio_buffer import AudioBuffer
+from utils.cue_segmenter import CueRules
+from exporters.exporter import Exporter
 
 class WhisperXTranscriber(TranscriberBase):
+    # unbatched pieces: 8 x 30 s windows, what whisperx's default batch_size decodes at once
+    GROUP_SEC = 240.0
+    BACKEND = "whisperx"
+    COMPUTE_TYPE = "int8"
+
+    def __init__(self, model_size, language="en", vad=None, batched: bool = False):
+        super().__init__(model_size, language, vad)
+        # batched=True lets AdaptiveBatcher pick batch_size per model call (see transcribers/batching.py)
+        self.batched = batched
+        # language=None ("Detect"): detected once per file, reused by every piece + alignment
+        self.detector = LanguageDetector()
+        self.detected_language = None
+
+    def _groups(self, audio, batcher=None):
+        """
+        Yield (start_sec, end_sec) of consecutive pieces of `audio`, cut at quiet points.
+        With a batcher each piece is sized so its current batch_size has that many 30 s windows.
+        """
+        sr = self.SAMPLE_RATE
+        frame_sec, search_window = 0.02, 5.0
+        smoothed = smooth_energy(frame_energy(audio, sr, frame_sec * 1000.0))
+        duration = len(audio) / sr
+
+        pos = 0.0
+        while pos < duration:
+            target = pos + (batcher.group_seconds() if batcher is not None else self.GROUP_SEC)
+            if duration - target < search_window:
+                end = duration
+            else:
+                end = find_cut(smoothed, frame_sec, target, search_window, duration)
+            yield pos, end
+            pos = end
+
+    def transcribe_stream(self, audio_path: str):
+        """
+        Yield aligned segments (original timeline) piece by piece: every piece is transcribed,
+        aligned and handed out before the next one starts, so the first cues of a long file
+        show up after one piece instead of at the end of the job.
+        """
+        device = "cpu"
+        print(f"[WhisperX] Loading Whisper model '{self.model_size}' on {device}…")
+        model = MODEL_POOL.get_whisper("whisperx", self.model_size, self.COMPUTE_TYPE, device)
+        # shared 16 kHz buffer (mapped from the preprocessor's sidecar, no ffmpeg decode)
+        audio = AudioBuffer.for_wav(audio_path).samples
+        # with VAD on, only the speech regions are sent through Whisper + alignment
+        audio, speech_map = self.speech_only(audio)
+        if len(audio) == 0:
+            print("[WhisperX] No speech found, nothing to transcribe")
+            return
+
+        batcher = AdaptiveBatcher(self.model_size) if self.batched else None
+        sr = self.SAMPLE_RATE
+        language, confidence = self.language, None
+        if language is None:
+            language, confidence = self.detector.detect(model, audio, sr, audio_path)
+        self.detected_language = language
+        print(f"[WhisperX] Transcribing {audio_path}…")
+        for start, end in self._groups(audio, batcher):
+            self.check_cancel()
+            piece = audio[int(round(start * sr)):int(round(end * sr))]
+            # the file's language, unless detection was unsure and this piece clearly isn't it
+            piece_lang = self.detector.piece_language(model, piece, sr, language, confidence)
+            with MODEL_POOL.lock_for(model):  # other jobs in this process may share the model
+                if batcher is not None:
+                    result = batcher.timed(model.transcribe, end - start, piece, language=piece_lang)
+                else:
+                    result = model.transcribe(piece, language=piece_lang)
+            if not result["segments"]:
+                continue
+
+            self.check_cancel()
+            print(f"[WhisperX] Running forced alignment ({start:.0f}s - {end:.0f}s)…")
+            align_model, metadata = MODEL_POOL.get_align(piece_lang, device)
+            aligned = whisperx.align(result["segments"], align_model, metadata, piece, device=device)
+
+            # piece time -> job time (-> original timeline when VAD cut silence out)
+            for seg in aligned["segments"]:
+                for item in [seg] + seg.get("words", []):
+                    if "start" in item:
+                        item["start"] += start
+                        item["end"] += start
+            if speech_map is not None:
+                speech_map.remap_segments(aligned["segments"])
+            yield from aligned["segments"]
+
+        if batcher is not None:
+            batcher.report()
+
     def transcribe(self, audio_path: str) -> dict:
         """
         Transcribe + align audio with WhisperX, writing a word-level SRT.
@@ -18,37 +111,15 @@ class WhisperXTranscriber(TranscriberBase):
         Returns:
         - the aligned result dict. (5/1/2025)
         """
-        
-        device = "cpu"
-        print(f"[WhisperX] Loading Whisper model '{self.model_size}' on {device}…")
-        model = whisperx.load_model(self.model_size, device, compute_type="int8")
-        audio = whisperx.load_audio(audio_path)
+        segments = list(self.transcribe_stream(audio_path))
+        self.save_words(segments)
+        result_aligned = {
+            "segments": segments,
+            "word_segments": [w for seg in segments for w in seg.get("words", [])],
+            "language": self.detected_language or self.language,
+        }
 
-        print(f"[WhisperX] Transcribing {audio_path}…")
-        result = model.transcribe(audio, language=self.language)
-
-        print("[WhisperX] Loading alignment model…")
-        align_model, metadata = whisperx.load_align_model(
-            language_code=self.language or result["language"],
-            device=device
-        )
-
-        print("[WhisperX] Running forced alignment…")
-        result_aligned = whisperx.align(
-            result["segments"],
-            align_model,
-            metadata,
-            audio,
-            device=device
-        )
-        result_aligned["language"] = result["language"]
-
-        vtt_dir = os.path.dirname("output/whisperx_transcript.srt") or "."
-        os.makedirs(vtt_dir, exist_ok=True)
-        vtt_writer = get_writer("srt", vtt_dir)
-        vtt_writer(
-            result_aligned,
-            audio_path,
-            {"max_line_width": 5, "max_line_count": 1, "highlight_words": False}
-        )
+        # was whisperx's get_writer("srt") with max_line_width=5 / max_line_count=1, i.e.
+        # cues of at most 5 characters; same rule through the cue segmenter
+        Exporter.export_words(segments, "output/whisperx_transcript.srt", CueRules(max_chars=5))
         return result_aligned
\ No newline at end of file
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import wave
+
+import numpy as np
+
+from preprocessors.dsp import Resampler, downmix
+from utils.wav_utils import iter_wav_blocks, read_wav, wav_sample_rate
+
+SIDECAR_DIR = "output/cache/sidecars"
+
+
+def sidecar_path(wav_path: str) -> str:
+    """Where the preprocessor puts the raw 16 kHz float32 copy of its output: next to it, as <stem>.16k.f32"""
+    return os.path.splitext(wav_path)[0] + ".16k.f32"
+
+
+def cached_sidecar_path(audio_path: str) -> str:
+    """Sidecar for any other audio (e.g. the user's own file): in SIDECAR_DIR, keyed on its absolute path."""
+    key = hashlib.sha1(os.path.abspath(audio_path).encode("utf-8")).hexdigest()[:20]
+    return os.path.join(SIDECAR_DIR, key + ".16k.f32")
+
+
+class AudioBuffer:
+    """
+    The whole pipeline's view of the audio: one mono 16 kHz float32 array.
+
+    Decoded once (by the preprocessor, or lazily from a wav) and usually memory-mapped from a
+    raw `.f32` sidecar, so chunking, transcription and alignment can all take zero-copy
+    slices of it and worker processes can map the same file instead of re-decoding it.
+    """
+    SAMPLE_RATE = 16000
+
+    def __init__(self, samples: np.ndarray, path: str = None):
+        self.samples = samples
+        self.path = path  # sidecar this buffer is mapped from, if any
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / float(self.SAMPLE_RATE)
+
+    def slice(self, start_sec: float, end_sec: float) -> np.ndarray:
+        """View (no copy) of [start_sec, end_sec)."""
+        a = max(int(round(start_sec * self.SAMPLE_RATE)), 0)
+        b = min(int(round(end_sec * self.SAMPLE_RATE)), len(self.samples))
+        return self.samples[a:b]
+
+    def slice_samples(self, start: int, end: int) -> np.ndarray:
+        return self.samples[start:end]
+
+    @classmethod
+    def open(cls, f32_path: str) -> "AudioBuffer":
+        """
+        Memory-map an existing sidecar. Copy-on-write ("c"): slices are writable views for
+        torch.from_numpy, but nothing is ever written back to the file.
+        """
+        if os.path.getsize(f32_path) == 0:
+            return cls(np.zeros(0, dtype=np.float32), f32_path)
+        return cls(np.memmap(f32_path, dtype="<f4", mode="c"), f32_path)
+
+    @classmethod
+    def for_wav(cls, wav_path: str, block_frames: int = 1 << 18) -> "AudioBuffer":
+        """
+        Buffer for an audio file (normally the preprocessed 16-bit wav). steps:
+        1. map the preprocessor's sidecar, or an earlier one from SIDECAR_DIR, if up to date
+        2. PCM wav: decode block by block into a new sidecar in SIDECAR_DIR -- never next to
+           the file, that may be the user's own folder
+        3. anything `wave` can't stream (mp3 / flac / ... when preprocessing fell back to the
+           original file, float or extensible wavs) or no writable cache: decode in memory
+        """
+        for f32 in (sidecar_path(wav_path), cached_sidecar_path(wav_path)):
+            if os.path.exists(f32) and os.path.getmtime(f32) >= os.path.getmtime(wav_path):
+                return cls.open(f32)
+        f32 = cached_sidecar_path(wav_path)
+        try:
+            sr = wav_sample_rate(wav_path)
+            os.makedirs(SIDECAR_DIR, exist_ok=True)
+            with SidecarWriter(f32, sr) as writer:
+                for block in iter_wav_blocks(wav_path, block_frames):
+                    writer.write(downmix(block))
+            return cls.open(f32)
+        except (wave.Error, EOFError, ValueError, OSError) as e:
+            print(f"[AudioBuffer] no sidecar for {wav_path} ({e}), decoding in memory")
+            return cls(cls.decode(wav_path))
+
+    @classmethod
+    def decode(cls, audio_path: str) -> np.ndarray:
+        """
+        Whole file -> mono 16 kHz float32, in memory. read_wav covers every wav (and pydub
+        formats, if it's installed); whisperx.load_audio (ffmpeg) is the last resort.
+        """
+        try:
+            samples, sr = read_wav(audio_path)
+        except Exception:
+            import whisperx
+            return whisperx.load_audio(audio_path).astype(np.float32)
+        r = Resampler(sr, cls.SAMPLE_RATE)
+        return np.concatenate([r.process(downmix(samples)), r.flush()]).astype(np.float32)
+
+
+class SidecarWriter:
+    """Resamples mono blocks to 16 kHz and appends them to a raw float32 sidecar file."""
+
+    def __init__(self, f32_path: str, sample_rate: int):
+        self.path = f32_path
+        self._tmp = f32_path + ".part"
+        self._resampler = Resampler(sample_rate, AudioBuffer.SAMPLE_RATE)
+        self._f = open(self._tmp, "wb")
+
+    def write(self, mono: np.ndarray):
+        self._f.write(self._resampler.process(mono).astype("<f4").tobytes())
+
+    def close(self, ok: bool = True):
+        if self._f.closed:
+            return
+        if ok:
+            self._f.write(self._resampler.flush().astype("<f4").tobytes())
+        self._f.close()
+        if ok:
+            os.replace(self._tmp, self.path)
+        elif os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(ok=exc_type is None)
@@ -0,0 +1,29 @@
+import threading
+
+
+class Cancelled(Exception):
+    """Raised by CancelToken.check() once the job has been cancelled."""
+
+
+class CancelToken:
+    """
+    Thread-safe "please stop" flag shared by the UI and a background job.
+
+    The job calls check() at its safe points (between stages, chunks and batch groups);
+    the first check after cancel() raises Cancelled, which unwinds the job and lets its
+    generators / pools clean up on the way out.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled()
@@ -0,0 +1,108 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+
+class CueIndex:
+    """
+    Which cues are on screen at time t, without scanning the whole track.
+
+    Cues are kept sorted by start. A cue active at t started at or before t and no more than
+    the longest cue duration earlier, so only the window
+    [bisect(t - longest), bisect(t)] is checked. The few cues much longer than the rest
+    (a title card over the whole file, say) would make that window huge; they're kept in
+    a small side array and checked with NumPy instead.
+
+    at(t) / active(t) keep a cursor: during playback t only moves forward a little per tick,
+    so the window edges move a step or two (O(1) amortized); a seek falls back to bisect
+    (O(log n)). Returned indices are the cue numbers of the original start / end arrays.
+    """
+
+    LONG_FACTOR = 8.0  # cues longer than 8x the median duration go into the side array
+
+    def __init__(self, start, end):
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+        self.size = len(start)
+        dur = end - start
+        long = np.zeros(self.size, dtype=bool)
+        if self.size:
+            long = dur > max(self.LONG_FACTOR * float(np.median(dur)), 1.0)
+        self._long = np.flatnonzero(long)
+        self._long_start, self._long_end = start[self._long], end[self._long]
+        # a handful of long cues is cheaper to check in plain Python than with a NumPy mask
+        self._long_list = list(zip(self._long.tolist(), self._long_start.tolist(), self._long_end.tolist()))
+
+        order = np.flatnonzero(~long)
+        order = order[np.argsort(start[order], kind="stable")]
+        self._order_arr, self._ends_arr = order, end[order]
+        self._order = order.tolist()
+        self._starts = start[order].tolist()
+        self._ends = end[order].tolist()
+        # + 1 us: end - start rounds, a cue ending exactly at t must stay inside the window
+        self._span = float(dur[order].max()) + 1e-6 if len(order) else 0.0
+        self._t = None
+        self._lo = self._hi = 0
+
+    def __len__(self):
+        return self.size
+
+    def _window(self, t: float):
+        """(lo, hi): the sorted short cues that can contain t, moving the cursor there."""
+        starts, n = self._starts, len(self._starts)
+        t_lo = t - self._span
+        if self._t is not None and t >= self._t:
+            hi, lo = self._hi, self._lo
+            # playback: a step or two; anything more is a seek forward -> bisect from here
+            if hi < n and starts[hi] <= t:
+                hi += 1
+                if hi < n and starts[hi] <= t:
+                    hi = bisect_right(starts, t, hi)
+            if lo < hi and starts[lo] < t_lo:
+                lo += 1
+                if lo < hi and starts[lo] < t_lo:
+                    lo = bisect_left(starts, t_lo, lo, hi)
+        else:
+            hi = bisect_right(starts, t)
+            lo = bisect_left(starts, t_lo, 0, hi)
+        self._t, self._lo, self._hi = t, lo, hi
+        return lo, hi
+
+    def _long_active(self, t: float) -> list:
+        if len(self._long_list) <= 32:
+            return [i for i, s, e in self._long_list if s <= t <= e]
+        return self._long[(self._long_start <= t) & (t <= self._long_end)].tolist()
+
+    def active(self, t: float) -> list:
+        """Every cue with start <= t <= end, in cue order."""
+        lo, hi = self._window(t)
+        ends, order = self._ends, self._order
+        hits = [order[k] for k in range(lo, hi) if ends[k] >= t]
+        if self._long_list:
+            hits += self._long_active(t)
+        hits.sort()
+        return hits
+
+    def at(self, t: float):
+        """The first cue (in cue order) on screen at t, or None."""
+        lo, hi = self._window(t)
+        ends, order = self._ends, self._order
+        best = None
+        for k in range(lo, hi):
+            if ends[k] >= t and (best is None or order[k] < best):
+                best = order[k]
+        if self._long_list:
+            hit = self._long_active(t)
+            if hit and (best is None or hit[0] < best):
+                best = hit[0]
+        return best
+
+    def between(self, t0: float, t1: float) -> np.ndarray:
+        """Cues overlapping [t0, t1] (start <= t1 and end >= t0), in cue order. No cursor."""
+        starts = self._starts
+        hi = bisect_right(starts, t1)
+        lo = bisect_left(starts, t0 - self._span, 0, hi)
+        hits = self._order_arr[lo:hi][self._ends_arr[lo:hi] >= t0]
+        if len(self._long):
+            hits = np.r_[hits, self._long[(self._long_start <= t1) & (self._long_end >= t0)]]
+        return np.sort(hits)
@@ -0,0 +1,151 @@
+import numpy as np
+
+_CPS_WINDOW = 32  # cue lengths (in words) the cps rule checks for every word at once
+
+
+class CueRules:
+    """
+    When a new cue starts. Every limit is optional (None = off) and they combine freely;
+    a cue takes words until the next one would break any of them.
+
+    max_words       words per cue (the old words_per_subtitle)
+    max_chars       characters per cue, counting the spaces between words
+    pause_thre      start a new cue when the silence before a word is longer (seconds)
+    max_duration    first word's start to last word's end (seconds)
+    max_cps         reading speed, characters per second of cue
+    split_segments  never let a cue span two ASR segments
+
+    A single word always makes a cue, even if it breaks a limit on its own.
+    """
+
+    def __init__(self, max_words: int = None, max_chars: int = None, pause_thre: float = None,
+                 max_duration: float = None, max_cps: float = None, split_segments: bool = False):
+        self.max_words = max_words
+        self.max_chars = max_chars
+        self.pause_thre = pause_thre
+        self.max_duration = max_duration
+        self.max_cps = max_cps
+        self.split_segments = split_segments
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "CueRules":
+        """From a SubtitlePipeline settings dict (missing keys = no limit)."""
+        return cls(
+            max_words=settings.get("words_per_subtitle"),
+            max_chars=settings.get("max_chars"),
+            pause_thre=settings.get("pause_thre"),
+            max_duration=settings.get("max_duration"),
+            max_cps=settings.get("max_cps"),
+        )
+
+    def __repr__(self):
+        limits = ", ".join(f"{k}={v}" for k, v in vars(self).items() if v)
+        return f"CueRules({limits})"
+
+
+def _next_true(mask: np.ndarray) -> np.ndarray:
+    """For every i, the smallest j > i with mask[j] (len(mask) if there is none)."""
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    after = np.minimum.accumulate(idx[::-1])[::-1]
+    return np.r_[after[1:], n]
+
+
+def cue_starts(start, end, rules: CueRules, chars=None, breaks=None) -> np.ndarray:
+    """
+    Index of the first word of every cue.
+
+    start / end  float seconds per word (NaN = not aligned: never causes a pause, and the
+                 duration / cps limits measure from the aligned words around it)
+    chars        characters per word, needed for max_chars / max_cps
+    breaks       optional bool mask, True where a cue must start (segment boundaries etc.)
+
+    1. limit[i] = end (exclusive) of the longest cue that may start at word i, one
+       vectorized pass per rule: next forced break, i + max_words, searchsorted over the
+       running char count / running end time, and a shrinking window for the cps rule.
+    2. Walk the chain 0 -> limit[0] -> ...: one step per cue, not per word.
+    """
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    n = len(start)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    pos = np.arange(n)
+    limit = np.full(n, n, dtype=np.int64)
+
+    # forced breaks: caller's mask + pauses (gap to the last *aligned* word before)
+    brk = np.zeros(n, dtype=bool) if breaks is None else np.array(breaks, dtype=bool)
+    if rules.pause_thre is not None:
+        prev_end = np.fmax.accumulate(end)[:-1]
+        with np.errstate(invalid="ignore"):
+            brk[1:] |= (start[1:] - prev_end) > rules.pause_thre
+    step = max(1, int(rules.max_words)) if rules.max_words else n
+    if rules.max_chars is None and rules.max_duration is None and not rules.max_cps:
+        # only words + breaks: a cue every `step` words counted from the last break (no chain)
+        brk[0] = True
+        run_first = np.maximum.accumulate(np.where(brk, pos, 0))
+        return np.flatnonzero((pos - run_first) % step == 0)
+
+    if brk[1:].any():
+        np.minimum(limit, _next_true(brk), out=limit)
+    np.minimum(limit, pos + step, out=limit)
+
+    if rules.max_chars is not None or rules.max_cps:
+        if chars is None:
+            raise ValueError("max_chars / max_cps need the per-word character counts")
+        # text of words [i, j) is cum[j] - cum[i] - 1 characters long (one space per gap)
+        cum = np.r_[0, np.cumsum(np.asarray(chars, dtype=np.int64) + 1)]
+    if rules.max_chars is not None:
+        fit = np.searchsorted(cum, cum[:-1] + rules.max_chars + 1, side="right") - 1
+        np.minimum(limit, np.maximum(fit, pos + 1), out=limit)
+
+    if rules.max_duration is not None or rules.max_cps:
+        # first: start of the first aligned word at or after i; last[k]: latest end up to k
+        first_idx = np.minimum.accumulate(np.where(~np.isnan(start), pos, n)[::-1])[::-1]
+        first = np.r_[start, np.inf][first_idx]
+        last = np.nan_to_num(np.fmax.accumulate(end), nan=-np.inf)
+    if rules.max_duration is not None:
+        fit = np.searchsorted(last, first + rules.max_duration, side="right")
+        np.minimum(limit, np.maximum(fit, pos + 1), out=limit)
+
+    open_cues = {}
+    if rules.max_cps:
+        # grow every still-open cue by one word per pass; the first word that pushes it over
+        # the reading speed closes it. Total work ~ words x average cue length.
+        def over(i, j):
+            with np.errstate(invalid="ignore"):
+                too_fast = cum[j] - cum[i] - 1 > rules.max_cps * (last[j - 1] - first[i])
+            return too_fast & (first_idx[i] < j)  # no aligned word yet: nothing to measure
+
+        active = np.flatnonzero(limit >= pos + 2)
+        j = active + 2
+        for _ in range(_CPS_WINDOW):
+            keep = j <= limit[active]
+            active, j = active[keep], j[keep]
+            if not len(active):
+                break
+            hit = over(active, j)
+            limit[active[hit]] = j[hit] - 1
+            active, j = active[~hit], j[~hit] + 1
+        # cues longer than the window (slow speech, no other limit): finished below in
+        # blocks, and only for the starts the chain actually reaches
+        open_cues = dict(zip(active.tolist(), j.tolist()))
+
+    starts = []
+    lim = limit.tolist()
+    i = 0
+    while i < n:
+        starts.append(i)
+        if i in open_cues:
+            j, stop = open_cues[i], lim[i]
+            while j <= stop:
+                js = np.arange(j, min(stop, j + 4096) + 1)
+                hit = np.flatnonzero(over(i, js))
+                if len(hit):
+                    stop = int(js[hit[0]]) - 1
+                    break
+                j = int(js[-1]) + 1
+            i = stop
+        else:
+            i = lim[i]
+    return np.array(starts, dtype=np.int64)
@@ -0,0 +1,27 @@
+import hashlib
+import os
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hex sha256 of a file's contents, read in chunks so big wavs don't land in memory."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def memo_file_sha256(path: str, memo: dict) -> str:
+    """
+    file_sha256, memoized in `memo` (abs path -> size / mtime / digest) so files that
+    haven't changed since the last call aren't read again. `memo` is usually part of a
+    cache index that gets saved to disk.
+    """
+    st = os.stat(path)
+    abspath = os.path.abspath(path)
+    entry = memo.get(abspath)
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["sha256"]
+    digest = file_sha256(path)
+    memo[abspath] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+    return digest
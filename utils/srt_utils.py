@@ -1,14 +1,30 @@
 import re
 from datetime import datetime
 
-_TIME_RE = re.compile(r'^\\d{2}:\\d{2}:\\d{2},\\d{3}$')
+_TIME_RE = re.compile(r'^\d{2}:\d{2}:\d{2},\d{3}$')
+
+# SRT "HH:MM:SS,mmm" or WebVTT "[HH:]MM:SS.mmm", then optional VTT cue settings. At most two
+# hour digits: everything downstream (parse_timestamps, format_timestamp) is 00 .. 99 hours
+_TIMESTAMP = r'(?:(\d{1,2}):)?([0-5]\d):([0-5]\d)[,.](\d{3})'
+_TIMING_RE = re.compile(r'^' + _TIMESTAMP + r'[ \t]*-->[ \t]*' + _TIMESTAMP + r'(?:[ \t]+.*)?$', re.ASCII)
+_VTT_BLOCKS = ("NOTE", "STYLE", "REGION")
+_BLANK_RE = re.compile(r'(\n(?:[ \t]*\n)+)')  # blank line(s) between blocks, kept for line numbers
+
+# fast path: a chunk made only of well-formed "id / timing / text" SRT cues is checked with one
+# fullmatch and split with one findall, both in C
+_SRT_TS = r'[0-9]{2}:[0-5][0-9]:[0-5][0-9],[0-9]{3}'
+_SRT_CUE = r'(G[0-9]+)\n(G' + _SRT_TS + r') --> (G' + _SRT_TS + r')(G(?:\n[^\n]+)*)'
+_SRT_CUE_RE = re.compile(_SRT_CUE.replace('(G', '('))
+_SRT_CHUNK_RE = re.compile(r'\n*(?:' + _SRT_CUE.replace('(G', '(?:') + r'(?:\n\n+|\n?\Z))*')
 
 
 def format_timestamp(seconds: float) -> str:
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    ms = int((seconds - int(seconds)) * 1000)
+    # same rule as subtitle_track.format_timestamps (nearest ms, 0 .. 99:59:59,999); the old
+    # truncation turned 4.302 into 04,301
+    total = min(max(round(seconds * 1000.0), 0), 100 * 3600 * 1000 - 1)
+    secs, ms = divmod(total, 1000)
+    hours, secs = divmod(secs, 3600)
+    minutes, secs = divmod(secs, 60)
     return f"{hours:02}:{minutes:02}:{secs:02},{ms:03}"
 
 
@@ -20,20 +36,198 @@ def srt_time_to_seconds(srt_time: str) -> float:
     return int(h)*3600 + int(m)*60 + int(s) + int(ms)/1000.0
 
 
-def read_srt(file_path: str):
-    subs = []
-    with open(file_path, encoding="utf-8") as f:
-        content = f.read().strip()
-    for block in content.split("\n\n"):
-        lines = block.splitlines()
-        if len(lines) < 3:
-            continue
-        idx = lines[0].strip()
-        times = lines[1]
-        start, end = [t.strip() for t in times.split("-->")]
-        text = " ".join(lines[2:]).strip()
-        subs.append({"index": idx, "start": start, "end": end, "text": text})
-    return subs
+class SrtParseError(ValueError):
+    """A malformed SRT / VTT block; `line` is the 1-based line number it starts on."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+def _timing(line: str):
+    """("HH:MM:SS,mmm", "HH:MM:SS,mmm") for a cue timing line, None if it doesn't parse."""
+    if len(line) == 29 and line[12:17] == " --> " and line[2] == ":" and line[19] == ":":
+        # the common case (our own exports): already canonical, just validate
+        if _TIMING_RE.match(line) and line[8] == "," and line[25] == ",":
+            return line[:12], line[17:]
+    m = _TIMING_RE.match(line)
+    if m is None:
+        return None
+    h1, m1, s1, ms1, h2, m2, s2, ms2 = m.groups()
+    return f"{int(h1 or 0):02}:{m1}:{s1},{ms1}", f"{int(h2 or 0):02}:{m2}:{s2},{ms2}"
+
+
+def _chunks(f, chunk_size: int = 1 << 20):
+    """
+    (line_no, text) pieces of an open text file that start and end on blank lines, read in
+    big chunks. CRLF / CR become \n and a leading BOM is dropped.
+    """
+    line_no = 1
+    rest = ""
+    first = True
+    while True:
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        while chunk and chunk[-1] == "\r":
+            # don't split a CRLF across two chunks
+            more = f.read(1)
+            if not more:
+                break
+            chunk += more
+        if first and chunk:
+            chunk = chunk.lstrip("\ufeff")
+            first = False
+        if "\r" in chunk:
+            chunk = chunk.replace("\r\n", "\n").replace("\r", "\n")
+        buf = rest + chunk if rest else chunk
+        if not eof:
+            # only hand out up to the last blank line, the tail may go on in the next chunk
+            cut = buf.rfind("\n\n")
+            if cut < 0:
+                rest = buf
+                continue
+            buf, rest = buf[:cut], buf[cut:]
+        if buf:
+            yield line_no, buf
+            line_no += buf.count("\n")
+        if eof:
+            return
+
+
+class _CueReader:
+    """State of iter_cues between chunks: the cue still open (more text may follow a blank line)."""
+
+    def __init__(self, strict, errors):
+        self.strict = strict
+        self.errors = errors
+        self.cue = None  # [index, start, end, text lines]
+        self.count = 0
+        self.vtt = False
+
+    def bad(self, line_no, message):
+        err = SrtParseError(line_no, message)
+        if self.strict:
+            raise err
+        if self.errors is not None:
+            self.errors.append(err)
+
+    def close(self) -> list:
+        """The open cue as a finished dict (in a list), or []."""
+        if self.cue is None:
+            return []
+        cue, self.cue = self.cue, None
+        self.count += 1
+        return [{"index": cue[0], "start": cue[1], "end": cue[2], "text": " ".join(cue[3]).strip()}]
+
+    def fast(self, text: str):
+        """Cues of a chunk of plain well-formed SRT, or None when it needs the careful path."""
+        if (self.vtt or "\t" in text or " \n" in text or "\n " in text
+                or not _SRT_CHUNK_RE.fullmatch(text)):
+            return None
+        found = _SRT_CUE_RE.findall(text)
+        # every arrow is a timing line and no cue ends before it starts
+        if not found or text.count("-->") != len(found) or any(e < s for _, s, e, _ in found):
+            return None
+        done = self.close()
+        done.extend({"index": i, "start": s, "end": e, "text": t[1:].replace("\n", " ")} for i, s, e, t in found)
+        last = done.pop()
+        self.cue = [last["index"], last["start"], last["end"], [last["text"]]]
+        self.count += len(done)
+        return done
+
+    def block(self, line_no: int, block: str) -> list:
+        """Cues finished by one blank-line separated block."""
+        done = []
+        if line_no == 1 and block.startswith("WEBVTT"):
+            self.vtt = True
+            return done
+        lines = block.split("\n")
+        head = lines[0].strip()
+        # the timing line is the block's first line, or the second after a cue id
+        if "-->" in head:
+            at = 0
+        elif len(lines) > 1 and "-->" in lines[1]:
+            at = 1
+        else:
+            at = None
+        timing = _timing(lines[at].strip()) if at is not None else None
+
+        if timing is not None:
+            done = self.close()
+            if timing[1] < timing[0] and len(timing[0]) == len(timing[1]):
+                self.bad(line_no + at, f"cue ends before it starts ({timing[0]} --> {timing[1]})")
+                return done
+            self.cue = [head if at else str(self.count + 1), timing[0], timing[1], []]
+            first_text = at + 1
+        elif at is None and self.vtt and head.startswith(_VTT_BLOCKS):
+            return done
+        elif self.cue is not None and (at == 1 and not head.isdigit()
+                                       or at is None and (len(lines) > 1 or not head.isdigit())):
+            # no timing: the blank line before this was inside the cue's text
+            first_text = 0
+        else:
+            if at is not None:
+                self.bad(line_no + at, f"malformed timing line '{lines[at].strip()}'")
+            else:
+                self.bad(line_no, f"no timing line after '{head}'")
+            return done
+
+        text = lines[first_text:]
+        if block.count("-->") <= (timing is not None):
+            self.cue[3].extend([line.strip() for line in text])
+            return done
+        # an arrow further down: text, or a timing line with no blank line before it
+        for n, line in enumerate(text, start=line_no + first_text):
+            stripped = line.strip()
+            timing = _timing(stripped) if "-->" in stripped else None
+            if timing is None:
+                self.cue[3].append(stripped)
+                continue
+            done.extend(self.close())
+            if timing[1] < timing[0] and len(timing[0]) == len(timing[1]):
+                self.bad(n, f"cue ends before it starts ({timing[0]} --> {timing[1]})")
+                break
+            self.cue = [str(self.count + 1), timing[0], timing[1], []]
+        return done
+
+
+def iter_cues(f, strict: bool = False, errors: list = None):
+    """
+    Yield cue dicts {'index', 'start', 'end', 'text'} from an open SRT or WebVTT file in one
+    streaming pass (read in 1 MB chunks, only the current chunk is kept). Timestamps come out
+    as SRT "HH:MM:SS,mmm" strings whatever the input used; multi-line text is joined with
+    spaces.
+
+    Handles CRLF / CR line ends, a UTF-8 BOM, the WEBVTT header and NOTE / STYLE / REGION
+    blocks, missing or non-numeric cue ids and blank lines inside a cue's text (a blank line
+    only ends the cue when a timing line, or an id + timing line, comes next; a lone number
+    between blank lines counts as a cue id without a timing line).
+
+    Malformed blocks (text without a timing line, bad timestamps, end before start) are
+    skipped; each is appended to `errors` as an SrtParseError with its line number, or
+    raised straight away when strict=True.
+    """
+    reader = _CueReader(strict, errors)
+    for line_no, text in _chunks(f):
+        done = reader.fast(text)
+        if done is None:
+            done = []
+            for piece in _BLANK_RE.split(text):
+                if piece and piece[0] == "\n" and not piece.strip():
+                    line_no += piece.count("\n")
+                elif piece:
+                    stripped = piece.strip("\n")
+                    done.extend(reader.block(line_no + len(piece) - len(piece.lstrip("\n")), stripped))
+                    line_no += piece.count("\n")
+        yield from done
+    yield from reader.close()
+
+
+def read_srt(file_path: str, strict: bool = False, errors: list = None):
+    """All cues of an SRT / VTT file as a list (see iter_cues)."""
+    # utf-8-sig drops a BOM, newline=None turns CRLF / CR into \n
+    with open(file_path, encoding="utf-8-sig", newline=None) as f:
+        return list(iter_cues(f, strict=strict, errors=errors))
 
 
 def smooth_srt(subs, min_gap=0.1, min_duration=0.5):
@@ -66,19 +260,9 @@ def smooth_srt(subs, min_gap=0.1, min_duration=0.5):
 
 
 def write_srt_n_words(aligned_result, audio_path, output_srt, words_per_subtitle):
-    from whisperx.utils import format_timestamp as _fmt_ts
-    all_w = [w for seg in aligned_result['segments'] for w in seg['words']]
-    import os
-    os.makedirs(os.path.dirname(output_srt) or ".", exist_ok=True)
-    with open(output_srt, 'w', encoding='utf-8') as f:
-        idx = 1
-        for i in range(0, len(all_w), words_per_subtitle):
-            chunk = all_w[i:i+words_per_subtitle]
-            start, end = chunk[0]['start'], chunk[-1]['end']
-            text = ' '.join(w['word'] for w in chunk)
-            f.write(f"{idx}\n")
-            f.write(f"{_fmt_ts(start, always_include_hours=True, decimal_marker=',')} --> "
-                    f"{_fmt_ts(end, always_include_hours=True, decimal_marker=',')}\n")
-            f.write(text + "\n\n")
-            idx += 1
-    print(f"Wrote {idx-1} cues to {output_srt}")
\ No newline at end of file
+    """N words per cue across segments; kept for old callers, see Exporter.export_words."""
+    # imported here so utils doesn't pull in the exporters package at import time
+    from exporters.exporter import Exporter
+    from utils.cue_segmenter import CueRules
+    track = Exporter.export_words(aligned_result['segments'], output_srt, CueRules(max_words=words_per_subtitle))
+    print(f"Wrote {len(track)} cues to {output_srt}")
\ No newline at end of file
@@ -0,0 +1,189 @@
+import numpy as np
+
+from utils.cue_segmenter import CueRules, cue_starts
+
+_TS_LEN = 12  # "HH:MM:SS,mmm"
+
+
+def parse_timestamps(values) -> np.ndarray:
+    """
+    "HH:MM:SS,mmm" strings (or a '.' decimal marker) -> float64 seconds, all at once.
+    The strings are laid side by side in one byte buffer and decoded as a digit matrix,
+    so 100k timestamps cost a couple of ms instead of 100k split() / int() calls.
+    """
+    values = list(values)
+    if not values:
+        return np.zeros(0, dtype=np.float64)
+    try:
+        raw = "".join(values).encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError("Invalid SRT time: non-ascii characters")
+    if len(raw) != _TS_LEN * len(values):
+        bad = next(v for v in values if len(v) != _TS_LEN)
+        raise ValueError(f"Invalid SRT time: '{bad}'")
+    m = np.frombuffer(raw, dtype=np.uint8).reshape(-1, _TS_LEN)
+    digits = m[:, [0, 1, 3, 4, 6, 7, 9, 10, 11]].astype(np.int64) - ord("0")
+    ok = (
+        np.all((digits >= 0) & (digits <= 9), axis=1)
+        & (m[:, 2] == ord(":")) & (m[:, 5] == ord(":"))
+        & ((m[:, 8] == ord(",")) | (m[:, 8] == ord(".")))
+    )
+    if not ok.all():
+        raise ValueError(f"Invalid SRT time: '{values[int(np.argmin(ok))]}'")
+    h = digits[:, 0] * 10 + digits[:, 1]
+    mi = digits[:, 2] * 10 + digits[:, 3]
+    s = digits[:, 4] * 10 + digits[:, 5]
+    ms = digits[:, 6] * 100 + digits[:, 7] * 10 + digits[:, 8]
+    return h * 3600.0 + mi * 60.0 + s + ms / 1000.0
+
+
+MAX_MS = 100 * 3600 * 1000 - 1  # two hour digits
+
+
+def to_ms(seconds) -> np.ndarray:
+    """float seconds -> int64 ms, rounded to nearest (half to even) and clamped to 0..99:59:59,999."""
+    total = np.rint(np.maximum(np.asarray(seconds, dtype=np.float64), 0.0) * 1000.0)
+    return np.minimum(total, MAX_MS).astype(np.int64)
+
+
+def timestamp_matrix(ms: np.ndarray, decimal_marker: str = ",") -> np.ndarray:
+    """int ms -> (n, 12) uint8 matrix of "HH:MM:SS,mmm" characters, one row per timestamp."""
+    whole, frac = np.divmod(ms, 1000)
+    h, rem = np.divmod(whole, 3600)
+    mi, s = np.divmod(rem, 60)
+    m = np.empty((len(ms), _TS_LEN), dtype=np.uint8)
+    m[:, 2] = m[:, 5] = ord(":")
+    m[:, 8] = ord(decimal_marker)
+    for col, value, div in ((0, h, 10), (1, h, 1), (3, mi, 10), (4, mi, 1), (6, s, 10), (7, s, 1),
+                            (9, frac, 100), (10, frac, 10), (11, frac, 1)):
+        m[:, col] = value // div % 10 + ord("0")
+    return m
+
+
+def matrix_rows(m: np.ndarray) -> list:
+    """Character matrix -> one string per row (decoded once, then sliced)."""
+    width = m.shape[1]
+    raw = np.ascontiguousarray(m).tobytes().decode("ascii")
+    return [raw[i:i + width] for i in range(0, len(raw), width)]
+
+
+def format_timestamps(seconds: np.ndarray, decimal_marker: str = ",") -> list:
+    """
+    float seconds -> "HH:MM:SS,mmm" strings, built as one digit matrix and sliced apart.
+    Rounds to the nearest ms, same as srt_utils.format_timestamp.
+    """
+    ms = to_ms(seconds)
+    if len(ms) == 0:
+        return []
+    return matrix_rows(timestamp_matrix(ms, decimal_marker))
+
+
+class SubtitleTrack:
+    """
+    A list of cues as columns: float64 `start` / `end` seconds plus a `texts` list.
+
+    Every edit (shift, scale, merge, min duration, clamp, overlap repair) is a handful of
+    NumPy ops over the whole track and returns a new track; timestamps only become
+    "HH:MM:SS,mmm" strings again in to_cues() / at export.
+    """
+
+    def __init__(self, start, end, texts):
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.texts = list(texts)
+        if not (len(self.start) == len(self.end) == len(self.texts)):
+            raise ValueError("start, end and texts must have the same length")
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, i: int) -> dict:
+        return {"start": float(self.start[i]), "end": float(self.end[i]), "text": self.texts[i]}
+
+    def __iter__(self):
+        return iter(zip(self.start.tolist(), self.end.tolist(), self.texts))
+
+    @property
+    def duration(self) -> np.ndarray:
+        return self.end - self.start
+
+    # ---- conversion -----------------------------------------------------------------------
+
+    @classmethod
+    def from_cues(cls, cues) -> "SubtitleTrack":
+        """From read_srt-style dicts ('start' / 'end' as "HH:MM:SS,mmm" strings or seconds)."""
+        cues = list(cues)
+        if not cues:
+            return cls.empty()
+        starts = [c["start"] for c in cues]
+        ends = [c["end"] for c in cues]
+        start = parse_timestamps(starts) if isinstance(starts[0], str) else starts
+        end = parse_timestamps(ends) if isinstance(ends[0], str) else ends
+        return cls(start, end, [c["text"] for c in cues])
+
+    @classmethod
+    def empty(cls) -> "SubtitleTrack":
+        return cls(np.zeros(0), np.zeros(0), [])
+
+    def to_cues(self) -> list:
+        """read_srt-style dicts, timestamps formatted here (export / display only)."""
+        return [{"start": s, "end": e, "text": t}
+                for s, e, t in zip(format_timestamps(self.start), format_timestamps(self.end), self.texts)]
+
+    # ---- vectorized edits -----------------------------------------------------------------
+
+    def _take(self, start, end, texts=None) -> "SubtitleTrack":
+        return SubtitleTrack(start, end, self.texts if texts is None else texts)
+
+    def sorted(self) -> "SubtitleTrack":
+        if len(self) < 2 or bool(np.all(self.start[1:] >= self.start[:-1])):
+            return self
+        order = np.argsort(self.start, kind="stable")
+        return SubtitleTrack(self.start[order], self.end[order], [self.texts[i] for i in order.tolist()])
+
+    def shift(self, seconds: float) -> "SubtitleTrack":
+        return self._take(self.start + seconds, self.end + seconds)
+
+    def scale(self, factor: float, origin: float = 0.0) -> "SubtitleTrack":
+        """Stretch time around `origin` (e.g. 25/23.976 for a frame-rate conversion)."""
+        return self._take(origin + (self.start - origin) * factor, origin + (self.end - origin) * factor)
+
+    def clamp(self, lo: float = 0.0, hi: float = None) -> "SubtitleTrack":
+        """Keep every cue inside [lo, hi]."""
+        hi = np.inf if hi is None else hi
+        return self._take(np.clip(self.start, lo, hi), np.clip(self.end, lo, hi))
+
+    def merge_by_gap(self, min_gap: float = 0.1) -> "SubtitleTrack":
+        """
+        Merge runs of cues separated by less than `min_gap` seconds into one cue (first start,
+        last end, texts joined with a space) -- the merge step of smooth_srt.
+        """
+        n = len(self)
+        if n < 2:
+            return self._take(self.start.copy(), self.end.copy(), list(self.texts))
+        # the cue segmenter with only forced breaks: cues are the "words", gaps the pauses
+        first = cue_starts(self.start, self.end, CueRules(),
+                           breaks=np.r_[True, (self.start[1:] - self.end[:-1]) >= min_gap])
+        last = np.r_[first[1:], n] - 1
+        texts = self.texts
+        merged = [texts[a] if a == b else " ".join(texts[a:b + 1]) for a, b in zip(first.tolist(), last.tolist())]
+        return SubtitleTrack(self.start[first], self.end[last], merged)
+
+    def min_duration(self, seconds: float = 0.5) -> "SubtitleTrack":
+        """Lengthen cues shorter than `seconds` (the start stays put)."""
+        return self._take(self.start, np.maximum(self.end, self.start + seconds))
+
+    def repair_overlaps(self, min_gap: float = 0.0) -> "SubtitleTrack":
+        """
+        Sort by start and end every cue at least `min_gap` before the next one begins
+        (never before its own start), so players don't show two cues at once.
+        """
+        track = self.sorted()
+        end = track.end.copy()
+        if len(track) > 1:
+            end[:-1] = np.minimum(end[:-1], track.start[1:] - min_gap)
+        return SubtitleTrack(track.start, np.maximum(end, track.start), track.texts)
+
+    def smooth(self, min_gap: float = 0.1, min_duration: float = 0.5) -> "SubtitleTrack":
+        """smooth_srt on arrays: merge cues closer than min_gap, then enforce min_duration."""
+        return self.merge_by_gap(min_gap).min_duration(min_duration)
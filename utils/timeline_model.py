@@ -0,0 +1,41 @@
+class TimelineModel:
+    """
+    The cues shown in the timeline editor: start / end timestamp strings and the (editable)
+    text, as three parallel lists. The editor widgets only ever show a window of it, so edits
+    live here and not in an Entry -- re-export reads the model, whatever is on screen.
+    `edited` holds the indices whose text the user changed, for re-aligning just those.
+    """
+
+    def __init__(self, cues=None):
+        self.starts, self.ends, self.texts = [], [], []
+        self.edited = set()
+        if cues:
+            self.extend(cues)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def reset(self, cues):
+        self.starts, self.ends, self.texts = [], [], []
+        self.edited = set()
+        self.extend(cues)
+
+    def extend(self, cues):
+        """Append cue dicts ({"start", "end", "text"}, as returned by to_cues / transcribe_stream)."""
+        self.starts += [c["start"] for c in cues]
+        self.ends += [c["end"] for c in cues]
+        self.texts += [c["text"] for c in cues]
+
+    def label(self, i: int) -> str:
+        return f"{self.starts[i]} --> {self.ends[i]}"
+
+    def set_text(self, i: int, text: str):
+        if text != self.texts[i]:
+            self.texts[i] = text
+            self.edited.add(i)
+
+    def set_times(self, i: int, start: str, end: str):
+        self.starts[i], self.ends[i] = start, end
+
+    def to_cues(self) -> list:
+        return [{"start": s, "end": e, "text": t} for s, e, t in zip(self.starts, self.ends, self.texts)]
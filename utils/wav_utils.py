@@ -0,0 +1,190 @@
+import os
+import struct
+import wave
+import numpy as np
+
+_FORMAT_PCM, _FORMAT_FLOAT, _FORMAT_EXTENSIBLE = 1, 3, 0xFFFE
+
+
+def _pcm_to_float(raw: bytes, sampwidth: int, channels: int) -> np.ndarray:
+    """Convert interleaved little-endian PCM bytes into a (frames, channels) float32 array."""
+    if sampwidth == 1:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sampwidth == 2:
+        data = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sampwidth == 3:
+        # pad each 3-byte sample to 4 bytes, then arithmetic shift to sign-extend
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((b.shape[0], 4), dtype=np.uint8)
+        padded[:, 1:] = b
+        data = (padded.view("<i4").ravel() >> 8).astype(np.float32) / 8388608.0
+    elif sampwidth == 4:
+        data = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {sampwidth} bytes")
+    return data.reshape(-1, channels)
+
+
+def float_to_pcm16(samples: np.ndarray) -> bytes:
+    """Clip float samples to [-1, 1] and pack them as 16-bit PCM."""
+    clipped = np.clip(samples, -1.0, 1.0)
+    return (clipped * 32767.0).astype("<i2").tobytes()
+
+
+def read_wav(path: str):
+    """
+    Read a WAV file into memory.
+    Returns (samples, sample_rate) where samples is float32 with shape (frames, channels).
+    WAV flavours the stdlib `wave` module can't open (float/extensible) go through map_wav,
+    anything that isn't a WAV at all (mp3, flac, ...) through pydub.
+    """
+    try:
+        with wave.open(path, "rb") as wf:
+            channels = wf.getnchannels()
+            sampwidth = wf.getsampwidth()
+            sr = wf.getframerate()
+            raw = wf.readframes(wf.getnframes())
+        return _pcm_to_float(raw, sampwidth, channels), sr
+    except (wave.Error, EOFError):
+        try:
+            frames, info = map_wav(path)
+        except ValueError:
+            frames = None
+        if frames is not None:
+            if info["is_float"]:
+                return np.array(frames, dtype=np.float32), info["sample_rate"]
+            return _pcm_to_float(frames.tobytes(), info["sampwidth"], info["channels"]), info["sample_rate"]
+        from pydub import AudioSegment
+        audio = AudioSegment.from_file(path)
+        raw = audio.raw_data
+        return _pcm_to_float(raw, audio.sample_width, audio.channels), audio.frame_rate
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int):
+    """Write float samples ((frames,) or (frames, channels)) as a 16-bit PCM WAV."""
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(float_to_pcm16(samples))
+
+
+def iter_wav_blocks(path: str, block_frames: int):
+    """
+    Yield (block_frames, channels) float32 blocks from a PCM WAV without loading the whole file.
+    The last block may be shorter.
+    """
+    with wave.open(path, "rb") as wf:
+        channels = wf.getnchannels()
+        sampwidth = wf.getsampwidth()
+        while True:
+            raw = wf.readframes(block_frames)
+            if not raw:
+                break
+            yield _pcm_to_float(raw, sampwidth, channels)
+
+
+def wav_sample_rate(path: str) -> int:
+    with wave.open(path, "rb") as wf:
+        return wf.getframerate()
+
+
+class WavWriter:
+    """Progressive 16-bit PCM WAV writer; the header is patched with the final length on close."""
+
+    def __init__(self, path: str, sample_rate: int, channels: int = 1):
+        self._wf = wave.open(path, "wb")
+        self._wf.setnchannels(channels)
+        self._wf.setsampwidth(2)
+        self._wf.setframerate(sample_rate)
+
+    def write(self, samples: np.ndarray):
+        if len(samples):
+            self._wf.writeframes(float_to_pcm16(samples))
+
+    def close(self):
+        self._wf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_wav_range(path: str, start_frame: int, n_frames: int):
+    """Read n_frames starting at start_frame; returns ((frames, channels) float32, sample_rate)."""
+    with wave.open(path, "rb") as wf:
+        sr = wf.getframerate()
+        wf.setpos(min(max(start_frame, 0), wf.getnframes()))
+        raw = wf.readframes(n_frames)
+        return _pcm_to_float(raw, wf.getsampwidth(), wf.getnchannels()), sr
+
+
+def wav_info(path: str) -> dict:
+    """
+    The fmt + data chunk of a RIFF WAV, from the header only (nothing is read past it):
+    sample_rate, channels, sampwidth (bytes), is_float, data_offset, n_frames.
+    Unlike `wave` this also takes IEEE float and WAVE_FORMAT_EXTENSIBLE files.
+    """
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] not in (b"RIFF", b"RF64") or riff[8:12] != b"WAVE":
+            raise ValueError(f"{path} is not a WAV file")
+        fmt = None
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk, size = head[:4], struct.unpack("<I", head[4:])[0]
+            if chunk == b"fmt ":
+                body = f.read(size)
+                if len(body) < 16:
+                    raise ValueError(f"{path}: truncated fmt chunk")
+                tag, channels, sample_rate = struct.unpack("<HHI", body[:8])
+                bits = struct.unpack("<H", body[14:16])[0]
+                if tag == _FORMAT_EXTENSIBLE and len(body) >= 26:
+                    tag = struct.unpack("<H", body[24:26])[0]  # first 2 bytes of the sub-format GUID
+                if tag not in (_FORMAT_PCM, _FORMAT_FLOAT):
+                    raise ValueError(f"{path}: unsupported WAV format tag {tag:#x}")
+                fmt = (sample_rate, channels, (bits + 7) // 8, tag == _FORMAT_FLOAT)
+                f.seek(size & 1, 1)  # chunks are word aligned
+            elif chunk == b"data":
+                if fmt is None:
+                    raise ValueError(f"{path}: data chunk before fmt")
+                sample_rate, channels, sampwidth, is_float = fmt
+                offset = f.tell()
+                # streaming writers (and RF64) leave the size at 0 / 0xFFFFFFFF: runs to the end of the file
+                available = os.fstat(f.fileno()).st_size - offset
+                if size in (0, 0xFFFFFFFF) or size > available:
+                    size = available
+                return {"sample_rate": sample_rate, "channels": channels, "sampwidth": sampwidth,
+                        "is_float": is_float, "data_offset": offset,
+                        "n_frames": size // (channels * sampwidth)}
+            else:
+                f.seek(size + (size & 1), 1)
+
+
+def map_wav(path: str):
+    """
+    Memory-map the PCM data of a WAV without decoding it. Returns (frames, info): frames is a
+    read-only (n_frames, channels) array in the file's own sample type -- uint8 / <i2 / <i4 /
+    <f4 / <f8, or (n_frames, channels, 3) uint8 for 24-bit -- and info is wav_info(path).
+    """
+    info = wav_info(path)
+    channels, width = info["channels"], info["sampwidth"]
+    dtypes = {4: "<f4", 8: "<f8"} if info["is_float"] else {1: np.uint8, 2: "<i2", 3: np.uint8, 4: "<i4"}
+    if width not in dtypes:
+        raise ValueError(f"{path}: unsupported sample width {width} bytes")
+    dtype = dtypes[width]
+    shape = (info["n_frames"], channels, 3) if width == 3 and not info["is_float"] else (info["n_frames"], channels)
+    if info["n_frames"] == 0:
+        return np.zeros(shape, dtype=dtype), info
+    return np.memmap(path, dtype=dtype, mode="r", offset=info["data_offset"], shape=shape), info
+
+
+def wav_duration(path: str) -> float:
+    """Duration in seconds, straight from the header (nothing is decoded)."""
+    info = wav_info(path)
+    return info["n_frames"] / float(info["sample_rate"])
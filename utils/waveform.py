@@ -0,0 +1,152 @@
+import os
+
+import numpy as np
+
+from utils.wav_utils import map_wav
+
+# sample type -> (offset, scale) to get [-1, 1] floats, applied to the reduced peaks only
+_NORMALIZE = {
+    (False, 1): (128.0, 1 / 128.0),
+    (False, 2): (0.0, 1 / 32768.0),
+    (False, 3): (0.0, 1 / 8388608.0),
+    (False, 4): (0.0, 1 / 2147483648.0),
+    (True, 4): (0.0, 1.0),
+    (True, 8): (0.0, 1.0),
+}
+
+
+def peaks_path(wav_path: str) -> str:
+    """Where the peak pyramid of a wav is cached: next to it, as <stem>.peaks.npz"""
+    return os.path.splitext(wav_path)[0] + ".peaks.npz"
+
+
+def _int24(block: np.ndarray) -> np.ndarray:
+    """(frames, channels, 3) little-endian bytes -> (frames, channels) int32."""
+    b = block.astype(np.int32)
+    return (b[..., 0] | (b[..., 1] << 8) | (b[..., 2] << 16)) << 8 >> 8
+
+
+class PeakPyramid:
+    """
+    Min / max envelope of a wav at several zoom levels, for drawing waveforms.
+
+    Level 0 has one (min, max) per BASE frames (all channels together), every level above
+    merges FACTOR buckets of the one below, up to a single bucket for the whole file. To
+    draw `width` pixel columns, columns() picks the coarsest level whose buckets are still
+    narrower than a column, so every column reduces at most FACTOR buckets -- constant work
+    per column, whether the view is the whole file or half a second.
+
+    Built in one pass over the memory-mapped PCM data (map_wav, block by block, so memory
+    stays flat) and cached next to the audio as <stem>.peaks.npz.
+    """
+
+    BASE = 256                # frames per level-0 bucket (~6 ms at 44.1 kHz)
+    FACTOR = 4
+    BLOCK_FRAMES = 256 * 4096  # frames reduced per pass while building
+
+    def __init__(self, mins: list, maxs: list, sample_rate: int, n_frames: int):
+        self.mins, self.maxs = mins, maxs  # one float32 array per level, finest first
+        self.sample_rate = sample_rate
+        self.n_frames = n_frames
+
+    @property
+    def duration(self) -> float:
+        return self.n_frames / float(self.sample_rate)
+
+    @classmethod
+    def build(cls, wav_path: str) -> "PeakPyramid":
+        """
+        steps:
+        1. map the PCM data (no decode), reduce BLOCK_FRAMES at a time: reshape to
+           (buckets, BASE * channels) and take min / max per row, in the file's sample type
+        2. normalize only those peaks to [-1, 1]
+        3. each next level: min / max over groups of FACTOR buckets, until one bucket is left
+        """
+        frames, info = map_wav(wav_path)
+        n, base = info["n_frames"], cls.BASE
+        n_buckets = -(-n // base)
+        lo = np.empty(n_buckets, dtype=np.float32)
+        hi = np.empty(n_buckets, dtype=np.float32)
+        offset, scale = _NORMALIZE[(info["is_float"], info["sampwidth"])]
+        for a in range(0, n, cls.BLOCK_FRAMES):
+            block = frames[a:a + cls.BLOCK_FRAMES]
+            if block.ndim == 3:
+                block = _int24(block)
+            k, rest = divmod(len(block), base)
+            first = a // base
+            rows = block[:k * base].reshape(k, -1)
+            lo[first:first + k] = (rows.min(axis=1) - offset) * scale
+            hi[first:first + k] = (rows.max(axis=1) - offset) * scale
+            if rest:  # the file's last, partial bucket
+                lo[first + k] = (block[k * base:].min() - offset) * scale
+                hi[first + k] = (block[k * base:].max() - offset) * scale
+
+        mins, maxs = [lo], [hi]
+        while len(mins[-1]) > 1:
+            pad = -len(mins[-1]) % cls.FACTOR
+            # edge padding never changes a min / max
+            mins.append(np.pad(mins[-1], (0, pad), mode="edge").reshape(-1, cls.FACTOR).min(axis=1))
+            maxs.append(np.pad(maxs[-1], (0, pad), mode="edge").reshape(-1, cls.FACTOR).max(axis=1))
+        return cls(mins, maxs, info["sample_rate"], n)
+
+    def save(self, path: str):
+        """Write atomically (temp file + rename); all levels back to back + their offsets."""
+        tmp = path + ".part.npz"
+        bounds = np.cumsum([0] + [len(m) for m in self.mins])
+        np.savez(tmp, mins=np.concatenate(self.mins), maxs=np.concatenate(self.maxs), bounds=bounds,
+                 sample_rate=self.sample_rate, n_frames=self.n_frames, base=self.BASE, factor=self.FACTOR)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PeakPyramid":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["base"]) != cls.BASE or int(data["factor"]) != cls.FACTOR:
+                raise ValueError(f"{path} was built with other bucket sizes")
+            b = data["bounds"].tolist()
+            mins, maxs = data["mins"], data["maxs"]
+            return cls([mins[b[k]:b[k + 1]] for k in range(len(b) - 1)],
+                       [maxs[b[k]:b[k + 1]] for k in range(len(b) - 1)],
+                       int(data["sample_rate"]), int(data["n_frames"]))
+
+    @classmethod
+    def for_wav(cls, wav_path: str) -> "PeakPyramid":
+        """The cached pyramid if it's newer than the wav, otherwise build (and cache) it."""
+        cache = peaks_path(wav_path)
+        if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(wav_path):
+            try:
+                return cls.load(cache)
+            except (OSError, ValueError, KeyError):
+                pass
+        pyramid = cls.build(wav_path)
+        try:
+            pyramid.save(cache)
+        except OSError:
+            pass  # read-only folder: just not cached
+        return pyramid
+
+    def columns(self, t0: float, t1: float, width: int) -> tuple:
+        """
+        (mins, maxs), one per pixel column of [t0, t1) drawn `width` columns wide. Columns
+        past the end of the audio are 0. Zoomed in further than a level-0 bucket, columns
+        repeat their bucket.
+        """
+        width = int(width)
+        if width <= 0 or t1 <= t0 or self.n_frames == 0:
+            return np.zeros(max(width, 0), np.float32), np.zeros(max(width, 0), np.float32)
+        per_px = (t1 - t0) * self.sample_rate / width
+        level, bucket = 0, self.BASE
+        while level + 1 < len(self.mins) and bucket * self.FACTOR <= per_px:
+            level, bucket = level + 1, bucket * self.FACTOR
+        lo, hi = self.mins[level], self.maxs[level]
+
+        edges = (t0 * self.sample_rate + np.arange(width + 1) * per_px) / bucket
+        first = np.floor(edges[:-1]).astype(np.int64)
+        inside = (first >= 0) & (first < len(lo))
+        first = np.clip(first, 0, len(lo) - 1)
+        # reduceat: [first[k], first[k + 1]) per column, a single bucket when they're equal
+        stop = int(min(max(np.ceil(edges[-1]), first[-1] + 1), len(lo)))
+        mins = np.minimum.reduceat(lo[:stop], first)
+        maxs = np.maximum.reduceat(hi[:stop], first)
+        mins[~inside] = 0.0
+        maxs[~inside] = 0.0
+        return mins, maxs
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+
+from utils.cue_segmenter import CueRules, cue_starts
+from utils.subtitle_track import SubtitleTrack
+
+
+def _get(item, key, default=None):
+    return item.get(key, default) if isinstance(item, dict) else getattr(item, key, default)
+
+
+class WordStore:
+    """
+    Aligned words of one transcript, stored column-wise so re-grouping never needs the model.
+
+    start / end   float64 seconds (NaN for words the aligner couldn't place)
+    score         float32 alignment score (NaN if the backend has none)
+    word_id       int32 index into `vocab` (every distinct word string is stored once)
+    segment       int32 index of the ASR segment the word came from
+
+    Saved as one uncompressed .npz (no pickles), so loading an hour of words is a few ms.
+    """
+
+    def __init__(self, start, end, score, word_id, segment, vocab):
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.score = np.asarray(score, dtype=np.float32)
+        self.word_id = np.asarray(word_id, dtype=np.int32)
+        self.segment = np.asarray(segment, dtype=np.int32)
+        self.vocab = np.asarray(vocab, dtype=str)
+
+    def __len__(self):
+        return len(self.word_id)
+
+    @property
+    def words(self) -> np.ndarray:
+        return self.vocab[self.word_id] if len(self.vocab) else np.zeros(0, dtype=str)
+
+    @classmethod
+    def from_segments(cls, segments) -> "WordStore":
+        """Build from whisperx segment dicts or stable-ts segment objects."""
+        table = {}
+        start, end, score, word_id, seg_idx = [], [], [], [], []
+        nan = float("nan")
+        for s, seg in enumerate(segments):
+            for w in _get(seg, "words", None) or []:
+                text = str(_get(w, "word", "")).strip()
+                word_id.append(table.setdefault(text, len(table)))
+                ws, we = _get(w, "start"), _get(w, "end")
+                start.append(nan if ws is None else ws)
+                end.append(nan if we is None else we)
+                # whisperx calls it score, stable-ts / faster-whisper probability
+                sc = _get(w, "score", _get(w, "probability"))
+                score.append(nan if sc is None else sc)
+                seg_idx.append(s)
+        return cls(start, end, score, word_id, seg_idx, list(table))
+
+    def save(self, path: str):
+        """Write atomically (temp file + rename) so a reader never sees half a store."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".part.npz"
+        np.savez(tmp, start=self.start, end=self.end, score=self.score,
+                 word_id=self.word_id, segment=self.segment, vocab=self.vocab)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "WordStore":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["start"], data["end"], data["score"], data["word_id"], data["segment"], data["vocab"])
+
+    def span(self, t0: float, t1: float) -> tuple:
+        """
+        (lo, hi) positions of the words that start in [t0, t1). Unaligned (NaN) words go with
+        the word before them, like to_track puts their text on the previous cue.
+        """
+        start = np.fmax.accumulate(np.nan_to_num(self.start, nan=-np.inf))
+        return int(np.searchsorted(start, t0, "left")), int(np.searchsorted(start, t1, "left"))
+
+    def splice(self, lo: int, hi: int, other: "WordStore") -> "WordStore":
+        """New store with words[lo:hi] replaced by `other`'s words (segment of the first replaced word)."""
+        table = {w: k for k, w in enumerate(self.vocab.tolist())}
+        other_ids = [table.setdefault(w, len(table)) for w in other.words.tolist()]
+        seg = self.segment[lo] if lo < len(self) else (self.segment[-1] if len(self) else 0)
+        cat = lambda a, b: np.concatenate([a[:lo], b, a[hi:]])
+        return WordStore(cat(self.start, other.start), cat(self.end, other.end), cat(self.score, other.score),
+                         cat(self.word_id, np.asarray(other_ids, dtype=np.int32)),
+                         cat(self.segment, np.full(len(other), seg, dtype=np.int32)), list(table))
+
+    def cue_starts(self, rules: CueRules) -> np.ndarray:
+        """Index of the first word of every cue under `rules` (utils.cue_segmenter)."""
+        breaks = None
+        if rules.split_segments and len(self):
+            breaks = np.r_[True, self.segment[1:] != self.segment[:-1]]
+        chars = None
+        if rules.max_chars is not None or rules.max_cps:
+            chars = np.char.str_len(self.vocab)[self.word_id] if len(self.vocab) else np.zeros(len(self), int)
+        return cue_starts(self.start, self.end, rules, chars=chars, breaks=breaks)
+
+    def to_track(self, rules: CueRules = None) -> SubtitleTrack:
+        """Group into a SubtitleTrack (float seconds; nothing is formatted until export)."""
+        if len(self) == 0:
+            return SubtitleTrack.empty()
+        bounds = self.cue_starts(rules or CueRules(max_words=1))
+        # fmin / fmax skip NaN, so unaligned words don't blank their cue's timing
+        starts = np.fmin.reduceat(self.start, bounds)
+        ends = np.fmax.reduceat(self.end, bounds)
+        words = self.words.tolist()
+        stops = np.r_[bounds[1:], len(self)]
+        timed = ~np.isnan(starts)
+        texts = []
+        for a, b, ok in zip(bounds.tolist(), stops.tolist(), timed.tolist()):
+            if ok:
+                texts.append(" ".join(words[a:b]))
+            elif texts:
+                # no aligned word in this cue: keep the text on the previous cue
+                texts[-1] += " " + " ".join(words[a:b])
+        return SubtitleTrack(starts[timed], ends[timed], texts)
+
+    def to_cues(self, rules: CueRules = None) -> list:
+        """Group into cue dicts {'start', 'end', 'text'} (SRT time strings, like read_srt)."""
+        return self.to_track(rules).to_cues()